@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+bench_download_engines.py
+比較 install.py 的執行緒下載引擎與 asyncio 下載引擎的峰值 RSS 與總耗時。
+
+以本機 HTTP 伺服器提供合成文件，每個引擎在獨立子行程中執行，
+避免彼此的記憶體峰值互相干擾。
+
+用法：
+    python3 benchmarks/bench_download_engines.py [--files 500] [--size 8192] [--max-workers 0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+class SyntheticFileHandler(BaseHTTPRequestHandler):
+    """對任何路徑回傳固定大小的合成內容（支援 keep-alive）"""
+
+    protocol_version = "HTTP/1.1"
+    body = b""
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def load_installer_module():
+    spec = importlib.util.spec_from_file_location("sunnycore_install", REPO_ROOT / "install.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 回報，macOS 以位元組回報
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(engine: str, port: int, files: int, max_workers: int) -> None:
+    install = load_installer_module()
+    installer = install.SunnycoreInstaller(max_workers=max_workers, engine=engine)
+    installer.base_raw_url = f"http://127.0.0.1:{port}/raw"
+
+    peak_threads = threading.active_count()
+    stop = threading.Event()
+
+    def sample_threads() -> None:
+        nonlocal peak_threads
+        while not stop.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+    with tempfile.TemporaryDirectory() as tmp:
+        file_list = [(f"bench/file-{i}.md", Path(tmp) / f"file-{i}.md") for i in range(files)]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = installer.download_files_parallel(file_list)
+        elapsed = time.perf_counter() - start
+    stop.set()
+    sampler.join()
+
+    print(json.dumps({
+        "engine": engine,
+        "ok": ok,
+        "seconds": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        # 扣除取樣執行緒本身
+        "peak_threads": peak_threads - 1,
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="比較執行緒與 asyncio 下載引擎的峰值 RSS 與總耗時")
+    parser.add_argument("--files", type=int, default=500, help="合成文件數量 (預設: 500)")
+    parser.add_argument("--size", type=int, default=8192, help="每個文件的位元組數 (預設: 8192)")
+    parser.add_argument("--max-workers", type=int, default=0, help="傳給安裝器的 --max-workers (預設: 0)")
+    parser.add_argument("--child", choices=["thread", "async"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.port, args.files, args.max_workers)
+        return
+
+    SyntheticFileHandler.body = b"x" * args.size
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SyntheticFileHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    print(f"文件數: {args.files}，單檔大小: {args.size} bytes，max-workers: {args.max_workers}")
+    print(f"{'引擎':<8} {'耗時(秒)':>10} {'峰值 RSS(MB)':>14} {'峰值執行緒':>10}")
+    try:
+        for engine in ("thread", "async"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", engine, "--port", str(port),
+                 "--files", str(args.files), "--max-workers", str(args.max_workers)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            status = "" if result["ok"] else "  (有失敗)"
+            print(
+                f"{engine:<8} {result['seconds']:>10.2f} {result['peak_rss_mb']:>14.1f} "
+                f"{result['peak_threads']:>10}{status}"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+bench_sharding.py
+比較 scripts/sharding.py 的章節索引 + 位元組範圍複製引擎與原本「每行重新開檔附加寫入」實作的耗時。
+
+產生大型合成 Markdown（預設 200 個一級章節、共約 200,000 行），
+兩種實作分別拆分到暫存目錄，並確認輸出內容完全一致。
+原本的實作會把程式碼區塊中行首的 `# 註解` 誤認為章節，因此合成文件中的程式碼區塊註解帶有縮排，
+另外單獨確認引擎在行首註解的情況下仍只產生預期數量的章節。
+
+用法：
+    python3 benchmarks/bench_sharding.py [--sections 200] [--lines 200000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import filecmp
+import importlib.util
+import random
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_sharding_module():
+    spec = importlib.util.spec_from_file_location("sharding", REPO_ROOT / "scripts" / "sharding.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_shard(input_file: Path, output_dir: Path) -> int:
+    """原本的實作：每一行內容都以附加模式重新開啟輸出檔，並以字串樣式呼叫 re.match"""
+    sections_count = 0
+    current_section_title: Optional[str] = None
+    current_section_path: Optional[Path] = None
+
+    def clean_filename(filename: str) -> str:
+        filename = re.sub(r"[\\/:*?\"<>|]", "", filename)
+        filename = re.sub(r"\s+", " ", filename)
+        return filename.strip()
+
+    with input_file.open("r", encoding="utf-8") as f:
+        for raw_line in f:
+            line = raw_line.rstrip("\n")
+            m = re.match(r"^#\s+(.+)$", line)
+            if m:
+                section_title = m.group(1)
+                if current_section_title and current_section_path:
+                    sections_count += 1
+                current_section_title = section_title
+                current_section_path = output_dir / (clean_filename(section_title) + ".md")
+                with current_section_path.open("w", encoding="utf-8") as out:
+                    out.write(f"# {section_title}\n\n")
+                continue
+            if current_section_path is not None:
+                with current_section_path.open("a", encoding="utf-8") as out:
+                    out.write(raw_line)
+
+    if current_section_title and current_section_path:
+        sections_count += 1
+    return sections_count
+
+
+def write_markdown(path: Path, sections: int, lines: int, comment_indent: str = "    ") -> None:
+    rng = random.Random(7)
+    per_section = max(1, lines // sections)
+    with path.open("w", encoding="utf-8") as f:
+        f.write("前言（第一個一級標題之前的內容會被略過）\n")
+        for index in range(sections):
+            f.write(f"# 章節 {index}: 系統元件/介面 \"設計\"\n\n")
+            for n in range(per_section):
+                kind = rng.random()
+                if kind < 0.05:
+                    f.write(f"## 小節 {index}.{n}\n")
+                elif kind < 0.1:
+                    f.write(f"```python\nif True:\n{comment_indent}# 程式碼中的註解\n```\n")
+                else:
+                    f.write(f"- 第 {n} 行內容：" + "說明文字 " * rng.randint(1, 12) + "\n")
+
+
+def measure(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        best = min(best, func())
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="比較 Markdown 拆分引擎與原本逐行附加寫入的耗時")
+    parser.add_argument("--sections", type=int, default=200, help="一級章節數 (預設 200)")
+    parser.add_argument("--lines", type=int, default=200_000, help="總行數 (預設 200000)")
+    parser.add_argument("--repeat", type=int, default=3, help="重複次數，取最佳值 (預設 3)")
+    args = parser.parse_args()
+
+    sharding = load_sharding_module()
+    with tempfile.TemporaryDirectory(prefix="bench-sharding-") as tmp:
+        root = Path(tmp)
+        source = root / "architecture.md"
+        write_markdown(source, args.sections, args.lines)
+        size_mb = source.stat().st_size / 1024 / 1024
+        print(f"輸入: {args.sections} 個章節，{args.lines} 行，{size_mb:.1f} MB")
+
+        outputs = {}
+
+        def run(name, func):
+            def once() -> float:
+                output_dir = root / name
+                # 每次都從空目錄開始，避免增量拆分略過未變更的分片
+                shutil.rmtree(output_dir, ignore_errors=True)
+                output_dir.mkdir()
+                started = time.perf_counter()
+                func(source, output_dir)
+                elapsed = time.perf_counter() - started
+                outputs[name] = output_dir
+                return elapsed
+            return once
+
+        legacy = measure(run("legacy", legacy_shard), args.repeat)
+        engine = measure(run("engine", sharding.shard_by_first_level_headings), args.repeat)
+
+        legacy_files = sorted(p.name for p in outputs["legacy"].glob("*.md"))
+        engine_files = sorted(p.name for p in outputs["engine"].glob("*.md"))
+        _, mismatch, errors = filecmp.cmpfiles(outputs["legacy"], outputs["engine"], legacy_files, shallow=False)
+        if legacy_files != engine_files or mismatch or errors:
+            raise SystemExit("✗ 兩種實作的輸出不一致")
+
+        print(f"{'實作':<10} {'耗時(秒)':>10} {'加速':>8}")
+        print(f"{'legacy':<10} {legacy:>10.3f} {1.0:>7.1f}x")
+        print(f"{'engine':<10} {engine:>10.3f} {legacy / engine:>7.1f}x")
+        print(f"✓ 輸出一致（{len(engine_files)} 個文件）")
+
+        fenced = root / "fenced.md"
+        write_markdown(fenced, args.sections, args.lines, comment_indent="")
+        if len(sharding.read_section_index(fenced)) != args.sections:
+            raise SystemExit("✗ 程式碼區塊中的 # 註解被誤認為章節")
+        print(f"✓ 程式碼區塊中的行首 # 註解未產生額外章節（{args.sections} 個章節）")
+
+
+if __name__ == "__main__":
+    main()
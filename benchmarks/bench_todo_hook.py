@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+bench_todo_hook.py
+比較 hooks/ensure_todos_done.py 在大型 transcript 上尋找最後一次 TodoWrite 的耗時。
+
+產生合成的 JSONL transcript（預設 100 MB，含大量 tool_result 文件內容），比較：
+  - baseline:    逐行文字讀取並對每一行 json.loads（原始實作）
+  - prefilter:   以大緩衝區讀取位元組，只解碼含 "TodoWrite" 的行
+  - reverse:     由檔尾反向逐塊讀取，只解碼含 "TodoWrite" 的行，找到即停止
+  - mmap:        以 mmap 直接反向搜尋 "TodoWrite"（hook 目前的完整掃描路徑）
+  - checkpoint:  已有位移檢查點，只掃描新附加的一行（hook 的一般情況）
+
+分別測量最後一次 TodoWrite 位於檔尾附近（常見情況）與檔案開頭（反向掃描的最差情況）。
+
+用法：
+    python3 benchmarks/bench_todo_hook.py [--size-mb 100] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_hook_module():
+    spec = importlib.util.spec_from_file_location("ensure_todos_done", REPO_ROOT / "hooks" / "ensure_todos_done.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def todowrite_entry(index: int) -> dict:
+    return {
+        "type": "assistant",
+        "message": {"content": [{
+            "type": "tool_use",
+            "name": "TodoWrite",
+            "input": {"todos": [
+                {"content": f"任務 {index}-{n}", "status": "completed" if n else "pending"}
+                for n in range(5)
+            ]},
+        }]},
+    }
+
+
+def filler_entries(rng: random.Random):
+    """產生不含 TodoWrite 的一般訊息（多數為大型 tool_result）"""
+    while True:
+        if rng.random() < 0.3:
+            yield {"type": "assistant", "message": {"content": [{"type": "text", "text": "說明" * rng.randint(50, 500)}]}}
+        else:
+            dump = "".join(f"line {n}: def function_{n}(): return {n}\n" for n in range(rng.randint(200, 4000)))
+            yield {"type": "user", "message": {"content": [{"type": "tool_result", "content": dump}]}}
+
+
+def write_transcript(path: Path, size_bytes: int, todo_near_end: bool) -> None:
+    rng = random.Random(42)
+    fillers = filler_entries(rng)
+    written = 0
+    with path.open("w", encoding="utf-8") as f:
+        f.write(json.dumps(todowrite_entry(0), ensure_ascii=False) + "\n")
+        index = 1
+        while written < size_bytes:
+            line = json.dumps(next(fillers), ensure_ascii=False) + "\n"
+            f.write(line)
+            written += len(line)
+            # 常見情況：整個 session 中持續呼叫 TodoWrite，最後一次位於檔尾附近
+            if todo_near_end and rng.random() < 0.02:
+                f.write(json.dumps(todowrite_entry(index), ensure_ascii=False) + "\n")
+                index += 1
+
+
+def baseline(path: Path, hook):
+    latest = None
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except Exception:
+                continue
+            latest = hook.match_todowrite(obj) or latest
+    return latest
+
+
+def prefilter(path: Path, hook):
+    latest = None
+    with path.open("rb", buffering=8 << 20) as f:
+        for line in f:
+            if hook.TODOWRITE_MARKER not in line:
+                continue
+            try:
+                obj = json.loads(line)
+            except Exception:
+                continue
+            latest = hook.match_todowrite(obj) or latest
+    return latest
+
+
+def reverse(path: Path, hook):
+    for line in hook.iter_lines_reversed(path):
+        if hook.TODOWRITE_MARKER not in line:
+            continue
+        try:
+            latest = hook.match_todowrite(json.loads(line))
+        except Exception:
+            continue
+        if latest:
+            return latest
+    return None
+
+
+def mmap_scan(path: Path, hook):
+    return hook.find_latest_todowrite(path)
+
+
+def measure(func, repeat: int) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="比較 Stop hook 尋找最後一次 TodoWrite 的各種掃描方式")
+    parser.add_argument("--size-mb", type=int, default=100, help="合成 transcript 大小 (MB，預設 100)")
+    parser.add_argument("--repeat", type=int, default=3, help="每種方式重複次數，取最佳值 (預設 3)")
+    args = parser.parse_args()
+
+    hook = load_hook_module()
+    with tempfile.TemporaryDirectory(prefix="bench-todo-hook-") as tmp:
+        for todo_near_end in (True, False):
+            path = Path(tmp) / "transcript.jsonl"
+            write_transcript(path, args.size_mb * 1024 * 1024, todo_near_end)
+            size_mb = path.stat().st_size / 1024 / 1024
+            scenario = "TodoWrite 位於檔尾附近" if todo_near_end else "TodoWrite 只在檔案開頭"
+            print(f"\n{scenario}（transcript {size_mb:.1f} MB）")
+            print(f"{'方式':<12} {'耗時(秒)':>10} {'加速':>8}")
+
+            checkpoint_file = Path(tmp) / "checkpoint.json"
+            checkpoint_file.unlink(missing_ok=True)
+            hook.find_latest_todowrite_incremental(path, checkpoint_file)
+
+            def checkpoint_turn():
+                # 模擬新的一輪：附加一行輸出後再次執行 hook
+                with path.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps({"type": "assistant", "message": {"content": [{"type": "text", "text": "ok"}]}}) + "\n")
+                return hook.find_latest_todowrite_incremental(path, checkpoint_file)
+
+            strategies = [
+                ("baseline", lambda: baseline(path, hook)),
+                ("prefilter", lambda: prefilter(path, hook)),
+                ("reverse", lambda: reverse(path, hook)),
+                ("mmap", lambda: mmap_scan(path, hook)),
+                ("checkpoint", checkpoint_turn),
+            ]
+            reference = None
+            baseline_seconds = None
+            for name, func in strategies:
+                seconds, result = measure(func, args.repeat)
+                if reference is None:
+                    reference, baseline_seconds = result, seconds
+                elif result != reference:
+                    raise SystemExit(f"✗ {name} 的結果與 baseline 不一致")
+                print(f"{name:<12} {seconds:>10.4f} {baseline_seconds / seconds:>7.1f}x")
+            path.unlink()
+
+
+if __name__ == "__main__":
+    main()
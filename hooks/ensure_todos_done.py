@@ -7,7 +7,7 @@ Stop hook: 若 transcript 裡的 Todo 還沒清空，就 block 停止並要求
 - hook 透過 stdin 給出 {"transcript_path": "...", "stop_hook_active": bool}。       # docs
 """
 
-import json, os, sys, re
+import hashlib, json, mmap, os, sys, re
 from pathlib import Path
 
 def emit_block(reason: str):
@@ -17,37 +17,170 @@ def emit_block(reason: str):
     sys.stdout.flush()  # 確保訊息被立即發送到 Claude Code
     sys.exit(0)
 
-def load_jsonl(path: Path):
+# 反向掃描時每次讀取的區塊大小；只有含此標記的行才需要 JSON 解碼
+BLOCK_SIZE = 1 << 20
+TODOWRITE_MARKER = b"TodoWrite"
+
+def iter_lines_reversed(path: Path, block_size: int = BLOCK_SIZE, start: int = 0, end: int = None):
+    # 從檔尾（或 end）往回逐塊讀取到 start，由最後一行開始依序產出（bytes，不含換行）。
+    # 讀取量只和「最後一次 TodoWrite 之後」的內容有關，不隨 transcript 總長度增加。
+    with path.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END) if end is None else end
+        tail = b""
+        while pos > start:
+            step = min(block_size, pos - start)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + tail).split(b"\n")
+            # 區塊開頭可能是被切斷的行，留待與前一個區塊合併
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                yield line
+        if tail:
+            yield tail
+
+def iter_todowrite_lines(path: Path, start: int = 0, end: int = None):
+    # 只產出含 "TodoWrite" 的行（由後往前）。優先以 mmap 直接反向搜尋標記位元組，
+    # 不需逐行切割或解碼其他內容（如巨大的 tool_result）；無法 mmap 時退回逐塊讀取。
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if end <= start:
+            return
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            mm = None
+        if mm is None:
+            for line in iter_lines_reversed(path, start=start, end=end):
+                if TODOWRITE_MARKER in line:
+                    yield line
+            return
+        with mm:
+            pos = end
+            while pos > start:
+                hit = mm.rfind(TODOWRITE_MARKER, start, pos)
+                if hit < 0:
+                    break
+                line_start = mm.rfind(b"\n", start, hit) + 1 or start
+                line_end = mm.find(b"\n", hit, end)
+                yield mm[line_start:end if line_end < 0 else line_end]
+                pos = line_start
+
+def match_todowrite(obj):
+    # 兼容不同訊息風格：stream-json 會有 message 物件，content 可能含 tool_use 區段。 # headless docs
+    # 2) 有些轉錄器會把工具呼叫拍扁到頂層（優先）
+    if obj.get("tool_name") == "TodoWrite" or obj.get("name") == "TodoWrite":
+        return obj
+    # 1) 直接在內容陣列找 tool_use（同一訊息有多次呼叫時取最後一次）
+    msg = obj.get("message") or obj
+    content = msg.get("content") if isinstance(msg, dict) else None
+    if isinstance(content, list):
+        for c in reversed(content):
+            # 兩種常見鍵名："tool_use".name 或 "tool_name"
+            if isinstance(c, dict) and (
+                (c.get("type") == "tool_use" and c.get("name") == "TodoWrite") or
+                (c.get("tool_name") == "TodoWrite")
+            ):
+                return c
+    return None
+
+def find_latest_todowrite(transcript_path: Path, start: int = 0, end: int = None):
+    # 由檔尾往回找，只解碼含 "TodoWrite" 的行，遇到第一個符合的呼叫就停止
     try:
-        with path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line=line.strip()
-                if not line: 
-                    continue
-                try:
-                    yield json.loads(line)
-                except Exception:
-                    continue
+        for line in iter_todowrite_lines(transcript_path, start=start, end=end):
+            try:
+                obj = json.loads(line)
+            except Exception:
+                continue
+            if not isinstance(obj, dict):
+                continue
+            latest = match_todowrite(obj)
+            if latest:
+                return latest
     except FileNotFoundError:
-        return
-
-def find_latest_todowrite(transcript_path: Path):
-    latest = None
-    for obj in load_jsonl(transcript_path):
-        # 兼容不同訊息風格：stream-json 會有 message 物件，content 可能含 tool_use 區段。 # headless docs
-        # 嘗試在多種欄位位置尋找 TodoWrite 的輸入。
-        # 1) 直接在內容陣列找 tool_use
-        msg = obj.get("message") or obj
-        content = msg.get("content") if isinstance(msg, dict) else None
-        if isinstance(content, list):
-            for c in content:
-                # 兩種常見鍵名："tool_use".name 或 "tool_name"
-                if (c.get("type") == "tool_use" and c.get("name") == "TodoWrite") or \
-                   (c.get("tool_name") == "TodoWrite"):
-                    latest = c
-        # 2) 有些轉錄器會把工具呼叫拍扁到頂層
-        if obj.get("tool_name") == "TodoWrite" or obj.get("name") == "TodoWrite":
-            latest = obj
+        pass
+    return None
+
+# checkpoint 以 offset 前這段內容的雜湊確認 transcript 沒有被改寫
+FINGERPRINT_SIZE = 256
+
+def fingerprint(f, offset: int) -> str:
+    start = max(0, offset - FINGERPRINT_SIZE)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+def last_line_end(f, size: int, start: int = 0) -> int:
+    # start 之後最後一個換行的下一個位置；尚未寫完的最後一行不計入 checkpoint，下次重新掃描
+    pos = size
+    while pos > start:
+        step = min(BLOCK_SIZE, pos - start)
+        pos -= step
+        f.seek(pos)
+        idx = f.read(step).rfind(b"\n")
+        if idx >= 0:
+            return pos + idx + 1
+    return start
+
+def load_checkpoint(checkpoint_file: Path):
+    try:
+        data = json.loads(checkpoint_file.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+def save_checkpoint(checkpoint_file: Path, data):
+    # 先寫暫存檔再 os.replace，避免同時觸發的 hook 讀到半成品
+    tmp = checkpoint_file.with_name(f".{checkpoint_file.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, checkpoint_file)
+    except Exception:
+        try: tmp.unlink()
+        except Exception: pass
+
+def scan_incremental(transcript_path: Path, cp):
+    # transcript 只會附加寫入：依 checkpoint（上次掃描到的 offset 與當時最新的 TodoWrite）
+    # 只掃描新增的部分。檔案被截斷、替換（inode 改變）或改寫時退回完整掃描。
+    # 回傳 (latest, 新的 checkpoint)；transcript 不存在時 checkpoint 為 None。
+    try:
+        stat = transcript_path.stat()
+    except OSError:
+        return None, None
+
+    with transcript_path.open("rb") as f:
+        start, latest = 0, None
+        offset = cp.get("offset")
+        if (
+            cp.get("transcript") == str(transcript_path)
+            and cp.get("inode") == stat.st_ino
+            and cp.get("device") == stat.st_dev
+            and isinstance(offset, int) and 0 <= offset <= stat.st_size
+            and cp.get("fingerprint") == fingerprint(f, offset)
+        ):
+            start, latest = offset, cp.get("latest")
+
+        found = find_latest_todowrite(transcript_path, start=start, end=stat.st_size)
+        if found:
+            latest = found
+        new_offset = last_line_end(f, stat.st_size, start)
+        new_fingerprint = fingerprint(f, new_offset)
+
+    return latest, {
+        "transcript": str(transcript_path),
+        "inode": stat.st_ino,
+        "device": stat.st_dev,
+        "size": stat.st_size,
+        "offset": new_offset,
+        "fingerprint": new_fingerprint,
+        "latest": latest,
+    }
+
+def find_latest_todowrite_incremental(transcript_path: Path, checkpoint_file: Path):
+    # checkpoint 保存在 .claude/state，讓每次 Stop 只解析新增的 transcript 內容
+    latest, cp = scan_incremental(transcript_path, load_checkpoint(checkpoint_file))
+    if cp is not None:
+        save_checkpoint(checkpoint_file, cp)
     return latest
 
 def extract_todos(tool_call_obj):
@@ -85,35 +218,64 @@ def has_unfinished(todos):
             unfinished.append(title.strip() or "(未命名待辦項目)")
     return unfinished
 
-def main():
+# 常駐模式：todo_hook_daemon.py 在此 Unix socket 上提供判斷結果，省去每次 Stop 重新掃描
+DAEMON_SOCKET_ENV = "SUNNYCORE_TODO_HOOK_SOCKET"
+DAEMON_TIMEOUT = 2.0
+MAX_RETRIES = 3
+
+def daemon_socket_path(project_dir: Path) -> Path:
+    return Path(os.environ.get(DAEMON_SOCKET_ENV) or project_dir/".claude/state/todo_hook.sock")
+
+def query_daemon(socket_path: Path, hook_input, project_dir: Path):
+    # 把 hook 輸入交給 daemon 並回傳其結果 {"block": reason 或 None}；
+    # daemon 不存在、無回應或回應異常時回傳 None，由呼叫端改為行程內判斷
+    if not socket_path.exists():
+        return None
+    import socket
     try:
-        hook_input = json.load(sys.stdin)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(DAEMON_TIMEOUT)
+            sock.connect(str(socket_path))
+            request = {"hook_input": hook_input, "project_dir": str(project_dir.absolute())}
+            sock.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        reply = json.loads(b"".join(chunks))
     except Exception:
-        # 無法解析就不擋，避免卡死
-        sys.exit(0)
+        return None
+    if not isinstance(reply, dict) or "block" not in reply:
+        return None
+    return reply
 
+def evaluate(hook_input, project_dir: Path, find_latest=find_latest_todowrite_incremental):
+    # 回傳需要阻擋停止的原因，放行時回傳 None（行程內模式與 daemon 共用）
     transcript_path = hook_input.get("transcript_path")
     stop_hook_active = bool(hook_input.get("stop_hook_active"))
-    project_dir = Path(os.environ.get("CLAUDE_PROJECT_DIR","."))
 
     # 防自鎖：如果已經因 stop hook 繼續過一次，就最多再擋一定次數
-    retry_file = project_dir/".claude/state/stop_retry_count"
-    retry_file.parent.mkdir(parents=True, exist_ok=True)
+    state_dir = project_dir/".claude/state"
+    retry_file = state_dir/"stop_retry_count"
+    checkpoint_file = state_dir/"todowrite_checkpoint.json"
+    state_dir.mkdir(parents=True, exist_ok=True)
     try:
         n = int(retry_file.read_text().strip())
     except Exception:
         n = 0
 
-    MAX_RETRIES = 3
     if n >= MAX_RETRIES:
         # 達到最大重試次數，清空計數並放行
         try: retry_file.unlink()
         except Exception: pass
-        sys.exit(0)
+        return None
 
     todos = []
     if transcript_path:
-        latest = find_latest_todowrite(Path(transcript_path))
+        latest = find_latest(Path(transcript_path), checkpoint_file)
         if latest:
             todos = extract_todos(latest)
 
@@ -122,18 +284,34 @@ def main():
         # 只在 stop_hook_active 時才累加重試計數
         if stop_hook_active:
             retry_file.write_text(str(n+1))
-        reason = (
+        return (
             "待辦項目：\n- "
             + "\n- ".join(unfinished[:10])
             + ("\n…(其餘略)" if len(unfinished) > 10 else "")
             + "\n\n請繼續完成。"
         )
-        emit_block(reason)
-    else:
-        # 都完成了，清掉計數並放行
-        try: retry_file.unlink()
-        except Exception: pass
+    # 都完成了，清掉計數並放行
+    try: retry_file.unlink()
+    except Exception: pass
+    return None
+
+def main():
+    try:
+        hook_input = json.load(sys.stdin)
+    except Exception:
+        # 無法解析就不擋，避免卡死
         sys.exit(0)
+    if not isinstance(hook_input, dict):
+        sys.exit(0)
+
+    project_dir = Path(os.environ.get("CLAUDE_PROJECT_DIR","."))
+
+    # 有常駐 daemon 時直接採用其結果，否則在本行程內判斷
+    reply = query_daemon(daemon_socket_path(project_dir), hook_input, project_dir)
+    reason = reply["block"] if reply is not None else evaluate(hook_input, project_dir)
+    if reason:
+        emit_block(reason)
+    sys.exit(0)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
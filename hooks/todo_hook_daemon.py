@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ensure_todos_done.py 的常駐模式（可選）。
+在 Unix socket 上提供 Stop hook 判斷，transcript 掃描狀態（offset、最新 TodoWrite）保存在記憶體中；
+ensure_todos_done.py 偵測到 socket 時只負責轉送 hook 輸入並輸出結果，daemon 不存在時自動改為行程內判斷。
+
+用法：
+    python3 .claude/hooks/todo_hook_daemon.py [--project-dir DIR] [--socket PATH] [--idle-timeout 秒]
+預設 socket 為 $CLAUDE_PROJECT_DIR/.claude/state/todo_hook.sock（可用環境變數 SUNNYCORE_TODO_HOOK_SOCKET 覆寫），
+閒置超過 --idle-timeout（預設 3600 秒，0 表示不限）後自動結束並移除 socket。
+"""
+
+import argparse, json, os, signal, socket, socketserver, sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import ensure_todos_done as hook  # noqa: E402
+
+# 每個 transcript 的掃描 checkpoint，只存在記憶體中
+checkpoints = {}
+
+def find_latest_in_memory(transcript_path: Path, checkpoint_file: Path):
+    latest, cp = hook.scan_incremental(transcript_path, checkpoints.get(str(transcript_path), {}))
+    if cp is not None:
+        checkpoints[str(transcript_path)] = cp
+    return latest
+
+class HookRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            hook_input = request["hook_input"]
+            project_dir = Path(request["project_dir"])
+            reply = {"block": hook.evaluate(hook_input, project_dir, find_latest_in_memory)}
+        except Exception as e:
+            # 回傳錯誤讓 client 改為行程內判斷
+            reply = {"error": str(e)}
+        self.wfile.write(json.dumps(reply, ensure_ascii=False).encode("utf-8"))
+
+class HookServer(socketserver.UnixStreamServer):
+    # 逐一處理請求：判斷只需數毫秒，序列化處理也避免共用狀態的競爭
+    idle = False
+
+    def handle_timeout(self):
+        self.idle = True
+
+def socket_in_use(socket_path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(hook.DAEMON_TIMEOUT)
+        try:
+            sock.connect(str(socket_path))
+            return True
+        except OSError:
+            return False
+
+def main():
+    parser = argparse.ArgumentParser(description="ensure_todos_done Stop hook 常駐 daemon")
+    parser.add_argument("--project-dir", default=os.environ.get("CLAUDE_PROJECT_DIR", "."), help="專案目錄（預設: $CLAUDE_PROJECT_DIR 或目前目錄）")
+    parser.add_argument("--socket", help="Unix socket 路徑（預設: <project-dir>/.claude/state/todo_hook.sock）")
+    parser.add_argument("--idle-timeout", type=float, default=3600, help="閒置多少秒後自動結束（預設 3600，0 表示不限）")
+    args = parser.parse_args()
+
+    project_dir = Path(args.project_dir).absolute()
+    socket_path = Path(args.socket) if args.socket else hook.daemon_socket_path(project_dir)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        if socket_in_use(socket_path):
+            print(f"daemon 已在執行: {socket_path}", file=sys.stderr)
+            sys.exit(1)
+        # 上次異常結束留下的 socket 文件
+        socket_path.unlink()
+
+    old_umask = os.umask(0o077)  # socket 只允許目前使用者連線
+    try:
+        server = HookServer(str(socket_path), HookRequestHandler)
+    finally:
+        os.umask(old_umask)
+    server.timeout = args.idle_timeout or None
+    # SIGTERM 也走正常結束流程，確保移除 socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"todo hook daemon 已啟動: {socket_path}", file=sys.stderr)
+    try:
+        while not server.idle:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try: socket_path.unlink()
+        except Exception: pass
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,31 @@ Sunnycore 安裝腳本
 """
 
 import argparse
+import asyncio
+import base64
+import hashlib
+import http.client
+import io
 import json
 import os
+import queue
 import shutil
+import socket
+import ssl
+import subprocess
 import sys
+import tarfile
+import tempfile
 import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
+import zlib
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 class ProgressBar:
@@ -31,15 +44,17 @@ class ProgressBar:
     COLOR_BLUE = "\033[94m"
     COLOR_GREY = "\033[90m"
     
-    def __init__(self, total: int, width: int = 40, prefix: str = "下載進度"):
+    def __init__(self, total: int, width: int = 40, prefix: str = "下載進度", growing: bool = False):
         """初始化進度條
         
         Args:
             total: 總任務數
             width: 進度條寬度
             prefix: 進度條前綴文字
+            growing: 總數是否會隨掃描持續增加（完成前以 add_total 增加、close_total 結束）
         """
         self.total = total
+        self.growing = growing
         self.width = width
         self.prefix = prefix
         self.current = 0
@@ -68,8 +83,21 @@ class ProgressBar:
                 self._display()
                 self.last_update_time = current_time
     
+    def add_total(self, increment: int = 1):
+        """掃描過程中發現新的任務時增加總數"""
+        with self.lock:
+            self.total += increment
+    
+    def close_total(self):
+        """掃描結束，總數不再增加"""
+        with self.lock:
+            self.growing = False
+            if self.total:
+                self._display()
+    
     def _display(self):
         """顯示進度條（帶動畫效果）"""
+        done = self.current >= self.total and not self.growing
         percent = self.current / self.total if self.total > 0 else 0
         filled = int(self.width * percent)
         
@@ -89,10 +117,13 @@ class ProgressBar:
         
         # 格式化時間
         elapsed_str = self._format_time(elapsed)
-        remaining_str = self._format_time(remaining) if remaining > 0 and self.current < self.total else "完成"
+        if self.growing:
+            remaining_str = "掃描中"
+        else:
+            remaining_str = self._format_time(remaining) if remaining > 0 and not done else "完成"
         
         # 旋轉動畫符號（只在未完成時顯示）
-        spinner = self.SPINNERS[self.spinner_index % len(self.SPINNERS)] if self.current < self.total else '✓'
+        spinner = self.SPINNERS[self.spinner_index % len(self.SPINNERS)] if not done else '✓'
         self.spinner_index += 1
         
         # 顯示狀態
@@ -102,7 +133,7 @@ class ProgressBar:
         
         # 顯示進度條（緊湊格式）
         bar_colored = f"{self.COLOR_GREEN}{bar}{self.COLOR_RESET}"
-        spinner_color = self.COLOR_BLUE if self.current < self.total else self.COLOR_GREEN
+        spinner_color = self.COLOR_BLUE if not done else self.COLOR_GREEN
         status_color = self.COLOR_GREEN if self.failed == 0 else self.COLOR_YELLOW
         fail_color = self.COLOR_RED if self.failed else self.COLOR_RESET
         speed_color = self.COLOR_BLUE if speed > 0 else self.COLOR_GREY
@@ -113,7 +144,7 @@ class ProgressBar:
 
         output = (
             f"\r{spinner_color}{spinner}{self.COLOR_RESET} {self.prefix}: "
-            f"[{bar_colored}] {percent*100:.1f}% ({status_text}/{self.total}) "
+            f"[{bar_colored}] {percent*100:.1f}% ({status_text}/{self.total}{'+' if self.growing else ''}) "
             f"| {speed_color}{speed:.1f} 檔/秒{self.COLOR_RESET} | {elapsed_str} / {remaining_str}   "
         )
 
@@ -173,9 +204,1239 @@ def safe_input(prompt: str) -> str:
         raise EOFError("無法讀取用戶輸入")
 
 
+def git_blob_sha(data: bytes) -> str:
+    """計算與 GitHub 相同的 git blob SHA-1
+
+    Args:
+        data: 文件內容
+
+    Returns:
+        str: 40 字元的十六進位 SHA
+    """
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def file_blob_sha(path: Path) -> Tuple[str, int]:
+    """以固定大小區塊讀取文件並計算 git blob SHA-1
+
+    Returns:
+        Tuple[str, int]: (blob SHA, 文件大小)
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        hasher = hashlib.sha1(b"blob %d\0" % size)
+        for chunk in iter(lambda: f.read(AtomicDownload.CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest(), size
+
+
+def copy_file_fast(source_path: Path, target_path: Path):
+    """在核心內複製文件內容：優先使用 os.copy_file_range（支援的檔案系統上可共用資料區塊），
+    不支援時改用 shutil.copyfile（Linux 上以 sendfile 複製）
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+                while os.copy_file_range(src.fileno(), dst.fileno(), 1 << 30):
+                    pass
+            return
+        except OSError:
+            pass  # 舊核心或跨檔案系統不支援時改用 shutil.copyfile
+    shutil.copyfile(source_path, target_path)
+
+
+def is_git_bundle(path: Path) -> bool:
+    """以檔頭判斷是否為 git bundle（v2 / v3）"""
+    try:
+        with open(path, 'rb') as f:
+            return f.readline().strip() in (b"# v2 git bundle", b"# v3 git bundle")
+    except OSError:
+        return False
+
+
+def tar_strip_depth(archive: tarfile.TarFile) -> int:
+    """所有成員都位於同一個頂層目錄時（如 GitHub tarball 的 {repo}-{branch}/）回傳 1，否則回傳 0"""
+    names = [member.name for member in archive.getmembers()]
+    tops = {name.split('/', 1)[0] for name in names}
+    return 1 if len(tops) == 1 and any('/' in name for name in names) else 0
+
+
+def git_tracked_files(path: Path) -> Optional[List[str]]:
+    """列出本地倉庫中受 git 追蹤的文件（相對路徑，不是 git 倉庫或沒有 git 指令時回傳 None）"""
+    if not (path / '.git').exists() or not shutil.which('git'):
+        return None
+    try:
+        result = subprocess.run(
+            ['git', '-C', str(path), 'ls-files', '-z'],
+            check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return [name for name in result.stdout.decode('utf-8', errors='surrogateescape').split('\0') if name]
+
+
+def git_head_commit(path: Path) -> Optional[str]:
+    """讀取本地倉庫 HEAD 的 commit SHA
+
+    追蹤中的文件有未提交的修改時，安裝內容與 HEAD 不一致，此時同樣回傳 None
+    （不是 git 倉庫或沒有 git 指令時亦回傳 None）。
+    """
+    if not (path / '.git').exists() or not shutil.which('git'):
+        return None
+    try:
+        result = subprocess.run(
+            ['git', '-C', str(path), 'rev-parse', 'HEAD'],
+            check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        status = subprocess.run(
+            ['git', '-C', str(path), 'status', '--porcelain', '--untracked-files=no'],
+            check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if status.stdout.strip():
+        return None
+    commit = result.stdout.decode().strip()
+    return commit if len(commit) == 40 else None
+
+
+def link_or_copy(source_path: Path, target_path: Path, use_hardlinks: bool = False):
+    """將已存在的文件放置到另一個目標路徑（先寫入同目錄暫存檔，再以 os.replace 原子替換）
+
+    Args:
+        source_path: 來源文件
+        target_path: 目標路徑
+        use_hardlinks: 是否以硬連結取代複製（跨檔案系統等情況失敗時自動改用複製）
+    """
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target_path.with_name(f".{target_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        linked = False
+        if use_hardlinks:
+            try:
+                os.link(source_path, tmp_path)
+                linked = True
+            except OSError:
+                pass
+        if not linked:
+            copy_file_fast(source_path, tmp_path)
+        os.replace(tmp_path, target_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def default_cache_dir() -> Path:
+    """取得預設快取目錄（SUNNYCORE_CACHE_DIR > XDG_CACHE_HOME > ~/.cache）"""
+    configured = os.environ.get('SUNNYCORE_CACHE_DIR')
+    if configured:
+        return Path(os.path.expanduser(configured))
+    xdg_cache = os.environ.get('XDG_CACHE_HOME')
+    base = Path(os.path.expanduser(xdg_cache)) if xdg_cache else Path.home() / ".cache"
+    return base / "sunnycore"
+
+
+class AtomicDownload:
+    """將下載內容串流寫入目標目錄內的暫存檔，校驗後以 os.replace 原子替換目標文件
+
+    每次只在記憶體中保留一個區塊，峰值記憶體約為「並行數 × CHUNK_SIZE」；
+    寫入途中失敗或校驗不符時刪除暫存檔，目標路徑不會出現截斷的文件。
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, target_path: Path, expected_size: Optional[int] = None, expected_sha: Optional[str] = None):
+        """建立暫存檔
+
+        Args:
+            target_path: 最終目標路徑（暫存檔建立於同一目錄以便原子替換）
+            expected_size: 預期大小（來自目錄清單，None 表示不校驗）
+            expected_sha: 預期的 git blob SHA（來自目錄清單，None 表示不校驗）
+        """
+        self.target_path = target_path
+        self.expected_size = expected_size
+        self.expected_sha = expected_sha
+        self.size = 0
+        # 已知大小時可在寫入同時計算 blob SHA，否則於完成後重新讀取暫存檔計算
+        self._hasher = hashlib.sha1(b"blob %d\0" % expected_size) if expected_size is not None else None
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{target_path.name}.", suffix=".tmp", dir=target_path.parent)
+        self.tmp_path = Path(tmp_name)
+        self._file = os.fdopen(fd, 'wb')
+        self._sha: Optional[str] = None
+        self._committed = False
+
+    def __enter__(self) -> "AtomicDownload":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if not self._committed:
+            self.abort()
+
+    def write(self, chunk: bytes):
+        """寫入一個區塊"""
+        self.size += len(chunk)
+        if self._hasher is not None:
+            self._hasher.update(chunk)
+        self._file.write(chunk)
+
+    def copy_from(self, source, decoder: Optional["ContentDecoder"] = None):
+        """以固定大小區塊從可讀取的串流複製全部內容（提供 decoder 時先經其解壓）"""
+        write = decoder.write if decoder is not None else self.write
+        while True:
+            chunk = source.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            write(chunk)
+        if decoder is not None:
+            decoder.finish()
+
+    def finish(self) -> str:
+        """寫入完成：關閉暫存檔並校驗大小與 SHA，但不替換目標文件
+
+        Returns:
+            str: 內容的 git blob SHA
+
+        Raises:
+            ValueError: 大小或 SHA 與目錄清單不符
+        """
+        if self._sha is not None:
+            return self._sha
+        self._file.close()
+        if self.expected_size is not None and self.size != self.expected_size:
+            raise ValueError(f"內容校驗失敗: 預期 {self.expected_size} 位元組，實際 {self.size} 位元組")
+        if self._hasher is not None:
+            sha = self._hasher.hexdigest()
+        else:
+            hasher = hashlib.sha1(b"blob %d\0" % self.size)
+            with open(self.tmp_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+            sha = hasher.hexdigest()
+        if self.expected_sha and sha != self.expected_sha:
+            raise ValueError(f"內容校驗失敗: 預期 SHA {self.expected_sha[:12]}，實際 {sha[:12]}")
+        self._sha = sha
+        return sha
+
+    def commit(self) -> str:
+        """校驗大小與 SHA 後原子替換目標文件
+
+        Returns:
+            str: 內容的 git blob SHA
+
+        Raises:
+            ValueError: 大小或 SHA 與目錄清單不符
+        """
+        sha = self.finish()
+        os.replace(self.tmp_path, self.target_path)
+        self._committed = True
+        return sha
+
+    def abort(self):
+        """放棄下載並刪除暫存檔"""
+        self._file.close()
+        try:
+            self.tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ContentDecoder:
+    """依 Content-Encoding（gzip / deflate）以 zlib 串流解壓回應本文，並交給 sink
+
+    每次最多解壓出 AtomicDownload.CHUNK_SIZE 位元組再交給 sink，高壓縮比的內容也不會在記憶體中展開；
+    同時記錄網路上實際傳輸的位元組數（wire_bytes）與解壓後的位元組數（decoded_bytes）。
+    """
+
+    ACCEPT_ENCODING = "gzip, deflate"
+
+    def __init__(self, sink: Callable[[bytes], None]):
+        self.sink = sink
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.encoding = ""
+        self._decompressor = None
+
+    def start(self, headers):
+        """依回應標頭選擇解壓方式（未壓縮時直接轉交）
+
+        Raises:
+            ValueError: 不支援的 Content-Encoding
+        """
+        self.encoding = (headers.get('Content-Encoding') or '').strip().lower()
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        if self.encoding in ('', 'identity'):
+            self._decompressor = None
+        elif self.encoding in ('gzip', 'x-gzip'):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == 'deflate':
+            self._decompressor = zlib.decompressobj(zlib.MAX_WBITS)
+        else:
+            raise ValueError(f"不支援的內容編碼: {self.encoding}")
+
+    def write(self, chunk: bytes):
+        """接收一個網路區塊"""
+        first = self.wire_bytes == 0
+        self.wire_bytes += len(chunk)
+        if self._decompressor is None:
+            self._emit(chunk)
+            return
+        try:
+            data = self._decompressor.decompress(chunk, AtomicDownload.CHUNK_SIZE)
+        except zlib.error:
+            # 部分伺服器的 deflate 為不含 zlib 標頭的原始串流
+            if not (first and self.encoding == 'deflate'):
+                raise ValueError("壓縮內容損毀")
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            data = self._decompressor.decompress(chunk, AtomicDownload.CHUNK_SIZE)
+        self._emit(data)
+        while self._decompressor.unconsumed_tail:
+            self._emit(self._decompressor.decompress(self._decompressor.unconsumed_tail, AtomicDownload.CHUNK_SIZE))
+
+    def finish(self):
+        """輸出剩餘內容並確認壓縮串流完整
+
+        Raises:
+            ValueError: 壓縮串流提前結束
+        """
+        if self._decompressor is None:
+            return
+        self._emit(self._decompressor.flush())
+        if not self._decompressor.eof:
+            raise ValueError("壓縮內容不完整")
+
+    def _emit(self, data: bytes):
+        if data:
+            self.decoded_bytes += len(data)
+            self.sink(data)
+
+    @classmethod
+    def decode(cls, headers, body: bytes) -> bytes:
+        """解壓已完整讀取的回應本文"""
+        chunks: List[bytes] = []
+        decoder = cls(chunks.append)
+        decoder.start(headers)
+        decoder.write(body)
+        decoder.finish()
+        return b"".join(chunks)
+
+
+class DownloadCache:
+    """以 blob SHA 為鍵的本地下載快取（內容定址 + LRU 淘汰）
+
+    目錄結構：
+        objects/ab/cdef...   以 blob SHA 命名的文件內容
+        listings/<key>.json  以 (repo, ref, path) 為鍵的目錄清單與單檔中繼資料
+    """
+
+    def __init__(self, root: Path, max_bytes: int, use_hardlinks: bool = False):
+        """初始化快取
+
+        Args:
+            root: 快取根目錄
+            max_bytes: objects 總大小上限（位元組），超過時依最近使用時間淘汰
+            use_hardlinks: 是否以硬連結取代複製來還原文件
+        """
+        self.root = root
+        self.objects_dir = root / "objects"
+        self.listings_dir = root / "listings"
+        self.max_bytes = max_bytes
+        self.use_hardlinks = use_hardlinks
+
+    def object_path(self, sha: str) -> Path:
+        """取得 blob 在快取中的路徑"""
+        return self.objects_dir / sha[:2] / sha[2:]
+
+    def _atomic_write(self, path: Path, writer: Callable[[Path], None]):
+        """寫入暫存檔後以 os.replace 原子替換，避免並行行程讀到半成品"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            writer(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def materialize(self, sha: str, target_path: Path) -> bool:
+        """從快取還原文件到目標路徑
+
+        使用前重新計算快取物件的 blob SHA：--hardlink 模式下已安裝文件與快取物件共用 inode，
+        使用者就地修改已安裝文件時快取物件也會被改寫，校驗不符時刪除該物件並視為未命中。
+        還原時先寫入目標目錄內的暫存檔再以 os.replace 原子替換，中途失敗不會留下截斷的文件。
+
+        Args:
+            sha: blob SHA
+            target_path: 本地目標路徑
+
+        Returns:
+            bool: 快取命中並還原成功時為 True
+        """
+        object_path = self.object_path(sha)
+        try:
+            if not object_path.is_file():
+                return False
+            if file_blob_sha(object_path)[0] != sha:
+                object_path.unlink()
+                return False
+            linked = False
+            if self.use_hardlinks:
+                try:
+                    self._atomic_write(target_path, lambda tmp: os.link(object_path, tmp))
+                    linked = True
+                except OSError:
+                    pass  # 跨檔案系統等情況無法建立硬連結時改用複製
+            if not linked:
+                self._atomic_write(target_path, lambda tmp: copy_file_fast(object_path, tmp))
+            # 以 mtime 記錄最近使用時間，供 LRU 淘汰使用
+            os.utime(object_path)
+            return True
+        except OSError:
+            return False
+
+    def store(self, sha: str, source_path: Path):
+        """將已下載的文件複製（或硬連結）進快取（已存在時僅更新使用時間）"""
+        object_path = self.object_path(sha)
+        try:
+            if object_path.is_file():
+                os.utime(object_path)
+                return
+            if self.use_hardlinks:
+                try:
+                    self._atomic_write(object_path, lambda tmp: os.link(source_path, tmp))
+                    return
+                except OSError:
+                    pass  # 跨檔案系統時改用複製
+            self._atomic_write(object_path, lambda tmp: shutil.copyfile(source_path, tmp))
+        except OSError:
+            pass  # 快取失敗不影響安裝
+
+    def _listing_path(self, repo: str, ref: str, path: str) -> Path:
+        key = hashlib.sha1(f"{repo}@{ref}:{path}".encode("utf-8")).hexdigest()
+        return self.listings_dir / f"{key}.json"
+
+    def load_listing(self, repo: str, ref: str, path: str):
+        """讀取快取的目錄清單或單檔中繼資料，不存在時回傳 None"""
+        return self.load_listing_entry(repo, ref, path)[0]
+
+    def load_listing_entry(self, repo: str, ref: str, path: str) -> Tuple[Any, Optional[str]]:
+        """讀取快取的清單與其 ETag（供條件請求使用），不存在時回傳 (None, None)"""
+        try:
+            with open(self._listing_path(repo, ref, path), 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            return payload["body"], payload.get("etag")
+        except (OSError, ValueError, KeyError, TypeError):
+            return None, None
+
+    def save_listing(self, repo: str, ref: str, path: str, body, etag: Optional[str] = None):
+        """保存目錄清單或單檔中繼資料（有 ETag 時一併保存，下次以 If-None-Match 重新驗證）"""
+        entry = {"repo": repo, "ref": ref, "path": path, "body": body}
+        if etag:
+            entry["etag"] = etag
+        payload = json.dumps(entry, ensure_ascii=False)
+        try:
+            self._atomic_write(
+                self._listing_path(repo, ref, path),
+                lambda tmp: tmp.write_text(payload, encoding='utf-8'),
+            )
+        except OSError:
+            pass
+
+    def evict(self) -> Tuple[int, int]:
+        """依最近使用時間淘汰 objects，直到總大小低於上限
+
+        Returns:
+            Tuple[int, int]: (移除的文件數, 釋放的位元組數)
+        """
+        entries = []
+        total = 0
+        for object_path in self.objects_dir.glob("*/*"):
+            try:
+                stat = object_path.stat()
+            except OSError:
+                continue
+            if object_path.name.startswith('.'):
+                continue
+            entries.append((stat.st_mtime, stat.st_size, object_path))
+            total += stat.st_size
+
+        removed = 0
+        freed = 0
+        for _, size, object_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                object_path.unlink()
+            except OSError:
+                continue
+            total -= size
+            freed += size
+            removed += 1
+        return removed, freed
+
+
+class AdaptiveConcurrencyController:
+    """AIMD 自適應並行度控制器
+
+    每完成一個「視窗」（目前並行上限數量的成功請求）且吞吐量仍在提升時，並行上限加 1；
+    遇到 429/403、逾時或延遲暴增時，並行上限減半。同時遵循 Retry-After 與
+    X-RateLimit-Remaining / X-RateLimit-Reset 標頭，必要時暫停所有請求。
+    可由多個執行緒（acquire）或 asyncio 事件迴圈（try_acquire）共用。
+    """
+
+    # 速率限制額度用盡時最多暫停的秒數（X-RateLimit-Reset 可能在一小時後，超過時只暫停此上限並提示）
+    MAX_RATE_LIMIT_PAUSE = 120.0
+
+    def __init__(
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        latency_spike_factor: float = 3.0,
+    ):
+        """初始化控制器
+
+        Args:
+            initial: 初始並行上限
+            minimum: 並行上限下限
+            maximum: 並行上限上限（--max-workers）
+            latency_spike_factor: 延遲超過基準延遲的倍數時視為壅塞
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.latency_spike_factor = latency_spike_factor
+        self.in_flight = 0
+        self.peak_limit = int(self.limit)
+        self.increases = 0
+        self.decreases = 0
+        self._condition = threading.Condition()
+        self._baseline_latency: Optional[float] = None
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._window_successes = 0
+        self._window_start = time.monotonic()
+        self._last_throughput = 0.0
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    def pause_remaining(self) -> float:
+        """距離暫停結束的秒數（未暫停時為 0）"""
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def try_acquire(self) -> bool:
+        """嘗試取得一個並行名額（不阻塞）"""
+        with self._condition:
+            if self.pause_remaining() > 0 or self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self):
+        """取得一個並行名額（阻塞直到有名額且未暫停）"""
+        with self._condition:
+            while True:
+                pause = self.pause_remaining()
+                if pause <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self._condition.wait(timeout=pause if pause > 0 else 0.5)
+
+    def release(self):
+        """歸還並行名額"""
+        with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._condition.notify_all()
+
+    def record_success(self, latency: float, headers=None):
+        """記錄成功的請求：延遲正常時累積視窗並在吞吐量提升時加大並行上限"""
+        with self._condition:
+            self._observe_rate_limit_headers(headers)
+            if self._baseline_latency is None:
+                self._baseline_latency = latency
+            elif latency > self._baseline_latency * self.latency_spike_factor and latency > 0.05:
+                self._decrease()
+                return
+            else:
+                # 以指數移動平均追蹤基準延遲，對下降反應較快、對上升反應較慢
+                weight = 0.3 if latency < self._baseline_latency else 0.05
+                self._baseline_latency += (latency - self._baseline_latency) * weight
+
+            self._window_successes += 1
+            if self._window_successes < int(self.limit):
+                return
+            elapsed = max(time.monotonic() - self._window_start, 1e-6)
+            throughput = self._window_successes / elapsed
+            if throughput >= self._last_throughput * 0.95 and self.limit < self.maximum:
+                self.limit = min(self.maximum, self.limit + 1)
+                self.peak_limit = max(self.peak_limit, int(self.limit))
+                self.increases += 1
+                self._condition.notify_all()
+            self._last_throughput = throughput
+            self._window_successes = 0
+            self._window_start = time.monotonic()
+
+    def record_throttle(self, headers=None):
+        """記錄 429/403：並行上限減半，並依 Retry-After 暫停"""
+        with self._condition:
+            self._observe_rate_limit_headers(headers)
+            retry_after = headers.get('Retry-After') if headers is not None else None
+            if retry_after:
+                try:
+                    self._pause(float(retry_after))
+                except ValueError:
+                    pass
+            self._decrease()
+
+    def record_timeout(self):
+        """記錄逾時：並行上限減半"""
+        with self._condition:
+            self._decrease()
+
+    def _observe_rate_limit_headers(self, headers):
+        """依 X-RateLimit-Remaining 收斂並行上限，額度用盡時暫停到 X-RateLimit-Reset"""
+        if headers is None:
+            return
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None:
+            return
+        try:
+            remaining = int(remaining)
+        except ValueError:
+            return
+        if remaining <= 0:
+            reset = headers.get('X-RateLimit-Reset')
+            try:
+                wait = max(1.0, float(reset) - time.time()) if reset else 60.0
+            except ValueError:
+                wait = 60.0
+            pause = min(wait, self.MAX_RATE_LIMIT_PAUSE)
+            # 同一次暫停只提示一次，避免並行請求重複輸出
+            if self._paused_until < time.monotonic() + pause - 1:
+                if wait > pause:
+                    print(
+                        f"\n  ⚠ GitHub API 速率限制額度已用盡，約 {wait / 60:.0f} 分鐘後重置；"
+                        f"先暫停 {pause:.0f} 秒後再試（建議設置 GITHUB_TOKEN 提高速率限制）",
+                        flush=True,
+                    )
+                else:
+                    print(f"\n  ⚠ GitHub API 速率限制額度已用盡，暫停 {pause:.0f} 秒等待額度重置...", flush=True)
+            self._pause(pause)
+        if remaining < self.limit:
+            self.limit = float(max(self.minimum, remaining))
+
+    def _pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _decrease(self):
+        now = time.monotonic()
+        # 同一波壅塞只減半一次（冷卻時間為基準延遲的兩倍，至少 0.5 秒）
+        cooldown = max(0.5, 2 * (self._baseline_latency or 0))
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit / 2)
+        self.decreases += 1
+        self._window_successes = 0
+        self._window_start = now
+        self._last_throughput = 0.0
+
+    def summary(self) -> str:
+        """並行度調整統計"""
+        return (
+            f"並行上限 {self.current_limit}（峰值 {self.peak_limit}，上限 {self.maximum}），"
+            f"增加 {self.increases} 次，減半 {self.decreases} 次"
+        )
+
+
+class HttpConnectionPool:
+    """以 http.client 實作的 HTTP/1.1 keep-alive 連線池
+
+    依 (scheme, host, port) 保存閒置連線，各工作執行緒輪流借用，
+    避免每個請求都重新進行 TCP 與 TLS 握手。支援 HTTP(S)_PROXY 環境變數。
+    """
+
+    REDIRECT_CODES = (301, 302, 303, 307, 308)
+    # 重用閒置連線時，伺服器可能已關閉該連線，這些錯誤可改用新連線重送一次
+    STALE_CONNECTION_ERRORS = (
+        http.client.RemoteDisconnected,
+        http.client.CannotSendRequest,
+        http.client.BadStatusLine,
+        ConnectionResetError,
+        BrokenPipeError,
+    )
+
+    def __init__(self, timeout: float = 30, max_idle_per_host: int = 64):
+        """初始化連線池
+
+        Args:
+            timeout: 連線與讀取逾時（秒）
+            max_idle_per_host: 每個主機最多保留的閒置連線數
+        """
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        # (scheme, host, port) -> [(連線, 是否以絕對 URL 經 HTTP 代理發送), ...]
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[http.client.HTTPConnection, bool]]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+        self._proxies = urllib.request.getproxies()
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    def _proxy_for(self, scheme: str, host: str) -> Optional[urllib.parse.SplitResult]:
+        """依環境變數取得代理伺服器設定"""
+        proxy = self._proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        if '://' not in proxy:
+            proxy = f"http://{proxy}"
+        return urllib.parse.urlsplit(proxy)
+
+    def _new_connection(self, scheme: str, host: str, port: int) -> Tuple[http.client.HTTPConnection, bool]:
+        """建立新連線
+
+        Returns:
+            Tuple[HTTPConnection, bool]: (連線, 是否以絕對網址透過 HTTP 代理發送請求)
+        """
+        proxy = self._proxy_for(scheme, host)
+        proxy_headers = {}
+        if proxy and proxy.username:
+            credentials = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+            proxy_headers["Proxy-Authorization"] = "Basic " + base64.b64encode(credentials.encode()).decode()
+
+        if scheme == 'https':
+            if proxy:
+                conn = http.client.HTTPSConnection(
+                    proxy.hostname, proxy.port or 8080, timeout=self.timeout, context=self._ssl_context
+                )
+                conn.set_tunnel(host, port, headers=proxy_headers)
+            else:
+                conn = http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self._ssl_context)
+            return conn, False
+
+        if proxy:
+            return http.client.HTTPConnection(proxy.hostname, proxy.port or 8080, timeout=self.timeout), True
+        return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+    def _acquire(self, key: Tuple[str, str, int]):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn, absolute_form = idle.pop()
+                return conn, absolute_form, True
+        conn, absolute_form = self._new_connection(*key)
+        with self._lock:
+            self.connections_created += 1
+        return conn, absolute_form, False
+
+    def _release(self, key: Tuple[str, str, int], conn, absolute_form: bool, response: http.client.HTTPResponse):
+        """回應已完整讀取且伺服器允許持續連線時放回連線池，否則關閉"""
+        if response.isclosed() and not response.will_close:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle_per_host:
+                    idle.append((conn, absolute_form))
+                    return
+        conn.close()
+
+    def _send(self, url: str, headers: Dict[str, str], method: str):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            raise urllib.error.URLError(f"不支援的協定: {scheme}")
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        for attempt in range(2):
+            conn, absolute_form, reused = self._acquire(key)
+            try:
+                conn.request(method, url if absolute_form else path, headers=headers)
+                response = conn.getresponse()
+            except self.STALE_CONNECTION_ERRORS as error:
+                conn.close()
+                # 伺服器已關閉閒置連線：getresponse() 之前尚未讀取任何本文，可安全地以新連線重送一次
+                if reused and attempt == 0:
+                    continue
+                raise urllib.error.URLError(error)
+            except (OSError, http.client.HTTPException) as error:
+                conn.close()
+                raise urllib.error.URLError(error)
+            with self._lock:
+                self.requests += 1
+                if reused:
+                    self.connections_reused += 1
+            return key, conn, absolute_form, response
+        raise urllib.error.URLError("連線已被伺服器關閉")
+
+    @contextmanager
+    def open(self, url: str, headers: Optional[Dict[str, str]] = None, method: str = "GET", max_redirects: int = 5):
+        """發出請求並回傳回應（需在 with 區塊內讀取完畢，連線才會放回連線池）
+
+        Args:
+            url: 請求網址
+            headers: 請求標頭
+            method: HTTP 方法
+            max_redirects: 最多跟隨的重新導向次數
+
+        Yields:
+            http.client.HTTPResponse: 回應物件
+
+        Raises:
+            urllib.error.HTTPError: 回應狀態碼 >= 400
+            urllib.error.URLError: 連線失敗
+        """
+        headers = dict(headers or {})
+        for _ in range(max_redirects + 1):
+            key, conn, absolute_form, response = self._send(url, headers, method)
+            location = response.getheader('Location')
+            is_redirect = response.status in self.REDIRECT_CODES and location
+            if is_redirect or response.status >= 400:
+                try:
+                    body = response.read()
+                except (OSError, http.client.HTTPException) as error:
+                    conn.close()
+                    raise urllib.error.URLError(error)
+                self._release(key, conn, absolute_form, response)
+                if is_redirect:
+                    url = urllib.parse.urljoin(url, location)
+                    continue
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+
+            try:
+                yield response
+            except BaseException:
+                conn.close()
+                raise
+            self._release(key, conn, absolute_form, response)
+            return
+        raise urllib.error.URLError("重新導向次數過多")
+
+    def summary(self) -> str:
+        """連線重用統計"""
+        return (
+            f"{self.requests} 次 HTTP 請求，新建 {self.connections_created} 條連線，"
+            f"重用連線 {self.connections_reused} 次"
+        )
+
+    def close(self):
+        """關閉所有閒置連線"""
+        with self._lock:
+            idle_lists = list(self._idle.values())
+            self._idle.clear()
+        for idle in idle_lists:
+            for conn, _ in idle:
+                conn.close()
+
+
+class AsyncHttpClient:
+    """以 asyncio streams 實作的精簡 HTTP/1.1 用戶端
+
+    所有請求在單一事件迴圈上執行，依 (scheme, host, port) 重用 keep-alive 連線，
+    支援 Content-Length 與 chunked 回應。錯誤型別與 HttpConnectionPool 一致
+    （urllib.error.HTTPError / URLError），以便共用重試與錯誤格式化邏輯。
+    """
+
+    REDIRECT_CODES = HttpConnectionPool.REDIRECT_CODES
+
+    def __init__(self, timeout: float = 30):
+        """初始化用戶端
+
+        Args:
+            timeout: 單一請求逾時（秒）
+        """
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]]] = {}
+        self._ssl_context = ssl.create_default_context()
+        self._proxies = urllib.request.getproxies()
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    def supports(self, url: str) -> bool:
+        """檢查是否能處理該網址（HTTPS 代理通道需要 Python 3.11+ 的 StreamWriter.start_tls）"""
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme != 'https' or not self._proxy_for('https', parts.hostname):
+            return True
+        return hasattr(asyncio.StreamWriter, 'start_tls')
+
+    def _proxy_for(self, scheme: str, host: str) -> Optional[urllib.parse.SplitResult]:
+        proxy = self._proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        if '://' not in proxy:
+            proxy = f"http://{proxy}"
+        return urllib.parse.urlsplit(proxy)
+
+    async def _connect(self, scheme: str, host: str, port: int):
+        """建立新連線
+
+        Returns:
+            (reader, writer, absolute_form): absolute_form 表示需以絕對網址透過 HTTP 代理發送請求
+        """
+        proxy = self._proxy_for(scheme, host)
+        self.connections_created += 1
+        if not proxy:
+            ssl_context = self._ssl_context if scheme == 'https' else None
+            reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+            return reader, writer, False
+
+        reader, writer = await asyncio.open_connection(proxy.hostname, proxy.port or 8080)
+        if scheme == 'http':
+            return reader, writer, True
+
+        connect = f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+        if proxy.username:
+            credentials = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+            connect += "Proxy-Authorization: Basic " + base64.b64encode(credentials.encode()).decode() + "\r\n"
+        writer.write((connect + "\r\n").encode('latin-1'))
+        status_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        if len(status_line.split()) < 2 or status_line.split()[1] != b"200":
+            writer.close()
+            raise OSError(f"代理伺服器拒絕連線: {status_line.decode('latin-1').strip()}")
+        await writer.start_tls(self._ssl_context, server_hostname=host)
+        return reader, writer, False
+
+    async def _read_response(
+        self,
+        reader: asyncio.StreamReader,
+        method: str,
+        sink: Optional[Callable[[bytes], None]] = None,
+        on_headers: Optional[Callable[[http.client.HTTPMessage], None]] = None,
+    ):
+        """讀取回應狀態列、標頭與本文
+
+        Args:
+            reader: 連線的讀取端
+            method: 請求方法
+            sink: 2xx 回應本文的接收函式（提供時逐區塊交給 sink，不在記憶體中累積本文）
+            on_headers: 2xx 回應開始串流本文前以回應標頭呼叫（如依 Content-Encoding 準備解壓）
+
+        Returns:
+            (status, reason, headers, body, keep_alive)
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("伺服器已關閉連線")
+        parts = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        version, status = parts[0], int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ''
+
+        headers = http.client.HTTPMessage()
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip()] = value.strip()
+
+        keep_alive = version == 'HTTP/1.1' and (headers.get('Connection') or '').lower() != 'close'
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return status, reason, headers, b"", keep_alive
+
+        chunks: List[bytes] = []
+        if sink is None or not 200 <= status < 300:
+            sink = chunks.append
+        elif on_headers is not None:
+            on_headers(headers)
+
+        if (headers.get('Transfer-Encoding') or '').lower() == 'chunked':
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b';', 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                await self._read_exactly(reader, size, sink)
+                await reader.readexactly(2)
+            return status, reason, headers, b"".join(chunks), keep_alive
+
+        content_length = headers.get('Content-Length')
+        if content_length is not None:
+            await self._read_exactly(reader, int(content_length), sink)
+            return status, reason, headers, b"".join(chunks), keep_alive
+        while True:
+            chunk = await reader.read(AtomicDownload.CHUNK_SIZE)
+            if not chunk:
+                break
+            sink(chunk)
+        return status, reason, headers, b"".join(chunks), False
+
+    @staticmethod
+    async def _read_exactly(reader: asyncio.StreamReader, size: int, sink: Callable[[bytes], None]):
+        """讀取指定長度的本文，以固定大小區塊交給 sink"""
+        while size > 0:
+            chunk = await reader.readexactly(min(size, AtomicDownload.CHUNK_SIZE))
+            size -= len(chunk)
+            sink(chunk)
+
+    async def _send(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        method: str,
+        sink: Optional[Callable[[bytes], None]] = None,
+        on_headers: Optional[Callable[[http.client.HTTPMessage], None]] = None,
+    ):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            raise urllib.error.URLError(f"不支援的協定: {scheme}")
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+
+        streamed = False
+        if sink is not None:
+            target_sink = sink
+
+            def sink(chunk: bytes):
+                nonlocal streamed
+                streamed = True
+                target_sink(chunk)
+
+        for attempt in range(2):
+            idle = self._idle.get(key)
+            reused = bool(idle)
+            if reused:
+                reader, writer, absolute_form = idle.pop()
+            else:
+                reader, writer, absolute_form = await self._connect(*key)
+
+            lines = [f"{method} {url if absolute_form else path} HTTP/1.1", f"Host: {host_header}"]
+            lines.extend(f"{name}: {value}" for name, value in headers.items())
+            try:
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+                await writer.drain()
+                status, reason, response_headers, body, keep_alive = await self._read_response(reader, method, sink, on_headers)
+            except (ConnectionError, asyncio.IncompleteReadError) as error:
+                writer.close()
+                # 已有本文寫入 sink 時不能重送，否則內容會重複
+                if reused and attempt == 0 and not streamed:
+                    continue
+                raise urllib.error.URLError(error)
+            except BaseException:
+                writer.close()
+                raise
+
+            self.requests += 1
+            if reused:
+                self.connections_reused += 1
+            if keep_alive:
+                self._idle.setdefault(key, []).append((reader, writer, absolute_form))
+            else:
+                writer.close()
+            return status, reason, response_headers, body
+        raise urllib.error.URLError("連線已被伺服器關閉")
+
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        max_redirects: int = 5,
+        sink: Optional[Callable[[bytes], None]] = None,
+        on_headers: Optional[Callable[[http.client.HTTPMessage], None]] = None,
+    ):
+        """發出 GET 請求並讀取完整回應
+
+        Args:
+            url: 請求網址
+            headers: 請求標頭
+            max_redirects: 最多跟隨的重新導向次數
+            sink: 成功回應本文的接收函式（提供時本文逐區塊串流給 sink，回傳的本文為空）
+            on_headers: 成功回應開始串流本文前以回應標頭呼叫
+
+        Returns:
+            Tuple[http.client.HTTPMessage, bytes]: (回應標頭, 本文)
+
+        Raises:
+            urllib.error.HTTPError: 回應狀態碼 >= 400
+            urllib.error.URLError: 連線失敗或逾時
+        """
+        headers = dict(headers or {})
+        for _ in range(max_redirects + 1):
+            try:
+                status, reason, response_headers, body = await asyncio.wait_for(
+                    self._send(url, headers, 'GET', sink, on_headers), timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                raise urllib.error.URLError("請求逾時")
+            except OSError as error:
+                if isinstance(error, urllib.error.URLError):
+                    raise
+                raise urllib.error.URLError(error)
+            location = response_headers.get('Location')
+            if status in self.REDIRECT_CODES and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            if status >= 400:
+                raise urllib.error.HTTPError(url, status, reason, response_headers, io.BytesIO(body))
+            return response_headers, body
+        raise urllib.error.URLError("重新導向次數過多")
+
+    def summary(self) -> str:
+        """連線重用統計"""
+        return (
+            f"{self.requests} 次 HTTP 請求，新建 {self.connections_created} 條連線，"
+            f"重用連線 {self.connections_reused} 次"
+        )
+
+    def close(self):
+        """關閉所有閒置連線"""
+        for idle in self._idle.values():
+            for _, writer, _ in idle:
+                writer.close()
+        self._idle.clear()
+
+
+def _skip_shared_init(path: Path) -> Optional[Path]:
+    """共用 tasks 目錄中的 init.md 由各版本專屬的 init.md 取代"""
+    return None if path.name == "init.md" else path
+
+
+def _codex_prompt_path(path: Path) -> Path:
+    """Codex 指令以 .prompt.md 副檔名安裝"""
+    return path.with_suffix('.prompt.md')
+
+
+# 版本定義表：各版本的目錄映射、單檔映射與安裝後顯示的目錄結構。
+# 目標路徑以 "~/" 開頭者安裝到使用者家目錄，其餘相對於工作目錄；
+# cleanup 為 (路徑, glob)，glob 不為 None 時僅在目錄內有符合的文件才視為既有安裝。
+VARIANTS: Dict[str, Dict] = {
+    "claude": {
+        "label": "claude-code",
+        "description": "適用於 Claude Code",
+        "directories": [
+            ("claude code/commands", ".claude/commands", None),
+            ("hooks", ".claude/hooks", None),
+            ("tasks", "sunnycore/tasks", _skip_shared_init),
+            ("templates", "sunnycore/templates", None),
+            ("scripts", "sunnycore/scripts", None),
+        ],
+        "single_files": [
+            ("config/CLAUDE.md", "sunnycore/CLAUDE.md"),
+            ("claude code/tasks/init.md", "sunnycore/tasks/init.md"),
+            ("claude code/tasks/document-project.md", "sunnycore/tasks/document-project.md"),
+        ],
+        "cleanup": [(".claude", None), ("sunnycore", None)],
+        "overwrite_prompt": "\n目錄已存在，是否覆寫? (y/N): ",
+        "structure": [
+            "{work_dir}/",
+            "├── .claude/",
+            "│   ├── commands/",
+            "│   └── hooks/",
+            "└── sunnycore/",
+            "    ├── CLAUDE.md",
+            "    ├── tasks/",
+            "    ├── templates/",
+            "    └── scripts/",
+        ],
+        "guide": "請查看 sunnycore/CLAUDE.md 開始使用 Sunnycore!",
+    },
+    "codex": {
+        "label": "codex",
+        "description": "適用於 Codex CLI",
+        "directories": [
+            ("codex/commands", "~/.codex/prompts", _codex_prompt_path),
+            ("tasks", "sunnycore/tasks", _skip_shared_init),
+            ("templates", "sunnycore/templates", None),
+            ("scripts", "sunnycore/scripts", None),
+        ],
+        "single_files": [
+            ("config/AGENTS.md", "sunnycore/AGENTS.md"),
+            ("codex/tasks/init.md", "sunnycore/tasks/init.md"),
+            ("codex/tasks/document-project.md", "sunnycore/tasks/document-project.md"),
+        ],
+        "cleanup": [("sunnycore", None), ("~/.codex/prompts", "*.prompt.md")],
+        "overwrite_prompt": "\n目標位置已存在 Codex 提示或 Sunnycore 檔案，是否覆寫? (y/N): ",
+        "structure": [
+            "{home}/",
+            "└── .codex/",
+            "    └── prompts/  # Sunnycore 指令 (.prompt.md)",
+            "{work_dir}/",
+            "└── sunnycore/",
+            "    ├── AGENTS.md",
+            "    ├── tasks/",
+            "    ├── templates/",
+            "    └── scripts/",
+        ],
+        "guide": "請查看 sunnycore/AGENTS.md 與 prompts 了解使用方式!",
+    },
+    "cursor": {
+        "label": "cursor",
+        "description": "適用於 Cursor 編輯器",
+        "directories": [
+            ("cursor/commands", ".cursor/commands", None),
+            ("tasks", "sunnycore/tasks", _skip_shared_init),
+            ("templates", "sunnycore/templates", None),
+            ("scripts", "sunnycore/scripts", None),
+        ],
+        "single_files": [
+            ("config/CURSOR.mdc", "sunnycore/cursor.mdc"),
+            ("cursor/tasks/init.md", "sunnycore/tasks/init.md"),
+            ("cursor/tasks/document-project.md", "sunnycore/tasks/document-project.md"),
+        ],
+        "cleanup": [(".cursor", None), ("sunnycore", None)],
+        "overwrite_prompt": "\n目錄已存在，是否覆寫? (y/N): ",
+        "structure": [
+            "{work_dir}/",
+            "├── .cursor/",
+            "└── sunnycore/",
+            "    ├── cursor.mdc",
+            "    ├── tasks/",
+            "    ├── templates/",
+            "    └── scripts/",
+        ],
+        "guide": "請查看 sunnycore/cursor.mdc 開始使用 Sunnycore!",
+    },
+}
+
+# 舊版名稱別名
+VARIANT_ALIASES = {"claude-code": "claude"}
+
+
+def parse_variants(value: str) -> List[str]:
+    """解析以逗號分隔的版本列表（如 claude-code,codex,cursor），保留順序並去除重複
+
+    Raises:
+        argparse.ArgumentTypeError: 包含不支援的版本名稱
+    """
+    variants: List[str] = []
+    for name in value.split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        name = VARIANT_ALIASES.get(name, name)
+        if name not in VARIANTS:
+            supported = '、'.join(VARIANTS)
+            raise argparse.ArgumentTypeError(f"不支援的版本: {name}（支援 {supported}，可用逗號分隔多個版本）")
+        if name not in variants:
+            variants.append(name)
+    if not variants:
+        raise argparse.ArgumentTypeError("至少需要指定一個版本")
+    return variants
+
+
 class SunnycoreInstaller:
     """Sunnycore 安裝器"""
     
+    # 安裝清單（記錄每個已安裝文件的來源、blob SHA 與大小，供增量更新使用）
+    MANIFEST_FILENAME = ".install-manifest.json"
+    # 邊掃描邊下載時的待下載佇列上限（掃描快於下載時讓掃描執行緒等待）
+    PIPELINE_QUEUE_SIZE = 256
+    
     def __init__(
         self,
         repo: str = "Yamiyorunoshura/sunnycore",
@@ -184,11 +1445,47 @@ class SunnycoreInstaller:
         max_retries: int = 3,
         retry_delay: float = 0.5,
         github_token: Optional[str] = None,
+        use_archive: bool = False,
+        cache: Optional[DownloadCache] = None,
+        offline: bool = False,
+        force: bool = False,
+        scan_backend: str = "tree",
+        http_pool: Optional[HttpConnectionPool] = None,
+        engine: str = "thread",
+        use_hardlinks: bool = False,
+        source: Optional[Path] = None,
     ):
         self.repo = repo
         self.branch = branch
-        self.base_raw_url = f"https://raw.githubusercontent.com/{repo}/{branch}"
-        self.base_api_url = f"https://api.github.com/repos/{repo}/contents"
+        self.base_raw_url = f"https://raw.githubusercontent.com/{repo}"
+        # 安裝開始時將分支解析為 commit SHA，之後所有請求都固定在同一個快照上
+        self.commit_sha: Optional[str] = None
+        self.base_repo_api_url = f"https://api.github.com/repos/{repo}"
+        self.base_api_url = f"{self.base_repo_api_url}/contents"
+        self.base_archive_url = f"https://codeload.github.com/{repo}"
+        self.use_archive = use_archive
+        # 本地來源（倉庫目錄、tar 壓縮檔或 git bundle），指定時不發出任何網路請求
+        self.source = source
+        self.cache = cache
+        self.offline = offline
+        self.force = force
+        self.scan_backend = scan_backend
+        self.http_pool = http_pool or HttpConnectionPool()
+        self.engine = engine
+        # 同一 blob 對應多個目標路徑時，以硬連結取代複製
+        self.use_hardlinks = use_hardlinks
+        # 掃描階段取得的遠端文件中繼資料 {source_path: {"sha": ..., "size": ...}}
+        self.remote_meta: Dict[str, Dict] = {}
+        self.cache_hits = 0
+        # GitHub API 請求統計（304 未變更的條件請求不計入速率限制）
+        self.api_requests = 0
+        self.api_not_modified = 0
+        self.api_snapshot_hits = 0
+        # 傳輸量統計：網路上實際傳輸的位元組數與解壓後的位元組數（文件下載與 API 回應分開統計）
+        self.bytes_on_wire = 0
+        self.bytes_written = 0
+        self.api_bytes_on_wire = 0
+        self.api_bytes_decoded = 0
         self.max_workers = max_workers
         self.max_retries = max(1, max_retries)
         self.retry_delay = retry_delay if retry_delay >= 0 else 0.0
@@ -197,8 +1494,11 @@ class SunnycoreInstaller:
         self.failed_files: List[Tuple[str, Path, str]] = []
         self.failed_lock = threading.Lock()
         self._retry_backoff_multiplier = 2.0
-        # API 速率限制控制
-        self._api_rate_limiter = threading.Semaphore(3)  # 同時最多 3 個 API 請求
+        # 自適應並行度控制（--max-workers 為上限；0 表示自動，上限 64）
+        ceiling = max_workers if max_workers and max_workers > 0 else 64
+        self.download_controller = AdaptiveConcurrencyController(initial=min(8, ceiling), maximum=ceiling)
+        # API 速率限制控制（初始同時 3 個 API 請求，依回應標頭自動收斂）
+        self.api_controller = AdaptiveConcurrencyController(initial=3, maximum=min(ceiling, 5))
         self._api_call_delay = 0.2  # API 請求之間的延遲（秒）
         self._last_api_call_time = 0
         self._api_time_lock = threading.Lock()
@@ -213,34 +1513,126 @@ class SunnycoreInstaller:
         Returns:
             bool: 下載是否成功
         """
-        encoded_path = urllib.parse.quote(file_path)
-        url = f"{self.base_raw_url}/{encoded_path}"
+        url = self._raw_url(file_path)
         target_path.parent.mkdir(parents=True, exist_ok=True)
         
         attempts = self.max_retries
-        last_error: Optional[Exception] = None
-        success = False
+        success, last_error = self._restore_from_cache(file_path, target_path)
+        if success or last_error is not None:
+            attempts = 0
         
+        controller = self.download_controller
         for attempt in range(1, attempts + 1):
+            controller.acquire()
+            started = time.monotonic()
             try:
-                request = urllib.request.Request(
-                    url,
-                    headers={
-                        "User-Agent": "SunnycoreInstaller/1.0 (+https://github.com/Yamiyorunoshura/sunnycore)",
-                    },
-                )
-                with urllib.request.urlopen(request, timeout=30) as response:
-                    content = response.read()
-                    with open(target_path, 'wb') as f:
-                        f.write(content)
+                with self.http_pool.open(url, self._raw_headers()) as response:
+                    # 以固定大小區塊串流解壓並寫入暫存檔，校驗通過後才原子替換目標文件
+                    with self._open_download(file_path, target_path) as download:
+                        decoder = ContentDecoder(download.write)
+                        decoder.start(response.headers)
+                        download.copy_from(response, decoder)
+                        # http.client 在連線提前關閉時不會拋出錯誤，需自行比對 Content-Length（壓縮後的大小）
+                        content_length = response.headers.get('Content-Length')
+                        if content_length is not None and int(content_length) != decoder.wire_bytes:
+                            raise ValueError(f"下載不完整: 預期 {content_length} 位元組，實際 {decoder.wire_bytes} 位元組")
+                        sha = download.commit()
+                controller.record_success(time.monotonic() - started, response.headers)
+                self._record_transfer(decoder)
+                self._store_in_cache(file_path, target_path, sha, download.size)
                 success = True
                 break
             except Exception as error:  # noqa: BLE001
                 last_error = error
-                if attempt < attempts:
-                    wait_seconds = self._compute_retry_wait(attempt)
-                    time.sleep(wait_seconds)
+                self._record_congestion(controller, error)
+            finally:
+                controller.release()
+            if attempt < attempts:
+                wait_seconds = self._compute_retry_wait(attempt)
+                time.sleep(wait_seconds)
         
+        self._record_download_result(file_path, target_path, success, last_error)
+        return success
+    
+    def _record_congestion(self, controller: AdaptiveConcurrencyController, error: Exception):
+        """將 429/403 與逾時回報給並行度控制器（其他錯誤不視為壅塞）"""
+        if isinstance(error, urllib.error.HTTPError):
+            if error.code in (403, 429):
+                controller.record_throttle(error.headers)
+            return
+        reason = error.reason if isinstance(error, urllib.error.URLError) else error
+        if isinstance(reason, (socket.timeout, TimeoutError)) or (
+            isinstance(reason, str) and "逾時" in reason
+        ):
+            controller.record_timeout()
+    
+    @property
+    def ref(self) -> str:
+        """請求使用的 ref：已解析 commit SHA 時為 SHA，否則為分支名稱"""
+        return self.commit_sha or self.branch
+    
+    def _raw_url(self, file_path: str) -> str:
+        encoded_path = urllib.parse.quote(file_path)
+        return f"{self.base_raw_url}/{urllib.parse.quote(self.ref)}/{encoded_path}"
+    
+    def _raw_headers(self) -> Dict[str, str]:
+        return {
+            "User-Agent": "SunnycoreInstaller/1.0 (+https://github.com/Yamiyorunoshura/sunnycore)",
+            "Accept-Encoding": ContentDecoder.ACCEPT_ENCODING,
+        }
+    
+    def _record_transfer(self, decoder: ContentDecoder):
+        """累計一次成功下載的網路傳輸量與寫入量"""
+        with self.failed_lock:
+            self.bytes_on_wire += decoder.wire_bytes
+            self.bytes_written += decoder.decoded_bytes
+    
+    @staticmethod
+    def _format_bytes(size: int) -> str:
+        if size >= 1024 * 1024:
+            return f"{size / 1024 / 1024:.1f} MB"
+        return f"{size / 1024:.1f} KB"
+    
+    def _restore_from_cache(self, file_path: str, target_path: Path) -> Tuple[bool, Optional[Exception]]:
+        """嘗試從本地快取還原文件
+        
+        Returns:
+            Tuple[bool, Optional[Exception]]: (是否已還原, 離線模式下快取未命中的錯誤)
+        """
+        sha = self._lookup_blob_sha(file_path)
+        if self.cache and sha and self.cache.materialize(sha, target_path):
+            with self.failed_lock:
+                self.cache_hits += 1
+            return True, None
+        if self.offline:
+            return False, FileNotFoundError("離線模式下快取中沒有此文件")
+        return False, None
+    
+    def _open_download(self, file_path: str, target_path: Path) -> AtomicDownload:
+        """建立原子寫入的下載暫存檔，有目錄清單中繼資料時一併校驗大小與 SHA"""
+        meta = self.remote_meta.get(file_path) or {}
+        return AtomicDownload(target_path, meta.get('size'), meta.get('sha'))
+    
+    def _store_in_cache(self, file_path: str, target_path: Path, sha: str, size: int):
+        """將下載的文件寫入快取"""
+        if not self.cache:
+            return
+        self.cache.store(sha, target_path)
+        if file_path not in self.remote_meta:
+            # 單檔不在目錄清單內，記錄其 SHA 以便離線安裝時查詢
+            self.cache.save_listing(
+                self.repo, self.ref, file_path,
+                {"type": "file", "path": file_path, "sha": sha, "size": size},
+            )
+    
+    def _record_download_result(
+        self,
+        file_path: str,
+        target_path: Path,
+        success: bool,
+        last_error: Optional[Exception],
+    ):
+        """更新進度條並記錄失敗的文件"""
         if self.progress_bar:
             self.progress_bar.update(1, failed=not success)
         
@@ -249,8 +1641,25 @@ class SunnycoreInstaller:
                 self.failed_files.append(
                     (file_path, target_path, self._format_error(last_error))
                 )
-        
-        return success
+    
+    def _load_cached_listing(self, path: str):
+        """離線時讀取快取清單：優先使用快取的 commit SHA 對應的清單，其次為以分支名稱保存的清單"""
+        if not self.cache:
+            return None
+        for ref in dict.fromkeys((self.ref, self.branch)):
+            body = self.cache.load_listing(self.repo, ref, path)
+            if body is not None:
+                return body
+        return None
+    
+    def _lookup_blob_sha(self, file_path: str) -> Optional[str]:
+        """查詢文件的 blob SHA（線上以掃描結果為準，離線時使用快取的中繼資料）"""
+        meta = self.remote_meta.get(file_path)
+        if meta is None and self.offline and self.cache:
+            meta = self._load_cached_listing(file_path)
+        if isinstance(meta, dict):
+            return meta.get('sha')
+        return None
     
     def _compute_retry_wait(self, attempt: int) -> float:
         """計算下一次重試前的等待時間（指數退避）"""
@@ -280,6 +1689,236 @@ class SunnycoreInstaller:
                 return False
         return True
     
+    def _confirm_existing(self, prompt: str, manifest: Optional[Dict], auto_yes: bool) -> bool:
+        """確認是否覆寫既有安裝（有安裝清單時改為詢問增量更新）"""
+        if auto_yes:
+            return True
+        if manifest is not None:
+            commit = (manifest.get('commit') or '未知')[:12]
+            prompt = f"\n偵測到既有安裝 (commit {commit})，將只更新有變更的文件，是否繼續? (y/N): "
+        try:
+            response = safe_input(prompt).strip().lower()
+        except EOFError:
+            print("\n✗ 無法讀取用戶輸入，請使用 -y 參數自動確認覆寫")
+            return False
+        if response != 'y':
+            print("安裝已取消")
+            return False
+        return True
+    
+    def _manifest_path(self, work_dir: Path) -> Path:
+        return work_dir / "sunnycore" / self.MANIFEST_FILENAME
+    
+    def _manifest_key(self, work_dir: Path, target_path: Path) -> str:
+        """工作目錄內的文件以相對路徑記錄，其餘（如 ~/.codex/prompts）以絕對路徑記錄"""
+        try:
+            return target_path.relative_to(work_dir).as_posix()
+        except ValueError:
+            return str(target_path)
+    
+    def _manifest_target(self, work_dir: Path, key: str) -> Path:
+        path = Path(key)
+        return path if path.is_absolute() else work_dir / path
+    
+    def load_install_manifest(self, work_dir: Path, variant: str) -> Optional[Dict]:
+        """讀取既有安裝清單，版本或倉庫不符時視為不存在
+        
+        Args:
+            work_dir: 工作目錄
+            variant: 安裝版本名稱
+            
+        Returns:
+            Optional[Dict]: 安裝清單內容
+        """
+        if self.force:
+            return None
+        try:
+            with open(self._manifest_path(work_dir), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(manifest, dict) or not isinstance(manifest.get('files'), dict):
+            return None
+        if manifest.get('variant') != variant or manifest.get('repo') != self.repo:
+            return None
+        return manifest
+    
+    def write_install_manifest(
+        self,
+        work_dir: Path,
+        variant: str,
+        commit: Optional[str],
+        file_list: List[Tuple[str, Path]],
+    ):
+        """寫入安裝清單
+        
+        Args:
+            work_dir: 工作目錄
+            variant: 安裝版本名稱
+            commit: 來源 commit SHA（無法取得時為 None）
+            file_list: 已成功安裝的文件列表 [(source_path, target_path), ...]
+        """
+        files = {}
+        for source_path, target_path in file_list:
+            meta = self.remote_meta.get(source_path) or {}
+            sha = meta.get('sha')
+            size = meta.get('size')
+            try:
+                if not sha or size is None:
+                    sha, size = file_blob_sha(target_path)
+                # 記錄 mtime，下次安裝時 mtime 不同（本地修改過）就重新計算 SHA
+                mtime_ns = target_path.stat().st_mtime_ns
+            except OSError:
+                continue
+            files[self._manifest_key(work_dir, target_path)] = {
+                "source": source_path,
+                "sha": sha,
+                "size": size,
+                "mtime_ns": mtime_ns,
+            }
+        
+        manifest = {
+            "repo": self.repo,
+            "ref": self.branch,
+            "commit": commit,
+            "variant": variant,
+            "installed_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "files": dict(sorted(files.items())),
+        }
+        manifest_path = self._manifest_path(work_dir)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    
+    def _is_unchanged(self, manifest: Optional[Dict], work_dir: Path, source_path: str, target_path: Path) -> bool:
+        """判斷文件與上次安裝相同（來源與 blob SHA 一致且本地文件未被修改）
+
+        大小與 mtime 都和安裝清單一致時直接採信清單中的 SHA；
+        mtime 不同（例如本地修改過或清單中沒有 mtime）時重新計算本地文件的 blob SHA。
+        """
+        if manifest is None:
+            return False
+        entry = manifest['files'].get(self._manifest_key(work_dir, target_path))
+        meta = self.remote_meta.get(source_path)
+        if not entry or not meta or not meta.get('sha'):
+            return False
+        if entry.get('source') != source_path or entry.get('sha') != meta['sha']:
+            return False
+        try:
+            stat = target_path.stat()
+            if stat.st_size != entry.get('size'):
+                return False
+            if stat.st_mtime_ns == entry.get('mtime_ns'):
+                return True
+            return file_blob_sha(target_path)[0] == meta['sha']
+        except OSError:
+            return False
+    
+    def _remove_stale_files(
+        self,
+        manifest: Dict,
+        work_dir: Path,
+        planned_targets: set,
+        roots: set,
+    ) -> int:
+        """刪除上次安裝但遠端已移除的文件，並清理因此變空的目錄
+        
+        只處理位於 roots 之下的文件：呼叫端只傳入本次已完整掃描的目錄，
+        其他路徑即使不在本次安裝列表中也不會被刪除。
+        
+        Args:
+            manifest: 既有安裝清單
+            work_dir: 工作目錄
+            planned_targets: 本次安裝的所有目標路徑
+            roots: 已完整掃描的目錄映射目標目錄（本身不可刪除）
+            
+        Returns:
+            int: 刪除的文件數
+        """
+        removed = 0
+        for key in manifest['files']:
+            target_path = self._manifest_target(work_dir, key)
+            if target_path in planned_targets:
+                continue
+            if not any(root in target_path.parents for root in roots):
+                continue
+            try:
+                target_path.unlink()
+            except FileNotFoundError:
+                continue
+            except OSError as error:
+                print(f"  ✗ 無法移除 {target_path}: {error}")
+                continue
+            removed += 1
+            parent = target_path.parent
+            while parent not in roots and parent != work_dir and parent != parent.parent:
+                try:
+                    parent.rmdir()
+                except OSError:
+                    break
+                parent = parent.parent
+        return removed
+    
+    # 分支最近一次解析出的 commit SHA 在快取中的鍵（以分支名稱為 ref 保存，附帶 ETag）
+    COMMIT_CACHE_KEY = "commits"
+    
+    def resolve_commit_sha(self) -> Optional[str]:
+        """將分支解析為 commit SHA 並固定為之後所有請求的 ref（只解析一次）
+        
+        快取中保存分支上次解析的 SHA 與 ETag：線上以 If-None-Match 發出條件請求，
+        回應 304 時沿用快取的 SHA（不計入速率限制）；離線時直接使用快取的 SHA。
+        
+        Returns:
+            Optional[str]: commit SHA，無法解析（且快取中沒有）時為 None
+        """
+        if self.commit_sha:
+            return self.commit_sha
+        cached_commit, etag = None, None
+        if self.cache:
+            cached_commit, etag = self.cache.load_listing_entry(self.repo, self.branch, self.COMMIT_CACHE_KEY)
+            if not isinstance(cached_commit, str) or len(cached_commit) != 40:
+                cached_commit, etag = None, None
+        if self.offline:
+            self.commit_sha = cached_commit
+            return self.commit_sha
+        
+        url = f"{self.base_repo_api_url}/commits/{urllib.parse.quote(self.branch)}"
+        headers = {
+            "User-Agent": "SunnycoreInstaller/1.0 (+https://github.com/Yamiyorunoshura/sunnycore)",
+            "Accept": "application/vnd.github.sha",
+        }
+        if self.github_token:
+            headers["Authorization"] = f"token {self.github_token}"
+        if cached_commit and etag:
+            headers["If-None-Match"] = etag
+        self.api_controller.acquire()
+        try:
+            self._wait_for_api_rate_limit()
+            started = time.monotonic()
+            with self.http_pool.open(url, headers) as response:
+                body = response.read()
+            self.api_controller.record_success(time.monotonic() - started, response.headers)
+        except Exception as error:  # noqa: BLE001
+            self._record_congestion(self.api_controller, error)
+            return None
+        finally:
+            self.api_controller.release()
+        with self.failed_lock:
+            self.api_requests += 1
+            if response.status == 304:
+                self.api_not_modified += 1
+        if response.status == 304:
+            commit = cached_commit
+        else:
+            commit = body.decode().strip()
+            if len(commit) != 40:
+                return None
+            if self.cache:
+                self.cache.save_listing(self.repo, self.branch, self.COMMIT_CACHE_KEY, commit, response.headers.get('ETag'))
+        self.commit_sha = commit
+        return commit
+    
     def _wait_for_api_rate_limit(self):
         """實施 API 速率限制 - 確保請求之間有適當延遲"""
         with self._api_time_lock:
@@ -289,71 +1928,209 @@ class SunnycoreInstaller:
                 time.sleep(self._api_call_delay - elapsed)
             self._last_api_call_time = time.time()
     
-    def get_directory_contents(self, dir_path: str) -> List[Dict]:
+    def _fetch_api_json(self, url: str, description: str, cache_key: Optional[str] = None):
+        """發出 GitHub API 請求並解析 JSON（帶速率限制和重試）
+        
+        指定 cache_key 且啟用快取時，清單以請求實際使用的 ref（self.ref）為鍵保存：
+        已固定 commit SHA 時快取中的清單內容不可變，直接使用而不發出請求；
+        未固定（以分支名稱請求）時以快取的 ETag 發出 If-None-Match 條件請求，回應 304 時沿用快取內容
+        （不計入 GitHub 速率限制），回應 200 時連同新的 ETag 寫回快取。
+        
+        Args:
+            url: API 網址
+            description: 錯誤訊息中顯示的請求描述
+            cache_key: 快取清單的路徑鍵（如目錄路徑），None 表示不使用快取
+            
+        Returns:
+            解析後的 JSON，重試後仍失敗時回傳 None
+            
+        Raises:
+            urllib.error.HTTPError: 非速率限制的 HTTP 錯誤（如 404）
+        """
+        headers = {
+            "User-Agent": "SunnycoreInstaller/1.0 (+https://github.com/Yamiyorunoshura/sunnycore)",
+            "Accept": "application/vnd.github.v3+json",
+            "Accept-Encoding": ContentDecoder.ACCEPT_ENCODING,
+        }
+        
+        # 如果提供了 GitHub token，添加認證
+        if self.github_token:
+            headers["Authorization"] = f"token {self.github_token}"
+        
+        use_cache = cache_key is not None and self.cache is not None
+        ref = self.ref
+        cached_body, etag = None, None
+        if use_cache:
+            cached_body, etag = self.cache.load_listing_entry(self.repo, ref, cache_key)
+            if cached_body is not None and self.commit_sha:
+                with self.failed_lock:
+                    self.api_snapshot_hits += 1
+                return cached_body
+            if cached_body is not None and etag:
+                headers["If-None-Match"] = etag
+        
+        # 重試邏輯
+        for attempt in range(1, self.max_retries + 1):
+            # 由自適應控制器限制並行 API 請求數量，並在請求之間添加延遲
+            self.api_controller.acquire()
+            try:
+                self._wait_for_api_rate_limit()
+                started = time.monotonic()
+                with self.http_pool.open(url, headers) as response:
+                    body = response.read()
+                # 成功回應也帶有 X-RateLimit-Remaining，提前收斂並行度而非等到 403
+                self.api_controller.record_success(time.monotonic() - started, response.headers)
+                decoded = ContentDecoder.decode(response.headers, body) if body else body
+                with self.failed_lock:
+                    self.api_requests += 1
+                    self.api_bytes_on_wire += len(body)
+                    self.api_bytes_decoded += len(decoded)
+                    if response.status == 304:
+                        self.api_not_modified += 1
+                if response.status == 304:
+                    result = cached_body
+                else:
+                    result = json.loads(decoded.decode())
+                    if use_cache:
+                        self.cache.save_listing(self.repo, ref, cache_key, result, response.headers.get('ETag'))
+                return result
+                    
+            except urllib.error.HTTPError as e:
+                # 處理 rate limit 錯誤
+                if e.code != 403 and e.code != 429:
+                    raise
+                self._record_congestion(self.api_controller, e)
+                if attempt >= self.max_retries:
+                    raise
+                # 檢查是否有 Retry-After header
+                retry_after = e.headers.get('Retry-After')
+                if retry_after:
+                    wait_time = int(retry_after)
+                else:
+                    # X-RateLimit-Reset 包含重置時間戳
+                    rate_limit_reset = e.headers.get('X-RateLimit-Reset')
+                    if rate_limit_reset:
+                        wait_time = max(1, int(rate_limit_reset) - int(time.time()))
+                    else:
+                        # 使用指數退避
+                        wait_time = self._compute_retry_wait(attempt) * 5
+                if wait_time > AdaptiveConcurrencyController.MAX_RATE_LIMIT_PAUSE:
+                    # 額度要很久才會重置時直接失敗，不要看似卡住
+                    print(
+                        f"\n✗ GitHub API 速率限制額度已用盡，需等待約 {wait_time / 60:.0f} 分鐘才會重置"
+                        f"（超過最長等待 {AdaptiveConcurrencyController.MAX_RATE_LIMIT_PAUSE:.0f} 秒）"
+                    )
+                    print("  請使用 --github-token 或設置環境變數 GITHUB_TOKEN，或改用 --archive 模式，或稍後再試")
+                    raise
+                
+                print(f"\n  ⚠ API 速率限制，等待 {wait_time} 秒後重試... (嘗試 {attempt}/{self.max_retries})")
+                
+            except Exception as e:
+                self._record_congestion(self.api_controller, e)
+                if attempt >= self.max_retries:
+                    print(f"✗ 無法獲取{description} - {e}")
+                    return None
+                wait_time = self._compute_retry_wait(attempt)
+                
+            finally:
+                self.api_controller.release()
+            
+            time.sleep(wait_time)
+        
+        return None
+    
+    def get_directory_contents(self, dir_path: str) -> Optional[List[Dict]]:
         """獲取 GitHub 目錄內容（帶速率限制和重試）
         
         Args:
             dir_path: GitHub 倉庫中的目錄路徑
             
         Returns:
-            List[Dict]: 目錄內容列表
+            Optional[List[Dict]]: 目錄內容列表（空目錄為空列表），無法取得時為 None
         """
+        if self.offline:
+            cached = self._load_cached_listing(dir_path)
+            if cached is None:
+                print(f"✗ 離線模式下快取中沒有目錄清單: {dir_path}")
+            return cached
+        
         # URL 編碼路徑（處理空格等特殊字符）
         encoded_path = urllib.parse.quote(dir_path)
-        url = f"{self.base_api_url}/{encoded_path}?ref={self.branch}"
+        url = f"{self.base_api_url}/{encoded_path}?ref={urllib.parse.quote(self.ref)}"
         
-        # 使用 Semaphore 限制並行 API 請求數量
-        with self._api_rate_limiter:
-            # 在請求之間添加延遲
-            self._wait_for_api_rate_limit()
-            
-            # 重試邏輯
-            for attempt in range(1, self.max_retries + 1):
-                try:
-                    headers = {
-                        "User-Agent": "SunnycoreInstaller/1.0 (+https://github.com/Yamiyorunoshura/sunnycore)",
-                        "Accept": "application/vnd.github.v3+json",
-                    }
-                    
-                    # 如果提供了 GitHub token，添加認證
-                    if self.github_token:
-                        headers["Authorization"] = f"token {self.github_token}"
-                    
-                    request = urllib.request.Request(url, headers=headers)
-                    with urllib.request.urlopen(request, timeout=30) as response:
-                        return json.loads(response.read().decode())
-                        
-                except urllib.error.HTTPError as e:
-                    # 處理 rate limit 錯誤
-                    if e.code == 403 or e.code == 429:
-                        if attempt < self.max_retries:
-                            # 檢查是否有 Retry-After header
-                            retry_after = e.headers.get('Retry-After')
-                            if retry_after:
-                                wait_time = int(retry_after)
-                            else:
-                                # X-RateLimit-Reset 包含重置時間戳
-                                rate_limit_reset = e.headers.get('X-RateLimit-Reset')
-                                if rate_limit_reset:
-                                    wait_time = max(1, int(rate_limit_reset) - int(time.time()))
-                                else:
-                                    # 使用指數退避
-                                    wait_time = self._compute_retry_wait(attempt) * 5
-                            
-                            print(f"\n  ⚠ API 速率限制，等待 {wait_time} 秒後重試... (嘗試 {attempt}/{self.max_retries})")
-                            time.sleep(wait_time)
-                            continue
-                    raise
-                    
-                except Exception as e:
-                    if attempt < self.max_retries:
-                        wait_time = self._compute_retry_wait(attempt)
-                        time.sleep(wait_time)
-                        continue
-                    print(f"✗ 無法獲取目錄內容: {dir_path} - {e}")
-                    return []
+        return self._fetch_api_json(url, f"目錄內容: {dir_path}", cache_key=dir_path)
+    
+    def get_repository_tree(self) -> Optional[Dict]:
+        """透過 Git Trees API 以單次請求取得整個分支的遞迴檔案樹
+        
+        Returns:
+            Optional[Dict]: Trees API 回應（含 tree 與 truncated），失敗時為 None
+        """
+        cache_key = "git/trees?recursive=1"
+        if self.offline:
+            return self._load_cached_listing(cache_key)
+        
+        url = f"{self.base_repo_api_url}/git/trees/{urllib.parse.quote(self.ref)}?recursive=1"
+        try:
+            tree = self._fetch_api_json(url, f"檔案樹: {self.ref}", cache_key=cache_key)
+        except urllib.error.HTTPError as error:
+            print(f"✗ 無法獲取檔案樹: {self._format_error(error)}")
+            return None
+        if not isinstance(tree, dict) or not isinstance(tree.get('tree'), list):
+            return None
+        return tree
+    
+    def collect_files_from_tree(
+        self,
+        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]],
+        single_files: List[Tuple[str, Path]],
+    ) -> Optional[List[Tuple[str, Path]]]:
+        """以單次 Trees API 請求取得檔案樹，並在本地解析目錄映射與 transform
+        
+        Args:
+            directories: 目錄映射 [(source_dir, target_dir, transform), ...]
+            single_files: 單檔映射 [(source_path, target_path), ...]
             
-            return []
+        Returns:
+            Optional[List[Tuple[str, Path]]]: 文件列表（含單檔），檔案樹不可用或被截斷時為 None
+        """
+        tree = self.get_repository_tree()
+        if tree is None:
+            return None
+        if tree.get('truncated'):
+            print("  ⚠ 檔案樹過大已被 GitHub 截斷")
+            return None
+        
+        blobs = {}
+        for item in tree['tree']:
+            # 只安裝一般文件，略過子模組 (commit) 與符號連結 (120000)
+            if item.get('type') != 'blob' or item.get('mode') == '120000':
+                continue
+            blobs[item['path']] = {'sha': item.get('sha'), 'size': item.get('size')}
+        
+        all_files: List[Tuple[str, Path]] = []
+        matched_dirs = set()
+        for source_path in sorted(blobs):
+            targets = self._resolve_targets(source_path, directories, {})
+            if not targets:
+                continue
+            self.remote_meta[source_path] = blobs[source_path]
+            all_files.extend((source_path, target_path) for target_path in targets)
+            matched_dirs.update(
+                source_dir for source_dir, _, _ in directories
+                if source_path.startswith(source_dir.rstrip('/') + '/')
+            )
+        
+        for source_dir, _, _ in directories:
+            if source_dir not in matched_dirs:
+                print(f"  ⚠ 警告: 目錄為空或無法存取: {source_dir}")
+        
+        for source_path, target_path in single_files:
+            if source_path in blobs:
+                self.remote_meta[source_path] = blobs[source_path]
+            all_files.append((source_path, target_path))
+        
+        return all_files
     
     def collect_directory_files(
         self,
@@ -361,6 +2138,7 @@ class SunnycoreInstaller:
         target_dir: Path,
         file_list: List[Tuple[str, Path]],
         transform: Optional[Callable[[Path], Path]] = None,
+        on_file: Optional[Callable[[str, Path], None]] = None,
     ) -> bool:
         """遞迴收集目錄中的所有文件
         
@@ -368,42 +2146,51 @@ class SunnycoreInstaller:
             source_dir: GitHub 倉庫中的目錄路徑
             target_dir: 本地目標目錄
             file_list: 用於存儲文件信息的列表
+            on_file: 每取得一個文件就立即呼叫（供邊掃描邊下載使用）
             
         Returns:
-            bool: 收集是否成功
+            bool: 收集是否成功（目錄清單無法取得時為 False，避免把失敗當成空目錄而刪除已安裝的文件）
         """
         contents = self.get_directory_contents(source_dir)
         
+        if contents is None:
+            print(f"  ✗ 無法取得目錄清單: {source_dir}")
+            return False
         if not contents:
-            print(f"  ⚠ 警告: 目錄為空或無法存取: {source_dir}")
+            print(f"  ⚠ 警告: 目錄為空: {source_dir}")
             return True  # 空目錄不算失敗，繼續處理
         
         for item in contents:
             if item['type'] == 'file':
+                self.remote_meta[item['path']] = {'sha': item.get('sha'), 'size': item.get('size')}
                 target_path = target_dir / item['name']
                 if transform:
                     target_path = transform(target_path)
                     if target_path is None:
                         continue
                 file_list.append((item['path'], target_path))
+                if on_file is not None:
+                    on_file(item['path'], target_path)
             elif item['type'] == 'dir':
                 sub_target_dir = target_dir / item['name']
-                if not self.collect_directory_files(item['path'], sub_target_dir, file_list, transform):
+                if not self.collect_directory_files(item['path'], sub_target_dir, file_list, transform, on_file):
                     return False
 
         return True
 
     def collect_directory_files_parallel(
         self,
-        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]]
-    ) -> List[Tuple[str, Path]]:
+        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]],
+        on_file: Optional[Callable[[str, Path], None]] = None,
+    ) -> Optional[List[Tuple[str, Path]]]:
         """並行收集多個目錄中的所有文件
         
         Args:
             directories: 要收集的目錄列表 [(source_dir, target_dir), ...]
+            on_file: 每取得一個文件就立即呼叫（由掃描執行緒呼叫，需自行處理同步）
             
         Returns:
-            List[Tuple[str, Path]]: 收集到的文件列表 [(source_path, target_path), ...]
+            Optional[List[Tuple[str, Path]]]: 收集到的文件列表 [(source_path, target_path), ...]，掃描失敗時為 None
         """
         all_files = []
         lock = threading.Lock()
@@ -411,7 +2198,7 @@ class SunnycoreInstaller:
         def collect_single_directory(source_dir: str, target_dir: Path, transform: Optional[Callable[[Path], Path]]) -> bool:
             """收集單個目錄的文件"""
             temp_files = []
-            success = self.collect_directory_files(source_dir, target_dir, temp_files, transform)
+            success = self.collect_directory_files(source_dir, target_dir, temp_files, transform, on_file)
             
             if success:
                 with lock:
@@ -419,11 +2206,8 @@ class SunnycoreInstaller:
             
             return success
         
-        # 動態調整並行數量（API 掃描階段使用較少的並行數避免觸發速率限制）
-        if self.max_workers is None or self.max_workers <= 0:
-            workers = min(len(directories), 5)  # API 掃描限制為 5 個並行任務
-        else:
-            workers = min(self.max_workers, len(directories), 5)
+        # API 掃描階段使用較少的並行數避免觸發速率限制，實際並行 API 請求數由自適應控制器決定
+        workers = min(len(directories), self.api_controller.maximum)
         
         print(f"  使用 {workers} 個並行任務掃描目錄（含速率限制保護）...")
         
@@ -447,10 +2231,10 @@ class SunnycoreInstaller:
                 try:
                     if not future.result():
                         print(f"  ✗ 無法掃描目錄: {source_dir}")
-                        return []
+                        return None
                 except Exception as e:
                     print(f"  ✗ 掃描目錄時出錯 {source_dir}: {e}")
-                    return []
+                    return None
         
         return all_files
     
@@ -466,18 +2250,17 @@ class SunnycoreInstaller:
         if not file_list:
             return True
         
+        if self.engine == 'async':
+            return self.download_files_async(file_list)
+        
         total = len(file_list)
         
-        # 動態調整並行數量：如果 max_workers 為 None 或 0，則使用文件總數
-        # 否則使用指定的 max_workers，但至少使用文件總數（不設上限）
-        if self.max_workers is None or self.max_workers <= 0:
-            workers = total
-        else:
-            # 使用 max(self.max_workers, total) 確保能充分利用並行
-            # 但設置一個合理的上限（200）避免資源耗盡
-            workers = min(max(self.max_workers, total), 200)
+        # 執行緒數量以並行上限為準（--max-workers 可降低並行度），
+        # 實際同時進行的請求數由自適應控制器依吞吐量與壅塞訊號調整
+        controller = self.download_controller
+        workers = min(controller.maximum, total)
         
-        print(f"\n開始並行下載 {total} 個文件 ({workers} 個並行任務)...")
+        print(f"\n開始並行下載 {total} 個文件 (自適應並行度: 初始 {controller.current_limit}，上限 {workers})...")
         
         # 創建進度條
         self.progress_bar = ProgressBar(total=total, prefix="下載進度")
@@ -494,8 +2277,26 @@ class SunnycoreInstaller:
             for future in as_completed(futures):
                 future.result()  # 獲取結果，觸發異常（如果有）
         
+        return self._finish_downloads(total)
+    
+    def _finish_downloads(self, total: int) -> bool:
+        """完成進度條並輸出快取與失敗摘要
+        
+        Args:
+            total: 本次下載的文件總數
+            
+        Returns:
+            bool: 所有文件是否都下載成功
+        """
         # 完成進度條
         self.progress_bar.finish()
+        print(f"  並行度: {self.download_controller.summary()}")
+        
+        if self.cache:
+            print(f"  快取命中: {self.cache_hits} 個文件，網路下載: {total - self.cache_hits - len(self.failed_files)} 個文件")
+            removed, freed = self.cache.evict()
+            if removed:
+                print(f"  已淘汰 {removed} 個快取文件（釋放 {freed / 1024 / 1024:.1f} MB）")
         
         if self.failed_files:
             print("\n✗ 以下文件在重試後仍無法成功下載：")
@@ -503,232 +2304,1003 @@ class SunnycoreInstaller:
                 print(f"  - {source_path} -> {target_path} ({error_message})")
             print("  建議檢查網路連線、GitHub 權限，或稍後再試。")
         
-        return len(self.failed_files) == 0
+        return len(self.failed_files) == 0
+
+    def download_files_async(self, file_list: List[Tuple[str, Path]]) -> bool:
+        """以 asyncio 事件迴圈下載多個文件（單一執行緒 + 有界並行信號量）
+        
+        Args:
+            file_list: 要下載的文件列表 [(source_path, target_path), ...]
+            
+        Returns:
+            bool: 所有文件是否都下載成功
+        """
+        client = AsyncHttpClient()
+        if not client.supports(self.base_raw_url):
+            print("\n  ⚠ 目前的 Python 版本無法在 asyncio 引擎中使用 HTTPS 代理通道，改用執行緒引擎")
+            self.engine = 'thread'
+            return self.download_files_parallel(file_list)
+        
+        total = len(file_list)
+        controller = self.download_controller
+        
+        print(f"\n開始以 asyncio 引擎下載 {total} 個文件 (自適應並行度: 初始 {controller.current_limit}，上限 {controller.maximum})...")
+        
+        self.progress_bar = ProgressBar(total=total, prefix="下載進度")
+        self.failed_files = []
+        
+        async def run_all():
+            # 以 asyncio.Condition 等待控制器釋出名額，避免阻塞事件迴圈
+            slots = asyncio.Condition()
+            try:
+                await asyncio.gather(*(
+                    self._download_file_async(client, slots, source, target)
+                    for source, target in file_list
+                ))
+            finally:
+                client.close()
+        
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(run_all())
+        finally:
+            loop.close()
+        
+        success = self._finish_downloads(total)
+        print(f"  asyncio 連線統計: {client.summary()}")
+        return success
+    
+    async def _download_file_async(
+        self,
+        client: AsyncHttpClient,
+        slots: asyncio.Condition,
+        file_path: str,
+        target_path: Path,
+    ) -> bool:
+        """asyncio 引擎的單一文件下載（重試、退避與並行度控制規則與 download_file 相同）"""
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        attempts = self.max_retries
+        success, last_error = self._restore_from_cache(file_path, target_path)
+        if success or last_error is not None:
+            attempts = 0
+        
+        url = self._raw_url(file_path)
+        controller = self.download_controller
+        for attempt in range(1, attempts + 1):
+            async with slots:
+                while not controller.try_acquire():
+                    pause = controller.pause_remaining()
+                    try:
+                        await asyncio.wait_for(slots.wait(), timeout=pause if pause > 0 else None)
+                    except asyncio.TimeoutError:
+                        pass
+            started = time.monotonic()
+            try:
+                with self._open_download(file_path, target_path) as download:
+                    decoder = ContentDecoder(download.write)
+                    response_headers, _ = await client.get(
+                        url, self._raw_headers(), sink=decoder.write, on_headers=decoder.start
+                    )
+                    decoder.finish()
+                    sha = download.commit()
+                controller.record_success(time.monotonic() - started, response_headers)
+                self._record_transfer(decoder)
+                self._store_in_cache(file_path, target_path, sha, download.size)
+                success = True
+                break
+            except Exception as error:  # noqa: BLE001
+                last_error = error
+                self._record_congestion(controller, error)
+            finally:
+                controller.release()
+                async with slots:
+                    slots.notify_all()
+            if attempt < attempts:
+                await asyncio.sleep(self._compute_retry_wait(attempt))
+        
+        self._record_download_result(file_path, target_path, success, last_error)
+        return success
+    
+    def scan_and_download_pipelined(
+        self,
+        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]],
+        single_files: List[Tuple[str, Path]],
+        work_dir: Path,
+        manifest: Optional[Dict] = None,
+    ) -> Tuple[Optional[List[Tuple[str, Path]]], bool, set]:
+        """以生產者／消費者管線同時掃描目錄與下載文件（contents API 掃描模式）
+        
+        掃描執行緒每取得一份目錄清單，就將其中的文件放入有界下載佇列，下載工作者同時從佇列取出下載，
+        不需等待所有目錄掃描完成；進度條總數隨掃描結果增加。未變更的文件（增量更新）不會進入佇列，
+        同一 blob 只下載一次，其餘目標路徑於下載完成後以硬連結或複製補齊。
+        
+        Args:
+            directories: 目錄映射 [(source_dir, target_dir, transform), ...]
+            single_files: 單檔映射 [(source_path, target_path), ...]
+            work_dir: 工作目錄
+            manifest: 既有安裝清單（存在時跳過未變更的文件）
+            
+        Returns:
+            Tuple[Optional[List[Tuple[str, Path]]], bool, set]:
+                (所有文件列表，掃描失敗時為 None; 下載是否全部成功; 無法安裝的目標路徑)
+        """
+        client: Optional[AsyncHttpClient] = None
+        if self.engine == 'async':
+            client = AsyncHttpClient()
+            if not client.supports(self.base_raw_url):
+                print("  ⚠ 目前的 Python 版本無法在 asyncio 引擎中使用 HTTPS 代理通道，改用執行緒引擎")
+                self.engine = 'thread'
+                client = None
+        
+        work_queue: "queue.Queue[Optional[Tuple[str, Path]]]" = queue.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+        lock = threading.Lock()
+        all_files: List[Tuple[str, Path]] = []
+        first_target: Dict[str, Path] = {}
+        duplicates: Dict[Path, List[Path]] = {}
+        unchanged = 0
+        
+        self.progress_bar = ProgressBar(total=0, prefix="下載進度", growing=True)
+        self.failed_files = []
+        
+        def enqueue(source_path: str, target_path: Path):
+            """掃描執行緒取得文件後立即排入下載佇列（佇列已滿時等待）"""
+            nonlocal unchanged
+            with lock:
+                all_files.append((source_path, target_path))
+                if self._is_unchanged(manifest, work_dir, source_path, target_path):
+                    unchanged += 1
+                    return
+                key = (self.remote_meta.get(source_path) or {}).get('sha') or source_path
+                if key in first_target:
+                    duplicates[first_target[key]].append(target_path)
+                    return
+                first_target[key] = target_path
+                duplicates[target_path] = []
+            self.progress_bar.add_total(1)
+            work_queue.put((source_path, target_path))
+        
+        def download_guarded(source_path: str, target_path: Path):
+            # 未預期的錯誤（如無法建立目錄）也要記錄為失敗，避免工作者結束後佇列無人消化
+            try:
+                self.download_file(source_path, target_path)
+            except Exception as error:  # noqa: BLE001
+                self._record_download_result(source_path, target_path, False, error)
+        
+        def consume():
+            while True:
+                item = work_queue.get()
+                if item is None:
+                    return
+                download_guarded(*item)
+        
+        def consume_async():
+            loop = asyncio.new_event_loop()
+            
+            async def download_async_guarded(slots: asyncio.Condition, source_path: str, target_path: Path):
+                try:
+                    await self._download_file_async(client, slots, source_path, target_path)
+                except Exception as error:  # noqa: BLE001
+                    self._record_download_result(source_path, target_path, False, error)
+            
+            async def dispatch():
+                # 由單一協程從佇列取出文件並建立下載任務，實際並行數由 slots 與控制器限制
+                slots = asyncio.Condition()
+                tasks = []
+                try:
+                    while True:
+                        item = await loop.run_in_executor(None, work_queue.get)
+                        if item is None:
+                            break
+                        tasks.append(loop.create_task(download_async_guarded(slots, *item)))
+                    await asyncio.gather(*tasks)
+                finally:
+                    client.close()
+            
+            try:
+                loop.run_until_complete(dispatch())
+            finally:
+                loop.close()
+        
+        controller = self.download_controller
+        if client is not None:
+            consumers = [threading.Thread(target=consume_async, daemon=True)]
+            print(f"  以 asyncio 引擎同步下載 (自適應並行度: 初始 {controller.current_limit}，上限 {controller.maximum})")
+        else:
+            consumers = [threading.Thread(target=consume, daemon=True) for _ in range(controller.maximum)]
+            print(f"  同步下載 (自適應並行度: 初始 {controller.current_limit}，上限 {controller.maximum})")
+        for consumer in consumers:
+            consumer.start()
+        
+        scanned: Optional[List[Tuple[str, Path]]] = None
+        try:
+            for source_path, target_path in single_files:
+                if manifest is not None or self.cache is not None:
+                    # 單檔不在目錄清單內，需另外查詢 blob SHA 才能與安裝清單比對或從快取還原
+                    try:
+                        meta = self.get_directory_contents(source_path)
+                    except urllib.error.HTTPError:
+                        meta = None
+                    if isinstance(meta, dict) and meta.get('sha'):
+                        self.remote_meta[source_path] = {'sha': meta['sha'], 'size': meta.get('size')}
+                enqueue(source_path, target_path)
+            scanned = self.collect_directory_files_parallel(directories, on_file=enqueue)
+        finally:
+            self.progress_bar.close_total()
+            for _ in consumers:
+                work_queue.put(None)
+            for consumer in consumers:
+                consumer.join()
+        
+        total = self.progress_bar.total
+        success = self._finish_downloads(total) if total else True
+        if client is not None and total:
+            print(f"  asyncio 連線統計: {client.summary()}")
+        failed_targets = {target_path for _, target_path, _ in self.failed_files}
+        failed_targets |= self._fan_out(
+            {origin: targets for origin, targets in duplicates.items() if targets}, failed_targets
+        )
+        
+        if scanned is None or (not scanned and directories):
+            return None, False, failed_targets
+        print(f"  ✓ 掃描完成，共找到 {len(all_files)} 個文件")
+        if manifest is not None:
+            print(f"  增量更新: {len(all_files) - unchanged} 個文件有變更，{unchanged} 個文件未變更")
+        return all_files, success and not failed_targets, failed_targets
     
-    def install_claude_code(self, work_dir: Path, auto_yes: bool = False) -> bool:
-        """安裝 claude-code 版本
+    def _resolve_targets(
+        self,
+        source_path: str,
+        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]],
+        single_files: Dict[str, Path],
+    ) -> List[Path]:
+        """依目錄映射表與單檔映射表，將倉庫路徑解析為本地目標路徑
+
+        Args:
+            source_path: GitHub 倉庫中的文件路徑
+            directories: 目錄映射 [(source_dir, target_dir, transform), ...]
+            single_files: 單檔映射 {source_path: target_path}
+
+        Returns:
+            List[Path]: 對應的本地目標路徑（不需要安裝時為空列表）
+        """
+        targets: List[Path] = []
+        if source_path in single_files:
+            targets.append(single_files[source_path])
+
+        for source_dir, target_dir, transform in directories:
+            prefix = source_dir.rstrip('/') + '/'
+            if not source_path.startswith(prefix):
+                continue
+            target_path = target_dir.joinpath(*source_path[len(prefix):].split('/'))
+            if transform:
+                target_path = transform(target_path)
+                if target_path is None:
+                    continue
+            targets.append(target_path)
+
+        return targets
+
+    def install_from_archive(
+        self,
+        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]],
+        single_files: List[Tuple[str, Path]],
+        work_dir: Path,
+        manifest: Optional[Dict] = None,
+    ) -> Tuple[bool, List[Tuple[str, Path]], Optional[str]]:
+        """以單一 tarball 請求下載分支內容，並串流解壓所需文件
 
         Args:
+            directories: 目錄映射 [(source_dir, target_dir, transform), ...]
+            single_files: 單檔映射 [(source_path, target_path), ...]
             work_dir: 工作目錄
-            auto_yes: 自動確認模式
-            
+            manifest: 既有安裝清單（存在時跳過未變更的文件）
+
         Returns:
-            bool: 安裝是否成功
+            Tuple[bool, List[Tuple[str, Path]], Optional[str]]: (是否成功, 安裝的文件列表, commit SHA)
         """
-        print(f"\n開始安裝 Sunnycore (claude-code 版本) 到: {work_dir}")
-        print("=" * 60)
-        
-        claude_dir = work_dir / ".claude"
-        sunnycore_dir = work_dir / "sunnycore"
+        url = f"{self.base_archive_url}/tar.gz/{urllib.parse.quote(self.ref)}"
+        single_map = dict(single_files)
 
-        existing_paths = [path for path in (claude_dir, sunnycore_dir) if path.exists()]
-        if existing_paths:
-            if not auto_yes:
-                try:
-                    response = safe_input(f"\n目錄已存在，是否覆寫? (y/N): ").strip().lower()
-                    if response != 'y':
-                        print("安裝已取消")
-                        return False
-                except EOFError:
-                    print("\n✗ 無法讀取用戶輸入，請使用 -y 參數自動確認覆寫")
-                    return False
-            print("\n正在清理舊版本檔案...")
-            if not self._cleanup_paths(existing_paths):
-                return False
+        print(f"\n正在下載分支壓縮檔並串流解壓: {url}")
 
-        directories = [
-            ("claude code/commands", claude_dir / "commands", None),
-            ("hooks", claude_dir / "hooks", None),
-            ("tasks", sunnycore_dir / "tasks", lambda path: None if path.name == "init.md" else path),
-            ("templates", sunnycore_dir / "templates", None),
-            ("scripts", sunnycore_dir / "scripts", None),
-        ]
-
-        single_files = [
-            ("config/CLAUDE.md", sunnycore_dir / "CLAUDE.md"),
-            ("claude code/tasks/init.md", sunnycore_dir / "tasks" / "init.md"),
-            ("claude code/tasks/document-project.md", sunnycore_dir / "tasks" / "document-project.md"),
-        ]
-
-        print("\n正在並行掃描目錄結構...")
-        all_files = self.collect_directory_files_parallel(directories)
-
-        if not all_files and directories:
-            print("  ✗ 無法掃描目錄結構")
-            return False
+        last_error: Optional[Exception] = None
+        commit: Optional[str] = None
+        for attempt in range(1, self.max_retries + 1):
+            installed: List[Tuple[str, Path]] = []
+            written = 0
+            try:
+                headers = {
+                    "User-Agent": "SunnycoreInstaller/1.0 (+https://github.com/Yamiyorunoshura/sunnycore)",
+                }
+                start_time = time.time()
+                with self.http_pool.open(url, headers) as response:
+                    # 以串流模式讀取，逐一成員直接寫入磁碟，不需暫存整個壓縮檔
+                    with tarfile.open(fileobj=response, mode="r|gz") as archive:
+                        # tarball 頂層為 {repo}-{branch}/，需去除第一層目錄
+                        written = self._extract_tar(archive, 1, directories, single_map, work_dir, manifest, installed)
+                        # GitHub tarball 的 pax 全域標頭註解即為 commit SHA
+                        commit = archive.pax_headers.get('comment')
+                print()
+                last_error = None
+                break
+            except Exception as error:  # noqa: BLE001
+                last_error = error
+                print()
+                if attempt < self.max_retries:
+                    wait_seconds = self._compute_retry_wait(attempt)
+                    print(f"  ⚠ 壓縮檔下載失敗 ({self._format_error(error)})，{wait_seconds:.1f} 秒後重試... (嘗試 {attempt}/{self.max_retries})")
+                    time.sleep(wait_seconds)
 
-        all_files.extend(single_files)
+        if last_error is not None:
+            print(f"✗ 無法下載分支壓縮檔: {self._format_error(last_error)}")
+            return False, [], None
 
-        print(f"  ✓ 掃描完成，共找到 {len(all_files)} 個文件")
+        if not self._check_installed(installed, single_files, "壓縮檔"):
+            return False, installed, commit
 
-        success = self.download_files_parallel(all_files)
+        elapsed = time.time() - start_time
+        print(f"✓ 全部完成: {len(installed)} 個文件已安裝，其中 {written} 個寫入磁碟（1 次請求，耗時 {elapsed:.1f} 秒）")
+        return True, installed, commit
 
-        if success:
-            print("\n" + "=" * 60)
-            print("✓ 安裝完成!")
-            print("\n安裝結構:")
-            print(f"{work_dir}/")
-            print(f"├── .claude/")
-            print(f"│   ├── commands/")
-            print(f"│   └── hooks/")
-            print(f"└── sunnycore/")
-            print(f"    ├── CLAUDE.md")
-            print(f"    ├── tasks/")
-            print(f"    ├── templates/")
-            print(f"    └── scripts/")
-            print("\n請查看 sunnycore/CLAUDE.md 開始使用 Sunnycore!")
-        else:
-            print("\n✗ 安裝過程中出現錯誤")
+    def install_from_source(
+        self,
+        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]],
+        single_files: List[Tuple[str, Path]],
+        work_dir: Path,
+        manifest: Optional[Dict] = None,
+    ) -> Tuple[bool, List[Tuple[str, Path]], Optional[str]]:
+        """從本地來源（倉庫目錄、tar 壓縮檔或 git bundle）安裝，不發出任何網路請求
 
-        return success
+        Args:
+            directories: 目錄映射 [(source_dir, target_dir, transform), ...]
+            single_files: 單檔映射 [(source_path, target_path), ...]
+            work_dir: 工作目錄
+            manifest: 既有安裝清單（存在時跳過未變更的文件）
 
-    def install_codex(self, work_dir: Path, auto_yes: bool = False) -> bool:
-        """安裝 codex 版本"""
+        Returns:
+            Tuple[bool, List[Tuple[str, Path]], Optional[str]]: (是否成功, 安裝的文件列表, commit SHA)
+        """
+        source = self.source
+        single_map = dict(single_files)
+        installed: List[Tuple[str, Path]] = []
+        start_time = time.time()
+        try:
+            if source.is_dir():
+                print(f"\n正在從本地目錄複製文件: {source}")
+                written, commit = self._copy_from_directory(source, directories, single_map, work_dir, manifest, installed)
+            elif is_git_bundle(source):
+                print(f"\n正在從 git bundle 解出文件: {source}")
+                written, commit = self._extract_git_bundle(source, directories, single_map, work_dir, manifest, installed)
+            elif tarfile.is_tarfile(source):
+                print(f"\n正在從本地壓縮檔解壓文件: {source}")
+                with tarfile.open(source, mode="r:*") as archive:
+                    written = self._extract_tar(
+                        archive, tar_strip_depth(archive), directories, single_map, work_dir, manifest, installed
+                    )
+                    commit = archive.pax_headers.get('comment')
+                print()
+            else:
+                print(f"✗ 無法辨識的本地來源（需為目錄、.tar.gz 壓縮檔或 git bundle）: {source}")
+                return False, [], None
+        except (OSError, tarfile.TarError, subprocess.SubprocessError, ValueError) as error:
+            print()
+            print(f"✗ 無法從本地來源安裝: {self._format_error(error)}")
+            return False, [], None
 
-        print(f"\n開始安裝 Sunnycore (codex 版本) 到: {work_dir}")
-        print("=" * 60)
+        if not self._check_installed(installed, single_files, "本地來源"):
+            return False, installed, commit
 
-        codex_prompts_dir = Path.home() / ".codex" / "prompts"
-        sunnycore_dir = work_dir / "sunnycore"
+        elapsed = time.time() - start_time
+        print(f"✓ 全部完成: {len(installed)} 個文件已安裝，其中 {written} 個寫入磁碟（本地來源，耗時 {elapsed:.1f} 秒）")
+        return True, installed, commit
 
-        prompts_exist = codex_prompts_dir.exists() and any(codex_prompts_dir.glob("*.prompt.md"))
+    def _copy_from_directory(
+        self,
+        source: Path,
+        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]],
+        single_map: Dict[str, Path],
+        work_dir: Path,
+        manifest: Optional[Dict],
+        installed: List[Tuple[str, Path]],
+    ) -> Tuple[int, Optional[str]]:
+        """從本地倉庫目錄並行複製（或硬連結）符合目錄映射的文件
 
-        existing_paths = [sunnycore_dir] if sunnycore_dir.exists() else []
-        if prompts_exist:
-            existing_paths.append(codex_prompts_dir)
+        git 倉庫只複製 git ls-files 列出的追蹤文件（略過未追蹤的文件與建置產物），
+        其他目錄則略過 __pycache__ 與 *.py[cod]。
 
-        if existing_paths:
-            if not auto_yes:
-                try:
-                    response = safe_input(f"\n目標位置已存在 Codex 提示或 Sunnycore 檔案，是否覆寫? (y/N): ").strip().lower()
-                    if response != 'y':
-                        print("安裝已取消")
-                        return False
-                except EOFError:
-                    print("\n✗ 無法讀取用戶輸入，請使用 -y 參數自動確認覆寫")
-                    return False
-            print("\n正在清理舊版本檔案...")
-            if not self._cleanup_paths(existing_paths):
-                return False
+        Returns:
+            Tuple[int, Optional[str]]: (實際寫入磁碟的文件數, 倉庫 HEAD 的 commit SHA；有未提交修改時為 None)
+        """
+        candidates: List[Tuple[str, Path, List[Path]]] = []
+        for source_path in self._list_source_files(source):
+            path = source / source_path
+            # 與檔案樹掃描一致，略過符號連結（以及已刪除但尚未提交的追蹤文件）
+            if path.is_symlink() or not path.is_file():
+                continue
+            targets = self._resolve_targets(source_path, directories, single_map)
+            if targets:
+                candidates.append((source_path, path, targets))
 
-        directories = [
-            ("codex/commands", codex_prompts_dir, lambda path: path.with_suffix('.prompt.md')),
-            ("tasks", sunnycore_dir / "tasks", lambda path: None if path.name == "init.md" else path),
-            ("templates", sunnycore_dir / "templates", None),
-            ("scripts", sunnycore_dir / "scripts", None),
-        ]
+        def place(candidate: Tuple[str, Path, List[Path]]) -> int:
+            source_path, path, targets = candidate
+            sha, size = file_blob_sha(path)
+            self.remote_meta[source_path] = {'sha': sha, 'size': size}
+            count = 0
+            for target_path in targets:
+                if self._is_unchanged(manifest, work_dir, source_path, target_path):
+                    continue
+                link_or_copy(path, target_path, self.use_hardlinks)
+                count += 1
+            return count
 
-        single_files = [
-            ("config/AGENTS.md", sunnycore_dir / "AGENTS.md"),
-            ("codex/tasks/init.md", sunnycore_dir / "tasks" / "init.md"),
-            ("codex/tasks/document-project.md", sunnycore_dir / "tasks" / "document-project.md"),
-        ]
+        written = 0
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4)) as executor:
+            for (source_path, _, targets), count in zip(candidates, executor.map(place, candidates)):
+                installed.extend((source_path, target_path) for target_path in targets)
+                written += count
+        return written, git_head_commit(source)
 
-        print("\n正在並行掃描目錄結構...")
-        all_files = self.collect_directory_files_parallel(directories)
+    @staticmethod
+    def _list_source_files(source: Path) -> List[str]:
+        """列出本地來源目錄中要安裝的文件（排序後的相對路徑）"""
+        tracked = git_tracked_files(source)
+        if tracked is not None:
+            return sorted(tracked)
+        files = []
+        for root, dirnames, filenames in os.walk(source):
+            dirnames[:] = sorted(name for name in dirnames if name not in ('.git', '__pycache__'))
+            for name in sorted(filenames):
+                if name.endswith(('.pyc', '.pyo', '.pyd')):
+                    continue
+                files.append((Path(root) / name).relative_to(source).as_posix())
+        return files
 
-        if not all_files and directories:
-            print("  ✗ 無法掃描目錄結構")
-            return False
+    def _extract_git_bundle(
+        self,
+        bundle: Path,
+        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]],
+        single_map: Dict[str, Path],
+        work_dir: Path,
+        manifest: Optional[Dict],
+        installed: List[Tuple[str, Path]],
+    ) -> Tuple[int, Optional[str]]:
+        """將 git bundle 複製為暫存 bare 倉庫，再以 git archive 串流解出分支內容（需要 git 指令）
 
-        all_files.extend(single_files)
+        Returns:
+            Tuple[int, Optional[str]]: (實際寫入磁碟的文件數, commit SHA)
+        """
+        if not shutil.which('git'):
+            raise ValueError("從 git bundle 安裝需要 git 指令")
+        with tempfile.TemporaryDirectory(prefix="sunnycore-bundle-") as git_dir:
+            subprocess.run(
+                ['git', 'clone', '--quiet', '--bare', str(bundle), git_dir],
+                check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            )
+            # bundle 中有指定分支時使用該分支，否則使用 bundle 的 HEAD
+            has_branch = subprocess.run(
+                ['git', '--git-dir', git_dir, 'rev-parse', '--verify', '--quiet', f'refs/heads/{self.branch}'],
+                stdout=subprocess.DEVNULL,
+            ).returncode == 0
+            ref = f'refs/heads/{self.branch}' if has_branch else 'HEAD'
+            process = subprocess.Popen(
+                ['git', '--git-dir', git_dir, 'archive', '--format=tar', ref],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            )
+            try:
+                with tarfile.open(fileobj=process.stdout, mode="r|") as archive:
+                    written = self._extract_tar(archive, 0, directories, single_map, work_dir, manifest, installed)
+                    # git archive 以 pax 全域標頭註解記錄 commit SHA
+                    commit = archive.pax_headers.get('comment')
+            finally:
+                process.stdout.close()
+                stderr = process.stderr.read().decode(errors='replace').strip()
+                process.stderr.close()
+                process.wait()
+            print()
+            if process.returncode != 0:
+                raise ValueError(f"git archive 失敗: {stderr}")
+        return written, commit
 
-        print(f"  ✓ 掃描完成，共找到 {len(all_files)} 個文件")
+    def _extract_tar(
+        self,
+        archive: tarfile.TarFile,
+        strip: int,
+        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]],
+        single_map: Dict[str, Path],
+        work_dir: Path,
+        manifest: Optional[Dict],
+        installed: List[Tuple[str, Path]],
+    ) -> int:
+        """逐一讀取 tar 成員，只解壓符合目錄映射的文件並放置到各目標路徑
 
-        success = self.download_files_parallel(all_files)
+        Args:
+            archive: 已開啟的 tar 壓縮檔（可為串流模式）
+            strip: 成員路徑需去除的前置目錄層數
+            directories: 目錄映射 [(source_dir, target_dir, transform), ...]
+            single_map: 單檔映射 {source_path: target_path}
+            work_dir: 工作目錄
+            manifest: 既有安裝清單（存在時跳過未變更的文件）
+            installed: 已安裝文件列表（就地附加）
 
-        if success:
-            print("\n" + "=" * 60)
-            print("✓ 安裝完成!")
-            print("\n安裝結構:")
-            print(f"{Path.home()}/")
-            print(f"└── .codex/")
-            print(f"    └── prompts/  # Sunnycore 指令 (.prompt.md)")
-            print(f"{work_dir}/")
-            print(f"└── sunnycore/")
-            print(f"    ├── AGENTS.md")
-            print(f"    ├── tasks/")
-            print(f"    ├── templates/")
-            print(f"    └── scripts/")
-            print("\n請查看 sunnycore/AGENTS.md 與 prompts 了解使用方式!")
+        Returns:
+            int: 實際寫入磁碟的文件數
+        """
+        written = 0
+        for member in archive:
+            if not member.isfile():
+                continue
+            parts = member.name.split('/')[strip:]
+            if not parts or any(part in ('', '.', '..') for part in parts):
+                continue
+            source_path = '/'.join(parts)
+            targets = self._resolve_targets(source_path, directories, single_map)
+            if not targets:
+                continue
+
+            extracted = archive.extractfile(member)
+            if extracted is None:
+                continue
+            # 先串流寫入第一個目標旁的暫存檔以取得 blob SHA，再依安裝清單決定是否放置
+            with AtomicDownload(targets[0], expected_size=member.size) as download:
+                download.copy_from(extracted)
+                sha = download.finish()
+                self.remote_meta[source_path] = {'sha': sha, 'size': member.size}
+                placed: Optional[Path] = None
+                for target_path in targets:
+                    installed.append((source_path, target_path))
+                    if self._is_unchanged(manifest, work_dir, source_path, target_path):
+                        continue
+                    target_path.parent.mkdir(parents=True, exist_ok=True)
+                    if placed is None and target_path == download.target_path:
+                        download.commit()
+                        placed = target_path
+                    else:
+                        link_or_copy(placed or download.tmp_path, target_path, self.use_hardlinks)
+                    written += 1
+            print(f"\r  解壓中: {len(installed)} 個文件", end='', flush=True)
+        return written
+
+    def _check_installed(self, installed: List[Tuple[str, Path]], single_files: List[Tuple[str, Path]], origin: str) -> bool:
+        """確認所有單檔都已安裝且至少有一個文件符合安裝目錄，否則列出缺少的文件"""
+        installed_sources = {source for source, _ in installed}
+        missing = [(source, target) for source, target in single_files if source not in installed_sources]
+        if installed and not missing:
+            return True
+        print(f"\n✗ {origin}中缺少以下文件：")
+        for source_path, target_path in missing:
+            print(f"  - {source_path} -> {target_path}")
+        if not installed:
+            print("  - 沒有任何文件符合安裝目錄")
+        return False
+
+    def install_files(
+        self,
+        work_dir: Path,
+        variant: str,
+        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]],
+        single_files: List[Tuple[str, Path]],
+        manifest: Optional[Dict] = None,
+    ) -> bool:
+        """依安裝模式掃描並下載目錄與單檔，完成後寫入安裝清單
+
+        有既有安裝清單時進行增量更新：只下載 blob SHA 有變更的文件，
+        刪除遠端已移除的文件，其餘文件保持不動。
+
+        Args:
+            work_dir: 工作目錄
+            variant: 安裝版本名稱
+            directories: 目錄映射 [(source_dir, target_dir, transform), ...]
+            single_files: 單檔映射 [(source_path, target_path), ...]
+            manifest: 既有安裝清單
+
+        Returns:
+            bool: 所有文件是否都安裝成功
+        """
+        if self.source is not None or self.use_archive:
+            install = self.install_from_source if self.source is not None else self.install_from_archive
+            success, all_files, commit = install(directories, single_files, work_dir, manifest)
+            if not all_files:
+                return False
+            failed_targets = set()
         else:
-            print("\n✗ 安裝過程中出現錯誤")
+            # 先將分支固定為 commit SHA，掃描與下載都使用同一個快照，安裝期間的新推送不會混入
+            commit = self.resolve_commit_sha()
+            if commit:
+                print(f"\n已固定來源 commit: {commit[:12]}（分支 {self.branch}）")
+            elif not self.offline:
+                print(f"\n  ⚠ 無法解析分支 {self.branch} 的 commit，改以分支名稱下載（安裝期間若有新推送可能混合不同版本）")
+            all_files = None
+            if self.scan_backend == 'tree':
+                print("\n正在透過 Git Trees API 掃描目錄結構（單次請求）...")
+                all_files = self.collect_files_from_tree(directories, single_files)
+                if all_files is None:
+                    print("  ⚠ 無法使用檔案樹，改用逐目錄掃描")
+
+            if all_files is None:
+                # 逐目錄掃描需多次 API 請求，掃描與下載以管線方式重疊進行
+                print("\n正在並行掃描目錄結構，並同步下載已發現的文件...")
+                all_files, success, failed_targets = self.scan_and_download_pipelined(
+                    directories, single_files, work_dir, manifest
+                )
+                if all_files is None:
+                    print("  ✗ 無法掃描目錄結構")
+                    return False
+            else:
+                print(f"  ✓ 掃描完成，共找到 {len(all_files)} 個文件")
+
+                to_download = [
+                    (source_path, target_path)
+                    for source_path, target_path in all_files
+                    if not self._is_unchanged(manifest, work_dir, source_path, target_path)
+                ]
+                if manifest is not None:
+                    print(f"  增量更新: {len(to_download)} 個文件有變更，{len(all_files) - len(to_download)} 個文件未變更")
+
+                # 同一 blob 只下載一次，其餘目標路徑於下載後以硬連結或複製補齊
+                unique_downloads, duplicates = self._group_by_blob(to_download)
+                success = self.download_files_parallel(unique_downloads)
+                failed_targets = {target_path for _, target_path, _ in self.failed_files}
+                failed_targets |= self._fan_out(duplicates, failed_targets)
+                success = success and not failed_targets
+
+        if manifest is not None:
+            roots = {target_dir for _, target_dir, _ in directories}
+            removed = self._remove_stale_files(manifest, work_dir, {target for _, target in all_files}, roots)
+            if removed:
+                print(f"  ✓ 已移除 {removed} 個遠端已刪除的文件")
 
+        self.write_install_manifest(
+            work_dir,
+            variant,
+            commit,
+            [(source, target) for source, target in all_files if target not in failed_targets],
+        )
+        if self.http_pool.requests:
+            print(f"  連線統計: {self.http_pool.summary()}")
+        if self.bytes_on_wire or self.api_bytes_on_wire:
+            print(
+                f"  傳輸量: 文件 網路 {self._format_bytes(self.bytes_on_wire)} → 寫入 {self._format_bytes(self.bytes_written)}，"
+                f"API 網路 {self._format_bytes(self.api_bytes_on_wire)} → 解壓後 {self._format_bytes(self.api_bytes_decoded)}"
+            )
+        if self.api_snapshot_hits:
+            print(f"  API 清單: {self.api_snapshot_hits} 份直接取自同一 commit 的快取（未發出請求）")
+        if self.api_not_modified:
+            print(f"  API 條件請求: {self.api_not_modified}/{self.api_requests} 次回應 304 未變更（沿用快取清單，不計入速率限制）")
+        if commit:
+            print(f"  來源 commit: {commit}")
         return success
-    
-    def install_cursor(self, work_dir: Path, auto_yes: bool = False) -> bool:
-        """安裝 cursor 版本
 
+    def _group_by_blob(
+        self,
+        file_list: List[Tuple[str, Path]],
+    ) -> Tuple[List[Tuple[str, Path]], Dict[Path, List[Path]]]:
+        """依 blob SHA（未知時依來源路徑）合併重複內容，讓每個 blob 只下載一次
+        
+        Args:
+            file_list: 文件列表 [(source_path, target_path), ...]
+            
+        Returns:
+            Tuple[List[Tuple[str, Path]], Dict[Path, List[Path]]]:
+                (需要下載的文件, {下載目標路徑: [共用同一內容的其他目標路徑]})
+        """
+        unique: List[Tuple[str, Path]] = []
+        duplicates: Dict[Path, List[Path]] = {}
+        first_target: Dict[str, Path] = {}
+        for source_path, target_path in file_list:
+            key = (self.remote_meta.get(source_path) or {}).get('sha') or source_path
+            if key in first_target:
+                duplicates[first_target[key]].append(target_path)
+                continue
+            first_target[key] = target_path
+            duplicates[target_path] = []
+            unique.append((source_path, target_path))
+        return unique, {origin: targets for origin, targets in duplicates.items() if targets}
+    
+    def _fan_out(self, duplicates: Dict[Path, List[Path]], failed_targets: set) -> set:
+        """將已下載的文件以硬連結或複製放置到共用同一 blob 的其他目標路徑
+        
+        Returns:
+            set: 無法放置的目標路徑
+        """
+        failed = set()
+        placed = 0
+        for origin, targets in duplicates.items():
+            if origin in failed_targets:
+                failed.update(targets)
+                continue
+            for target_path in targets:
+                try:
+                    link_or_copy(origin, target_path, self.use_hardlinks)
+                    placed += 1
+                except OSError as error:
+                    print(f"  ✗ 無法放置 {target_path}: {error}")
+                    failed.add(target_path)
+        if placed:
+            method = "硬連結" if self.use_hardlinks else "複製"
+            print(f"  ✓ {placed} 個文件與其他路徑共用相同內容，已以{method}放置（未重複下載）")
+        return failed
+    
+    def _variant_path(self, work_dir: Path, path: str, home: Optional[Path] = None) -> Path:
+        """將版本定義表中的目標路徑解析為本地路徑"""
+        if path.startswith("~/"):
+            return (home or Path.home()) / path[2:]
+        return work_dir / path
+    
+    def build_install_plan(
+        self,
+        work_dir: Path,
+        variants: List[str],
+        home: Optional[Path] = None,
+        warn: bool = True,
+    ) -> Tuple[List[Tuple[str, Path, Optional[Callable[[Path], Path]]]], List[Tuple[str, Path]]]:
+        """依版本定義表合併多個版本的目錄與單檔映射
+        
+        共用目錄（tasks、templates、scripts）只保留一份；多個版本寫入同一目標路徑的單檔
+        （如 sunnycore/tasks/init.md）以先列出的版本為準並顯示警告。
+        
+        Args:
+            work_dir: 工作目錄
+            variants: 版本名稱列表（依優先順序）
+            home: 取代使用者家目錄的路徑（預設為 Path.home()）
+            warn: 是否顯示單檔衝突警告
+            
+        Returns:
+            Tuple: (目錄映射 [(source_dir, target_dir, transform), ...], 單檔映射 [(source_path, target_path), ...])
+        """
+        directories: List[Tuple[str, Path, Optional[Callable[[Path], Path]]]] = []
+        seen_directories = set()
+        single_files: List[Tuple[str, Path]] = []
+        single_owner: Dict[Path, Tuple[str, str]] = {}
+        conflicts: Dict[str, List[str]] = {}
+        
+        for variant in variants:
+            spec = VARIANTS[variant]
+            for source_dir, target, transform in spec['directories']:
+                target_dir = self._variant_path(work_dir, target, home)
+                if (source_dir, target_dir) in seen_directories:
+                    continue
+                seen_directories.add((source_dir, target_dir))
+                directories.append((source_dir, target_dir, transform))
+            for source_path, target in spec['single_files']:
+                target_path = self._variant_path(work_dir, target, home)
+                owner = single_owner.get(target_path)
+                if owner is None:
+                    single_owner[target_path] = (variant, source_path)
+                    single_files.append((source_path, target_path))
+                elif owner[1] != source_path:
+                    conflicts.setdefault(target, [VARIANTS[owner[0]]['label']]).append(spec['label'])
+        
+        for target, labels in (conflicts.items() if warn else ()):
+            print(f"  ⚠ 警告: {target} 由多個版本提供（{'、'.join(labels)}），保留 {labels[0]} 版本")
+        
+        return directories, single_files
+    
+    def _existing_install_paths(self, work_dir: Path, variants: List[str], include_home: bool = True) -> List[Path]:
+        """列出各版本既有安裝的路徑（供覆寫確認與清理使用）"""
+        existing_paths: List[Path] = []
+        for variant in variants:
+            for target, pattern in VARIANTS[variant]['cleanup']:
+                if target.startswith("~/") and not include_home:
+                    continue
+                path = self._variant_path(work_dir, target)
+                if path in existing_paths or not path.exists():
+                    continue
+                if pattern and not any(path.glob(pattern)):
+                    continue
+                existing_paths.append(path)
+        return existing_paths
+    
+    def install_variants(self, work_dir: Path, variants: List[str], auto_yes: bool = False) -> bool:
+        """依版本定義表安裝一個或多個版本（多個版本時共用掃描與下載）
+        
         Args:
             work_dir: 工作目錄
+            variants: 版本名稱列表（依優先順序，如 ["claude", "codex", "cursor"]）
             auto_yes: 自動確認模式
             
         Returns:
             bool: 安裝是否成功
         """
-        print(f"\n開始安裝 Sunnycore (cursor 版本) 到: {work_dir}")
+        labels = " + ".join(VARIANTS[variant]['label'] for variant in variants)
+        print(f"\n開始安裝 Sunnycore ({labels} 版本) 到: {work_dir}")
         print("=" * 60)
         
-        cursor_dir = work_dir / ".cursor"
-        sunnycore_dir = work_dir / "sunnycore"
-
-        existing_paths = [path for path in (cursor_dir, sunnycore_dir) if path.exists()]
+        # 安裝清單以版本組合為鍵（單一版本時與舊版清單相容）
+        variant_key = "+".join(variants)
+        manifest = self.load_install_manifest(work_dir, variant_key)
+        
+        existing_paths = self._existing_install_paths(work_dir, variants)
         if existing_paths:
-            if not auto_yes:
-                try:
-                    response = safe_input(f"\n目錄已存在，是否覆寫? (y/N): ").strip().lower()
-                    if response != 'y':
-                        print("安裝已取消")
-                        return False
-                except EOFError:
-                    print("\n✗ 無法讀取用戶輸入，請使用 -y 參數自動確認覆寫")
-                    return False
-            print("\n正在清理舊版本檔案...")
-            if not self._cleanup_paths(existing_paths):
+            if len(variants) == 1:
+                prompt = VARIANTS[variants[0]]['overwrite_prompt']
+            else:
+                prompt = "\n目標位置已存在 Sunnycore 檔案，是否覆寫? (y/N): "
+            if not self._confirm_existing(prompt, manifest, auto_yes):
                 return False
-
-        directories = [
-            ("cursor/commands", cursor_dir / "commands", None),
-            ("tasks", sunnycore_dir / "tasks", lambda path: None if path.name == "init.md" else path),
-            ("templates", sunnycore_dir / "templates", None),
-            ("scripts", sunnycore_dir / "scripts", None),
-        ]
-
-        single_files = [
-            ("config/CURSOR.mdc", sunnycore_dir / "cursor.mdc"),
-            ("cursor/tasks/init.md", sunnycore_dir / "tasks" / "init.md"),
-            ("cursor/tasks/document-project.md", sunnycore_dir / "tasks" / "document-project.md"),
-        ]
-
-        print("\n正在並行掃描目錄結構...")
-        all_files = self.collect_directory_files_parallel(directories)
-
-        if not all_files and directories:
-            print("  ✗ 無法掃描目錄結構")
-            return False
-
-        all_files.extend(single_files)
-
-        print(f"  ✓ 掃描完成，共找到 {len(all_files)} 個文件")
-
-        success = self.download_files_parallel(all_files)
-
+            if manifest is None:
+                print("\n正在清理舊版本檔案...")
+                if not self._cleanup_paths(existing_paths):
+                    return False
+        
+        directories, single_files = self.build_install_plan(work_dir, variants)
+        success = self.install_files(work_dir, variant_key, directories, single_files, manifest)
+        
         if success:
             print("\n" + "=" * 60)
             print("✓ 安裝完成!")
             print("\n安裝結構:")
-            print(f"{work_dir}/")
-            print(f"├── .cursor/")
-            print(f"└── sunnycore/")
-            print(f"    ├── cursor.mdc")
-            print(f"    ├── tasks/")
-            print(f"    ├── templates/")
-            print(f"    └── scripts/")
-            print("\n請查看 sunnycore/cursor.mdc 開始使用 Sunnycore!")
+            for variant in variants:
+                spec = VARIANTS[variant]
+                if len(variants) > 1:
+                    print(f"[{spec['label']}]")
+                for line in spec['structure']:
+                    print(line.format(work_dir=work_dir, home=Path.home()))
+            for variant in variants:
+                print(f"\n{VARIANTS[variant]['guide']}")
         else:
             print("\n✗ 安裝過程中出現錯誤")
-
+        
         return success
+    
+    def install_fleet(self, work_dirs: List[Path], variants: List[str], auto_yes: bool = False) -> bool:
+        """批次安裝到多個目錄：只掃描與下載一次，再並行佈署到所有目標目錄
+        
+        先將遠端文件下載到暫存目錄（沿用掃描、快取、壓縮檔與 blob 去重邏輯），
+        再以硬連結或複製並行放置到各目錄，各目錄各自寫入安裝清單並支援增量更新。
+        家目錄中的共用文件（如 ~/.codex/prompts）只放置一次。
+        
+        Args:
+            work_dirs: 目標目錄列表
+            variants: 版本名稱列表（依優先順序）
+            auto_yes: 自動確認模式
+            
+        Returns:
+            bool: 所有目錄是否都安裝成功
+        """
+        labels = " + ".join(VARIANTS[variant]['label'] for variant in variants)
+        print(f"\n開始批次安裝 Sunnycore ({labels} 版本) 到 {len(work_dirs)} 個目錄")
+        print("=" * 60)
+        
+        if not auto_yes:
+            prompt = f"\n將在 {len(work_dirs)} 個目錄安裝或更新 Sunnycore（沒有安裝清單的目錄會先清除舊檔案），是否繼續? (y/N): "
+            try:
+                if safe_input(prompt).strip().lower() not in ('y', 'yes'):
+                    print("安裝已取消")
+                    return False
+            except EOFError:
+                print("\n✗ 無法讀取用戶輸入，請使用 -y 參數自動確認")
+                return False
+        
+        start_time = time.time()
+        variant_key = "+".join(variants)
+        staging_dir = Path(tempfile.mkdtemp(prefix="sunnycore-fleet-"))
+        try:
+            print("\n[1/2] 掃描並下載遠端文件（所有目錄共用，只進行一次）")
+            directories, single_files = self.build_install_plan(staging_dir, variants, home=staging_dir / "home")
+            if not self.install_files(staging_dir, variant_key, directories, single_files):
+                print("\n✗ 無法取得完整的遠端文件，批次安裝中止")
+                return False
+            
+            with open(self._manifest_path(staging_dir), 'r', encoding='utf-8') as f:
+                staged_manifest = json.load(f)
+            commit = staged_manifest.get('commit')
+            staged: Dict[str, Path] = {}
+            for key, entry in staged_manifest['files'].items():
+                staged[entry['source']] = staging_dir / key
+                self.remote_meta.setdefault(entry['source'], {'sha': entry['sha'], 'size': entry['size']})
+            
+            print(f"\n[2/2] 並行佈署到 {len(work_dirs)} 個目錄...")
+            workers = min(len(work_dirs), self.max_workers if self.max_workers > 0 else 32)
+            results: Dict[Path, Tuple[bool, str]] = {}
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self._deploy_work_dir, work_dir, variants, staged, commit, index == 0): work_dir
+                    for index, work_dir in enumerate(work_dirs)
+                }
+                for future in as_completed(futures):
+                    work_dir = futures[future]
+                    try:
+                        results[work_dir] = future.result()
+                    except Exception as error:  # noqa: BLE001
+                        results[work_dir] = (False, str(error))
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        
+        elapsed = time.time() - start_time
+        failed = [work_dir for work_dir in work_dirs if not results[work_dir][0]]
+        print("\n" + "=" * 60)
+        print("批次安裝結果:")
+        for work_dir in work_dirs:
+            ok, detail = results[work_dir]
+            print(f"  {'✓' if ok else '✗'} {work_dir}: {detail}")
+        if failed:
+            print(f"\n✗ {len(failed)}/{len(work_dirs)} 個目錄安裝失敗 (總耗時: {elapsed:.1f} 秒)")
+        else:
+            print(f"\n✓ 全部完成: {len(work_dirs)} 個目錄安裝成功 (總耗時: {elapsed:.1f} 秒)")
+        return not failed
+    
+    def _deploy_work_dir(
+        self,
+        work_dir: Path,
+        variants: List[str],
+        staged: Dict[str, Path],
+        commit: Optional[str],
+        place_shared: bool,
+    ) -> Tuple[bool, str]:
+        """將暫存目錄中的文件佈署到單一目標目錄（批次安裝使用）
+        
+        Args:
+            work_dir: 目標目錄
+            variants: 版本名稱列表
+            staged: 暫存文件 {source_path: 暫存路徑}
+            commit: 來源 commit SHA
+            place_shared: 是否放置工作目錄以外的共用文件（只由第一個目錄負責）
+            
+        Returns:
+            Tuple[bool, str]: (是否成功, 結果說明)
+        """
+        variant_key = "+".join(variants)
+        manifest = self.load_install_manifest(work_dir, variant_key)
+        if manifest is None:
+            existing_paths = self._existing_install_paths(work_dir, variants, include_home=False)
+            if existing_paths and not self._cleanup_paths(existing_paths):
+                return False, "無法清除舊版本檔案"
+        
+        directories, single_files = self.build_install_plan(work_dir, variants, warn=False)
+        single_map = dict(single_files)
+        all_files: List[Tuple[str, Path]] = []
+        # 所有解析出的目標（含由其他目錄放置的共用文件），清理過期文件時都不可刪除
+        planned_targets = set()
+        failed_targets = set()
+        written = 0
+        for source_path, staged_path in staged.items():
+            for target_path in self._resolve_targets(source_path, directories, single_map):
+                planned_targets.add(target_path)
+                try:
+                    target_path.relative_to(work_dir)
+                except ValueError:
+                    # 共用文件只記錄在實際放置它的目錄的安裝清單中
+                    if not place_shared:
+                        continue
+                all_files.append((source_path, target_path))
+                if self._is_unchanged(manifest, work_dir, source_path, target_path):
+                    continue
+                try:
+                    link_or_copy(staged_path, target_path, self.use_hardlinks)
+                    written += 1
+                except OSError:
+                    failed_targets.add(target_path)
+        
+        removed = 0
+        if manifest is not None:
+            roots = {target_dir for _, target_dir, _ in directories}
+            removed = self._remove_stale_files(manifest, work_dir, planned_targets, roots)
+        self.write_install_manifest(
+            work_dir,
+            variant_key,
+            commit,
+            [(source, target) for source, target in all_files if target not in failed_targets],
+        )
+        
+        detail = f"{len(all_files)} 個文件，寫入 {written} 個"
+        if removed:
+            detail += f"，移除 {removed} 個"
+        if failed_targets:
+            return False, detail + f"，{len(failed_targets)} 個無法寫入"
+        return True, detail
+    
+    def install_claude_code(self, work_dir: Path, auto_yes: bool = False) -> bool:
+        """安裝 claude-code 版本"""
+        return self.install_variants(work_dir, ["claude"], auto_yes)
+    
+    def install_codex(self, work_dir: Path, auto_yes: bool = False) -> bool:
+        """安裝 codex 版本"""
+        return self.install_variants(work_dir, ["codex"], auto_yes)
+    
+    def install_cursor(self, work_dir: Path, auto_yes: bool = False) -> bool:
+        """安裝 cursor 版本"""
+        return self.install_variants(work_dir, ["cursor"], auto_yes)
 
 
 def main():
@@ -756,31 +3328,83 @@ def main():
   # 限制並行數量（例如：限制為 20 個並行任務）
   python3 install.py -v cursor -p ~/myproject --max-workers 20
   
+  # 使用 asyncio 下載引擎（單一執行緒，降低 CI 容器的記憶體與執行緒數）
+  python3 install.py -v cursor -p ~/myproject --engine async
+  
   # 使用 GitHub Token 避免 API 速率限制
   export GITHUB_TOKEN=your_github_token
   python3 install.py -v cursor -p ~/myproject
   
   # 或直接在命令列提供 token
   python3 install.py -v cursor -p ~/myproject --github-token your_github_token
+  
+  # 單一壓縮檔模式 - 一次請求下載分支 tarball 並串流解壓
+  python3 install.py -v claude -p ~/myproject -y --archive
+  
+  # 離線模式 - 網路中斷時僅從本地快取重新安裝
+  python3 install.py -v claude -p ~/myproject -y --offline
+  
+  # 一次安裝多個版本（共用目錄只掃描與下載一次）
+  python3 install.py -v claude-code,codex,cursor -p ~/myproject -y
+  
+  # 批次安裝到多個專案目錄（paths.txt 每行一個目錄）
+  python3 install.py -v claude --paths-from paths.txt -y
+  
+  # 從本地倉庫目錄、壓縮檔或 git bundle 安裝（無網路環境）
+  python3 install.py -v claude -p ~/myproject -y --source /path/to/sunnycore.bundle
+  
+  # 忽略安裝清單，清除後完整重新安裝
+  python3 install.py -v claude -p ~/myproject -y --force
 
 版本說明:
   1. claude: 適用於 Claude Code，安裝 .claude/ 和 sunnycore/ 目錄
   2. codex: 適用於 Codex CLI，安裝 prompts/ 以及 sunnycore/ 目錄
   3. cursor: 適用於 Cursor 編輯器，安裝 .cursor/ 和 sunnycore/ 目錄
+  以逗號分隔可一次安裝多個版本：tasks、templates、scripts 等共用目錄只下載一次，
+  內容相同的文件以複製（或 --hardlink 硬連結）放置到各目標路徑；
+  各版本專屬的 sunnycore/tasks/init.md 與 document-project.md 以先列出的版本為準
 
 模式說明:
   1. 專案安裝: 在當前工作目錄建立版本對應的目錄結構
   2. 自訂安裝: 在指定路徑建立版本對應的目錄結構
   
 並行下載:
-  預設會根據文件數量自動調整並行數（上限 200），實現最快速度
-  使用 --max-workers 可以限制並行數量（如網路環境有限制時）
+  預設由 AIMD 自適應控制器調整並行數：吞吐量提升時逐步增加（上限 64），
+  遇到 429/403、逾時或延遲暴增時減半，並遵循 Retry-After 與 X-RateLimit-Remaining 標頭
+  使用 --max-workers 可以設定並行數上限（如網路環境有限制時）
+  使用 --engine async 改以單一 asyncio 事件迴圈下載（同樣由自適應控制器調整並行數）
   
 速率限制保護:
+  預設以單次 Git Trees API 請求掃描整個檔案樹（--scan tree），不隨目錄數量增加
+  檔案樹被截斷或無法取得時自動改用逐目錄 contents API 掃描（--scan contents）
   API 掃描階段使用速率限制保護（最多 3 個並行請求 + 延遲）
   自動處理 GitHub API 速率限制錯誤並重試
   建議設置 GITHUB_TOKEN 環境變數以提高速率限制（60 -> 5000 requests/hour）
   
+單一壓縮檔模式:
+  使用 --archive 時僅發出一次請求下載分支 tarball（codeload.github.com）
+  串流讀取壓縮檔並只解壓各版本所需的目錄與單檔，直接寫入磁碟
+  
+增量更新:
+  安裝完成後會寫入 sunnycore/.install-manifest.json（路徑、blob SHA、大小、來源 commit）
+  再次安裝時只下載 SHA 有變更的文件、刪除遠端已移除的文件，其餘文件保持不動
+  使用 --force 可忽略安裝清單並完整重新安裝
+  
+批次安裝:
+  使用 --paths-from FILE 時只掃描遠端檔案樹一次、每個 blob 只下載一次，
+  再以複製（或 --hardlink 硬連結）並行佈署到所有目錄，最後顯示各目錄結果與總耗時
+  各目錄各自寫入安裝清單，重新執行時只更新有變更的文件
+  
+本地來源:
+  使用 --source PATH 從本地倉庫目錄、.tar.gz 壓縮檔或 git bundle 安裝，不發出任何網路請求
+  沿用相同的版本映射與增量更新；目錄來源以 copy_file_range（或 --hardlink 硬連結）並行複製
+  git bundle 需要系統已安裝 git 指令
+  
+下載快取:
+  下載的文件以 blob SHA 為鍵保存於 ~/.cache/sunnycore，重新安裝時直接從快取複製
+  使用 --hardlink 以硬連結取代複製；--cache-max-size 設定上限（LRU 淘汰）
+  使用 --offline 在無網路時僅從快取安裝（需先成功安裝過一次）
+  
 特殊支援:
   腳本支援從管道執行時的互動模式，會自動從 /dev/tty 讀取輸入
   若在完全無終端環境中執行，請使用 -p 和 -y 參數
@@ -789,9 +3413,10 @@ def main():
     
     parser.add_argument(
         '-v', '--version',
-        choices=['claude', 'claude-code', 'codex', 'cursor'],
-        default='claude',
-        help='版本選擇 (claude、codex 或 cursor)'
+        type=parse_variants,
+        default=['claude'],
+        metavar='VARIANTS',
+        help='版本選擇 (claude、codex 或 cursor，可用逗號分隔一次安裝多個版本，如 claude-code,codex,cursor)'
     )
     
     parser.add_argument(
@@ -822,7 +3447,14 @@ def main():
         '--max-workers',
         type=int,
         default=0,
-        help='最大並行下載數 (預設: 0 = 自動根據文件數量調整，上限 200)'
+        help='最大並行下載數上限 (預設: 0 = 自動，由自適應控制器在 1~64 之間調整)'
+    )
+    
+    parser.add_argument(
+        '--engine',
+        choices=['thread', 'async'],
+        default='thread',
+        help='下載引擎：thread = 執行緒池（預設），async = 單一 asyncio 事件迴圈 + 有界並行（適合資源受限的 CI 容器）'
     )
     
     parser.add_argument(
@@ -845,13 +3477,111 @@ def main():
         help='GitHub Personal Access Token (提高 API 速率限制，可選，也可使用環境變數 GITHUB_TOKEN)'
     )
     
+    parser.add_argument(
+        '--scan',
+        choices=['tree', 'contents'],
+        default='tree',
+        help='目錄掃描方式：tree = 單次 Git Trees API 請求（預設），contents = 逐目錄 contents API 遞迴掃描'
+    )
+    
+    parser.add_argument(
+        '--archive',
+        action='store_true',
+        help='單一壓縮檔模式：一次下載分支 tarball 並串流解壓所需文件（不經 API 掃描）'
+    )
+    
+    parser.add_argument(
+        '--source',
+        type=str,
+        metavar='PATH',
+        help='從本地來源安裝：倉庫目錄、.tar.gz 壓縮檔或 git bundle（不發出任何網路請求，適用於無網路環境）'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=None,
+        help='下載快取目錄 (預設: ~/.cache/sunnycore，可用環境變數 SUNNYCORE_CACHE_DIR 覆寫)'
+    )
+    
+    parser.add_argument(
+        '--cache-max-size',
+        type=int,
+        default=256,
+        help='下載快取大小上限 MB，超過時淘汰最久未使用的文件 (預設: 256)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='停用本地下載快取'
+    )
+    
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='離線模式：僅從本地快取安裝，不發出任何網路請求'
+    )
+    
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='忽略安裝清單，清除既有檔案後完整重新安裝（預設會依安裝清單進行增量更新）'
+    )
+    
+    parser.add_argument(
+        '--paths-from',
+        type=str,
+        metavar='FILE',
+        help='批次安裝：從文件讀取目標目錄（每行一個，忽略空行與 # 註解），只掃描與下載一次後並行佈署到所有目錄'
+    )
+    
+    parser.add_argument(
+        '--hardlink',
+        action='store_true',
+        help='從快取還原或放置共用內容時以硬連結取代複製（注意：就地修改已安裝文件會同時影響共用同一 inode 的文件）'
+    )
+    
     args = parser.parse_args()
     
+    if args.offline and args.no_cache:
+        parser.error('--offline 需要本地快取，無法與 --no-cache 同時使用')
+    if args.offline and args.archive:
+        parser.error('--offline 僅能從快取安裝，無法與 --archive 同時使用')
+    source: Optional[Path] = None
+    if args.source:
+        if args.archive or args.offline:
+            parser.error('--source 無法與 --archive 或 --offline 同時使用')
+        source = Path(os.path.expanduser(args.source)).absolute()
+        if not source.exists():
+            parser.error(f'--source 路徑不存在: {args.source}')
+    
+    if args.paths_from and args.path:
+        parser.error('--paths-from 與 -p/--path 不能同時使用')
+    
+    fleet_paths: List[Path] = []
+    if args.paths_from:
+        try:
+            with open(os.path.expanduser(args.paths_from), 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    path = Path(os.path.expanduser(line)).absolute()
+                    if path not in fleet_paths:
+                        fleet_paths.append(path)
+        except OSError as error:
+            parser.error(f'無法讀取 --paths-from 文件: {error}')
+        if not fleet_paths:
+            parser.error(f'--paths-from 文件中沒有任何目標目錄: {args.paths_from}')
+    
     # 獲取 GitHub token（優先使用命令列參數，其次環境變數）
     github_token = args.github_token or os.environ.get('GITHUB_TOKEN')
     
-    # 互動模式 - 當沒有指定路徑時進入互動模式
-    if not args.path:
+    # 互動模式 - 當沒有指定路徑（或批次安裝目錄列表）時進入互動模式
+    if fleet_paths:
+        install_path = None
+    elif not args.path:
         print("Sunnycore 安裝程式")
         print("=" * 60)
         
@@ -866,11 +3596,11 @@ def main():
                 version_choice = safe_input("\n請輸入選項 (1/2/3，預設: 1): ").strip()
                 
                 if version_choice == '2':
-                    args.version = 'codex'
+                    args.version = ['codex']
                 elif version_choice == '3':
-                    args.version = 'cursor'
+                    args.version = ['cursor']
                 else:
-                    args.version = 'claude'
+                    args.version = ['claude']
             
             # 模式選擇
             print("\n請選擇安裝模式:")
@@ -898,6 +3628,16 @@ def main():
         # 獲取安裝路徑
         install_path = Path(os.path.expanduser(args.path))
     
+    # 建立下載快取
+    cache = None
+    if not args.no_cache and source is None:
+        cache_dir = Path(os.path.expanduser(args.cache_dir)) if args.cache_dir else default_cache_dir()
+        cache = DownloadCache(
+            cache_dir,
+            max_bytes=max(0, args.cache_max_size) * 1024 * 1024,
+            use_hardlinks=args.hardlink,
+        )
+    
     # 創建安裝器
     installer = SunnycoreInstaller(
         repo=args.repo,
@@ -906,10 +3646,24 @@ def main():
         max_retries=args.max_retries,
         retry_delay=args.retry_delay,
         github_token=github_token,
+        use_archive=args.archive,
+        cache=cache,
+        offline=args.offline,
+        force=args.force,
+        scan_backend=args.scan,
+        engine=args.engine,
+        use_hardlinks=args.hardlink,
+        source=source,
     )
     
     # 顯示 API 速率限制資訊
-    if github_token:
+    if source is not None:
+        print(f"✓ 從本地來源安裝（不發出網路請求）: {source}")
+    elif args.offline:
+        print(f"✓ 離線模式：僅從本地快取安裝 ({cache.root})")
+    elif args.archive:
+        print("✓ 使用單一壓縮檔模式（不消耗 API 速率限制）")
+    elif github_token:
         print("✓ 使用 GitHub Token 進行認證（速率限制: 5000 requests/hour）")
     else:
         print("⚠ 未提供 GitHub Token（速率限制: 60 requests/hour）")
@@ -917,22 +3671,11 @@ def main():
     
     # 執行安裝
     try:
-        version = args.version
-        if version == 'claude-code':
-            version = 'claude'
-
-        if version == 'claude':
-            success = installer.install_claude_code(install_path, auto_yes=args.yes)
-            sys.exit(0 if success else 1)
-        elif version == 'codex':
-            success = installer.install_codex(install_path, auto_yes=args.yes)
-            sys.exit(0 if success else 1)
-        elif version == 'cursor':
-            success = installer.install_cursor(install_path, auto_yes=args.yes)
-            sys.exit(0 if success else 1)
+        if fleet_paths:
+            success = installer.install_fleet(fleet_paths, args.version, auto_yes=args.yes)
         else:
-            print(f"✗ 不支援的版本: {args.version}")
-            sys.exit(1)
+            success = installer.install_variants(install_path, args.version, auto_yes=args.yes)
+        sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print("\n\n安裝已取消")
         sys.exit(1)
@@ -7,158 +7,122 @@ shard-requirements.py
 環境變數：
 - REQUIREMENTS_FILE：輸入檔路徑（預設 docs/requirements.md）
 - OUTPUT_DIR：輸出資料夾（預設 docs/requirements）
+
+參數：
+- input_file / output_dir（可選）：以命令列指定輸入檔與輸出資料夾（相對於目前目錄），優先於環境變數
+- --json PATH：另外輸出機器可讀的 JSON 報告（各分片位元組大小與耗時；- 表示標準輸出）
+- --delete-source：拆分成功後刪除原始文檔（預設保留，分片清單可讓重新拆分只更新有變更的分片）
 """
 
 from __future__ import annotations
 
+import argparse
 import os
-import re
 import sys
+from contextlib import redirect_stdout
 from pathlib import Path
 from typing import Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-RED = "\033[0;31m"
-GREEN = "\033[0;32m"
-YELLOW = "\033[1;33m"
-BLUE = "\033[0;34m"
-NC = "\033[0m"
-
-
-def log_info(message: str) -> None:
-    print(f"{BLUE}[INFO]{NC} {message}")
-
-
-def log_success(message: str) -> None:
-    print(f"{GREEN}[SUCCESS]{NC} {message}")
-
-
-def log_warning(message: str) -> None:
-    print(f"{YELLOW}[WARNING]{NC} {message}")
-
-
-def log_error(message: str) -> None:
-    print(f"{RED}[ERROR]{NC} {message}")
-
-
-def get_project_root() -> Path:
-    # scripts 目錄的上上層即為專案根目錄（跳過 claude code 目錄）
-    return Path(__file__).resolve().parents[2]
-
-
-def clean_filename(filename: str) -> str:
-    filename = re.sub(r"[\\/:*?\"<>|]", "", filename)
-    filename = re.sub(r"\s+", " ", filename)
-    return filename.strip()
-
-
-def create_directory_structure(output_dir: Path) -> None:
-    log_info("創建目錄結構...")
-    output_dir.mkdir(parents=True, exist_ok=True)
-    log_success("目錄結構創建完成")
-
+from sharding import (  # noqa: E402
+    ShardResult,
+    check_input_file,
+    create_directory_structure,
+    get_project_root,
+    log_info,
+    log_success,
+    shard_by_first_level_headings,
+    write_json_report,
+)
 
-def check_input_file(input_file: Path) -> None:
-    if not input_file.is_file():
-        log_error(f"找不到輸入文件: {input_file}")
-        sys.exit(1)
-    if not os.access(str(input_file), os.R_OK):
-        log_error(f"無法讀取輸入文件: {input_file}")
-        sys.exit(1)
-    log_success(f"輸入文件檢查通過: {input_file}")
 
-
-def extract_first_level_headers(input_file: Path, output_dir: Path) -> int:
+def extract_first_level_headers(input_file: Path, output_dir: Path) -> ShardResult:
     log_info("提取一級標題...")
-    sections_count = 0
-    current_section_title: Optional[str] = None
-    current_section_path: Optional[Path] = None
-
-    with input_file.open("r", encoding="utf-8") as f:
-        for raw_line in f:
-            line = raw_line.rstrip("\n")
-            m = re.match(r"^#\s+(.+)$", line)
-            if m:
-                section_title = m.group(1)
-
-                if current_section_title and current_section_path:
-                    log_info(f"已保存: {current_section_path}")
-                    sections_count += 1
-
-                current_section_title = section_title
-                filename = clean_filename(section_title) + ".md"
-                current_section_path = output_dir / filename
-                with current_section_path.open("w", encoding="utf-8") as out:
-                    out.write(f"# {section_title}\n\n")
-                continue
-
-            if current_section_path is not None:
-                with current_section_path.open("a", encoding="utf-8") as out:
-                    out.write(raw_line)
-
-    if current_section_title and current_section_path:
-        log_info(f"已保存: {current_section_path}")
-        sections_count += 1
-
-    log_success(f"一級標題提取完成，共 {sections_count} 個章節")
-    return sections_count
-
-
-def list_md_files_recursively(directory: Path) -> list[Path]:
-    return sorted(p for p in directory.rglob("*.md") if p.is_file())
-
-
-def list_md_files_top_level(directory: Path) -> list[Path]:
-    return sorted(p for p in directory.glob("*.md") if p.is_file())
-
-
-def generate_report(input_file: Path, output_dir: Path) -> None:
+    result = shard_by_first_level_headings(
+        input_file,
+        output_dir,
+        on_saved=lambda path: log_info(f"已保存: {path}"),
+        on_unchanged=lambda path: log_info(f"未變更: {path}"),
+        on_removed=lambda path: log_info(f"已移除過期文件: {path}"),
+    )
+    log_success(f"一級標題提取完成，共 {result.sections} 個章節")
+    return result
+
+
+def generate_report(result: ShardResult) -> None:
+    # 由拆分紀錄產生報告，不重新掃描輸出資料夾
     log_info("生成處理報告...")
 
     print("")
     print("==============================================")
     print("         需求文檔拆分完成報告")
     print("==============================================")
-    print(f"輸入文件: {input_file}")
-    print(f"輸出目錄: {output_dir}")
+    print(f"輸入文件: {result.input_file}")
+    print(f"輸出目錄: {result.output_dir}")
     print("")
     print("生成的文件結構:")
-    for path in list_md_files_recursively(output_dir):
-        rel = path.relative_to(output_dir)
-        print(str(rel))
+    names = sorted(f.name for f in result.files)
+    for name in names:
+        print(name)
     print("")
     print("文件統計:")
-    total_top = len(list_md_files_top_level(output_dir))
-    total_all = len(list_md_files_recursively(output_dir))
-    print(f"- 一級標題文件: {total_top}")
-    print(f"- 總文件數: {total_all}")
+    print(f"- 一級標題文件: {len(names)}")
+    print(f"- 本次寫入: {len(result.written)}，未變更: {len(result.unchanged)}，移除: {len(result.removed)}")
     print("==============================================")
 
 
 def main() -> None:
-    project_root = get_project_root()
+    parser = argparse.ArgumentParser(description="將 requirements.md 依一級標題拆分為多個獨立 .md 檔")
+    parser.add_argument("input_file", nargs="?", help="輸入檔路徑（預設: $REQUIREMENTS_FILE 或 docs/requirements.md）")
+    parser.add_argument("output_dir", nargs="?", help="輸出資料夾（預設: $OUTPUT_DIR 或 docs/requirements）")
+    parser.add_argument("--json", metavar="PATH", help="另外輸出 JSON 報告（各分片位元組大小與耗時）；- 表示標準輸出，此時其餘訊息改輸出到標準錯誤")
+    parser.add_argument("--delete-source", action="store_true", help="拆分成功後刪除原始文檔")
+    args = parser.parse_args()
+
+    # JSON 報告輸出到標準輸出時，一般訊息改到標準錯誤以免混雜
+    with redirect_stdout(sys.stderr if args.json == "-" else sys.stdout):
+        result = run(get_project_root(), args.input_file, args.output_dir, args.delete_source)
+    if args.json:
+        write_json_report(result.to_json(), args.json)
+
+
+def run(
+    project_root: Path,
+    input_arg: Optional[str] = None,
+    output_arg: Optional[str] = None,
+    delete_source: bool = False,
+) -> ShardResult:
     input_file_env = os.environ.get("REQUIREMENTS_FILE", "docs/requirements.md")
     output_dir_env = os.environ.get("OUTPUT_DIR", "docs/requirements")
 
-    input_file = Path(input_file_env)
-    if not input_file.is_absolute():
-        input_file = (project_root / input_file_env).resolve()
-
-    output_dir = Path(output_dir_env)
-    if not output_dir.is_absolute():
-        output_dir = (project_root / output_dir_env).resolve()
+    # 命令列參數相對於目前目錄；環境變數與預設值相對於專案根目錄
+    if input_arg:
+        input_file = Path(input_arg).resolve()
+    else:
+        input_file = Path(input_file_env)
+        if not input_file.is_absolute():
+            input_file = (project_root / input_file_env).resolve()
+
+    if output_arg:
+        output_dir = Path(output_arg).resolve()
+    else:
+        output_dir = Path(output_dir_env)
+        if not output_dir.is_absolute():
+            output_dir = (project_root / output_dir_env).resolve()
 
     check_input_file(input_file)
     create_directory_structure(output_dir)
-    extract_first_level_headers(input_file, output_dir)
-    generate_report(input_file, output_dir)
+    result = extract_first_level_headers(input_file, output_dir)
+    generate_report(result)
     log_success("需求文檔拆分完成！")
-    
-    # 刪除原始文檔
-    if input_file.exists():
+
+    # 指定 --delete-source 時才刪除原始文檔
+    if delete_source and input_file.exists():
         log_info(f"刪除原始文檔: {input_file}")
         input_file.unlink()
         log_success("原始文檔已刪除")
+    return result
 
 
 if __name__ == "__main__":
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+"""
+shard.py
+一次拆分多份 Markdown 文檔：每份文檔依一級標題拆分為多個獨立 .md 檔，
+以行程池並行處理，最後輸出彙總報告。
+
+用法：
+    python3 shard.py docs/architecture.md docs/requirements.md
+    python3 shard.py "docs/**/*.md" --jobs 8
+    python3 shard.py docs/architecture.md -o docs/architecture
+
+每份文檔預設輸出到同目錄下與檔名同名的資料夾（docs/architecture.md → docs/architecture/），
+與 shard-architecture.py、shard-requirements.py 的預設輸出位置相同。
+萬用字元展開時會略過已是拆分輸出的文件（所在資料夾含 .shard-manifest.json）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from sharding import (  # noqa: E402
+    GREEN,
+    NC,
+    RED,
+    SHARD_MANIFEST_NAME,
+    ShardResult,
+    log_error,
+    log_info,
+    log_success,
+    log_warning,
+    shard_document,
+    write_json_report,
+)
+
+
+def expand_inputs(patterns: List[str]) -> List[Path]:
+    """展開輸入路徑與萬用字元（支援 **），去除重複並保持順序"""
+    inputs: List[Path] = []
+    seen = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = [
+                Path(match) for match in sorted(glob.glob(pattern, recursive=True))
+                if match.endswith(".md")
+                and Path(match).is_file()
+                and not (Path(match).parent / SHARD_MANIFEST_NAME).exists()
+            ]
+            if not matches:
+                log_warning(f"沒有符合的文件: {pattern}")
+        else:
+            matches = [Path(pattern)]
+        for path in matches:
+            resolved = path.resolve()
+            if resolved not in seen:
+                seen.add(resolved)
+                inputs.append(resolved)
+    return inputs
+
+
+def default_output_dir(input_file: Path) -> Path:
+    return input_file.with_suffix("")
+
+
+def display_path(path: str) -> str:
+    relative = os.path.relpath(path)
+    return path if relative.startswith("..") else relative
+
+
+def print_report(results: List[ShardResult], elapsed: float) -> None:
+    print("")
+    print("==============================================")
+    print("         文檔拆分彙總報告")
+    print("==============================================")
+    for result in results:
+        if result.error:
+            print(f"{RED}✗{NC} {display_path(result.input_file)}: {result.error}")
+            continue
+        print(f"{GREEN}✓{NC} {display_path(result.input_file)} → {display_path(result.output_dir)}/")
+        print(
+            f"    {result.sections} 個章節（寫入 {len(result.written)}、未變更 {len(result.unchanged)}、"
+            f"移除 {len(result.removed)}），{result.seconds:.2f}s"
+        )
+    succeeded = [r for r in results if not r.error]
+    print("")
+    print("統計:")
+    print(f"- 文檔: {len(succeeded)}/{len(results)} 成功")
+    print(f"- 章節: {sum(r.sections for r in succeeded)}")
+    print(f"- 寫入: {sum(len(r.written) for r in succeeded)}，未變更: {sum(len(r.unchanged) for r in succeeded)}，"
+          f"移除: {sum(len(r.removed) for r in succeeded)}")
+    print(f"- 總耗時: {elapsed:.2f}s")
+    print("==============================================")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="依一級標題拆分多份 Markdown 文檔（行程池並行）",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+範例:
+  %(prog)s docs/architecture.md docs/requirements.md
+  %(prog)s "docs/**/*.md" --jobs 8
+  %(prog)s docs/architecture.md -o docs/architecture --delete-source
+  %(prog)s "docs/**/*.md" --json - > shard-report.json
+        """,
+    )
+    parser.add_argument("inputs", nargs="+", help="輸入文檔或萬用字元（如 \"docs/**/*.md\"，請加引號避免 shell 展開）")
+    parser.add_argument("-o", "--output-dir", help="輸出資料夾（僅限單一輸入文檔；預設為同目錄下與檔名同名的資料夾）")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="並行行程數（預設: CPU 核心數）")
+    parser.add_argument("--json", metavar="PATH", help="另外輸出 JSON 報告（各文檔各分片的位元組大小與耗時）；- 表示標準輸出，此時其餘訊息改輸出到標準錯誤")
+    parser.add_argument("--delete-source", action="store_true", help="拆分成功後刪除原始文檔")
+    args = parser.parse_args()
+
+    # JSON 報告輸出到標準輸出時，一般訊息改到標準錯誤以免混雜
+    with redirect_stdout(sys.stderr if args.json == "-" else sys.stdout):
+        results, elapsed = run(args)
+    if args.json:
+        write_json_report(
+            {"documents": [result.to_json() for result in results], "seconds": round(elapsed, 6)},
+            args.json,
+        )
+    if any(result.error for result in results):
+        sys.exit(1)
+
+
+def run(args: argparse.Namespace) -> Tuple[List[ShardResult], float]:
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        log_error("沒有可拆分的文檔")
+        sys.exit(1)
+    if args.output_dir and len(inputs) > 1:
+        log_error("--output-dir 只能搭配單一輸入文檔")
+        sys.exit(1)
+
+    missing = [path for path in inputs if not path.is_file()]
+    for path in missing:
+        log_error(f"找不到輸入文件: {path}")
+    if missing:
+        sys.exit(1)
+
+    jobs = [
+        (str(path), str(Path(args.output_dir).resolve() if args.output_dir else default_output_dir(path)))
+        for path in inputs
+    ]
+    workers = max(1, min(args.jobs, len(jobs)))
+    log_info(f"拆分 {len(jobs)} 份文檔（{workers} 個行程）...")
+
+    started = time.perf_counter()
+    if workers == 1:
+        results = [shard_document(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(shard_document, *zip(*jobs)))
+    elapsed = time.perf_counter() - started
+    print_report(results, elapsed)
+
+    failed = [r for r in results if r.error]
+    if args.delete_source:
+        for result in results:
+            if not result.error:
+                Path(result.input_file).unlink(missing_ok=True)
+                log_info(f"已刪除原始文檔: {display_path(result.input_file)}")
+
+    if failed:
+        log_error(f"{len(failed)} 份文檔拆分失敗")
+    else:
+        log_success("文檔拆分完成！")
+    return results, elapsed
+
+
+if __name__ == "__main__":
+    main()
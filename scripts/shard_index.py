@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+"""
+shard_index.py
+查詢拆分輸出資料夾中的章節索引（.shard-index.json），直接定位章節所在的分片與位元組範圍，
+不需逐一開啟 {ARCH}/*.md、{REQ}/*.md。可依標題（不分大小寫）或錨點 slug 查詢一級章節與子標題。
+
+用法（Python）：
+    sys.path.insert(0, "sunnycore/scripts")
+    from shard_index import lookup, read_section
+    entry = lookup("Data Model")
+    if entry:
+        print(entry.path, read_section(entry))
+
+用法（命令列）：
+    python3 sunnycore/scripts/shard_index.py "Data Model" [--dir docs/architecture] [--location]
+預設查詢 docs/architecture 與 docs/requirements。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from sharding import (  # noqa: E402
+    SHARD_INDEX_NAME,
+    SHARD_INDEX_VERSION,
+    WHITESPACE_RE,
+    get_project_root,
+    index_sections,
+    log_error,
+    slugify,
+)
+
+DEFAULT_DIRECTORIES = ("docs/architecture", "docs/requirements")
+
+
+class IndexEntry(NamedTuple):
+    """索引中的一個標題：所在分片、分片內的位元組範圍 [offset, end)"""
+
+    path: Path
+    title: str
+    slug: str
+    level: int
+    offset: int
+    end: int
+    file_size: int
+    file_mtime_ns: int
+
+
+# 已載入的索引：{索引路徑: (mtime_ns, {查詢鍵: IndexEntry})}
+_cache: Dict[Path, Tuple[int, Dict[str, IndexEntry]]] = {}
+
+
+def _normalize(text: str) -> str:
+    return WHITESPACE_RE.sub(" ", text.strip().lstrip("#").strip()).lower()
+
+
+def load_index(directory: Path) -> Dict[str, IndexEntry]:
+    """載入資料夾的章節索引，回傳 {標題或 slug: IndexEntry}；索引不存在時回傳空 dict
+
+    同名標題以層級較高（一級章節優先）、先出現者為準。索引依 mtime 快取。
+    """
+    path = Path(directory) / SHARD_INDEX_NAME
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != SHARD_INDEX_VERSION:
+        return {}
+
+    entries: Dict[str, IndexEntry] = {}
+
+    def add(entry: IndexEntry) -> None:
+        for key in (_normalize(entry.title), entry.slug):
+            current = entries.get(key)
+            if current is None or entry.level < current.level:
+                entries[key] = entry
+
+    for section in data.get("sections", []):
+        shard = path.parent / section["file"]
+        size = section["bytes"]
+        mtime = section.get("mtime_ns", 0)
+        add(IndexEntry(shard, section["title"], section["slug"], 1, 0, size, size, mtime))
+        for heading in section.get("headings", []):
+            add(IndexEntry(
+                shard, heading["title"], heading["slug"], heading["level"],
+                heading["offset"], heading["end"], size, mtime,
+            ))
+    _cache[path] = (mtime_ns, entries)
+    return entries
+
+
+def default_directories() -> List[Path]:
+    root = get_project_root()
+    return [root / directory for directory in DEFAULT_DIRECTORIES]
+
+
+def lookup(query: str, directories: Optional[Iterable[Path]] = None) -> Optional[IndexEntry]:
+    """依標題或錨點 slug 查詢章節（如 lookup("Data Model") 或 lookup("#data-model")）
+
+    Args:
+        query: 標題文字（不分大小寫、忽略多餘空白與開頭的 #）或錨點 slug
+        directories: 要查詢的拆分輸出資料夾，預設為 docs/architecture 與 docs/requirements
+
+    Returns:
+        Optional[IndexEntry]: 第一個符合的標題，找不到時為 None
+    """
+    keys = (_normalize(query), slugify(query.lstrip("#")))
+    for directory in directories if directories is not None else default_directories():
+        entries = load_index(Path(directory))
+        for key in keys:
+            if key in entries:
+                return entries[key]
+    return None
+
+
+def read_section(entry: IndexEntry) -> str:
+    """讀取標題範圍內的內容；分片在拆分後被修改時改為重新解析該分片定位標題"""
+    with entry.path.open("rb") as f:
+        stat = os.fstat(f.fileno())
+        if stat.st_size == entry.file_size and stat.st_mtime_ns == entry.file_mtime_ns:
+            f.seek(entry.offset)
+            return f.read(entry.end - entry.offset).decode("utf-8")
+        data = f.read()
+
+    if entry.level == 1:
+        return data.decode("utf-8")
+    for section in index_sections(data):
+        headings = section.headings
+        for i, heading in enumerate(headings):
+            if heading.level == entry.level and heading.title == entry.title:
+                end = next(
+                    (h.offset for h in headings[i + 1:] if h.level <= heading.level),
+                    section.end,
+                )
+                return data[heading.offset:end].decode("utf-8")
+    raise ValueError(f"分片中已找不到標題: {entry.title}（{entry.path}），請重新拆分文檔")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="依標題或錨點查詢拆分後的章節")
+    parser.add_argument("query", help="標題文字或錨點 slug（如 \"Data Model\"、data-model）")
+    parser.add_argument("--dir", action="append", help="拆分輸出資料夾，可重複指定（預設: docs/architecture、docs/requirements）")
+    parser.add_argument("--location", action="store_true", help="只輸出位置（分片路徑:起始位移-結束位移）")
+    args = parser.parse_args()
+
+    directories = [Path(d) for d in args.dir] if args.dir else None
+    entry = lookup(args.query, directories)
+    if entry is None:
+        log_error(f"找不到章節: {args.query}")
+        sys.exit(1)
+    if args.location:
+        print(f"{entry.path}:{entry.offset}-{entry.end}")
+    else:
+        sys.stdout.write(read_section(entry))
+
+
+if __name__ == "__main__":
+    main()
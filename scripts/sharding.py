@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+
+"""
+sharding.py
+shard.py、shard-architecture.py 與 shard-requirements.py 共用的 Markdown 拆分引擎與輔助函式。
+
+依一級標題將文檔拆分為多個 .md 檔。先以單次掃描建立章節索引
+(title, start_offset, body_offset, end_offset)，掃描時追蹤程式碼區塊（``` / ~~~）、
+YAML front matter 與 setext 標題（標題文字下一行為 ===），程式碼區塊內的 `# 註解` 不會被誤認為章節；
+拆分時直接複製位元組範圍（可用時透過 mmap），不需逐行處理。
+
+輸出資料夾中的 .shard-manifest.json 記錄每個分片的 SHA-256、大小與 mtime：重新拆分時內容未變更的分片
+保持不動（mtime 不變），有變更的分片以暫存檔原子替換，標題已移除的舊分片會被刪除。
+.shard-index.json 則記錄各分片的標題、子標題、錨點 slug 與分片內的位元組位移，供 shard_index.py 查詢。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+# 顏色定義
+RED = "\033[0;31m"
+GREEN = "\033[0;32m"
+YELLOW = "\033[1;33m"
+BLUE = "\033[0;34m"
+NC = "\033[0m"
+
+# 一級標題：行首單一 # 後接空白與標題文字
+HEADING_RE = re.compile(r"^#\s+(.+)$")
+# 二至六級標題（寫入章節索引），去除結尾的關閉 #
+SUBHEADING_RE = re.compile(r"^(#{2,6})[ \t]+(.+?)(?:[ \t]+#+)?[ \t]*$")
+# 錨點 slug：與 GitHub 相同，只保留文字、數字、底線、連字號與空白
+SLUG_STRIP_RE = re.compile(r"[^\w\- ]")
+INVALID_FILENAME_CHARS_RE = re.compile(r"[\\/:*?\"<>|]")
+WHITESPACE_RE = re.compile(r"\s+")
+
+# 可能影響章節邊界的行（ATX 標題、程式碼區塊圍欄、setext 底線）；其餘內容行不需逐行檢查
+BOUNDARY_CANDIDATE_RE = re.compile(rb"^(?:#|[ ]{0,3}(?:`{3,}|~{3,}|=+[ \t]*\r?$))", re.M)
+FENCE_RE = re.compile(r"^[ ]{0,3}(`{3,}|~{3,})(.*)$")
+ATX_ANY_LEVEL_RE = re.compile(r"^[ ]{0,3}#{1,6}(?:[ \t]|$)")
+# 清單項目與引用區塊不是段落，其下一行的 === 不構成 setext 標題
+LIST_OR_QUOTE_RE = re.compile(r"^[ ]{0,3}(?:[-+*](?:[ \t]|$)|\d{1,9}[.)](?:[ \t]|$)|>)")
+FRONT_MATTER_OPEN_RE = re.compile(rb"\A(?:\xef\xbb\xbf)?---[ \t]*\r?\n")
+FRONT_MATTER_CLOSE_RE = re.compile(rb"^(?:---|\.\.\.)[ \t]*\r?$", re.M)
+
+# 分片清單：記錄本工具產生的分片，用於增量更新與清理過期分片
+SHARD_MANIFEST_NAME = ".shard-manifest.json"
+SHARD_MANIFEST_VERSION = 1
+# 章節索引：標題、子標題、錨點與分片內位元組位移，供 shard_index.lookup 直接定位章節
+SHARD_INDEX_NAME = ".shard-index.json"
+SHARD_INDEX_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def log_info(message: str) -> None:
+    print(f"{BLUE}[INFO]{NC} {message}")
+
+
+def log_success(message: str) -> None:
+    print(f"{GREEN}[SUCCESS]{NC} {message}")
+
+
+def log_warning(message: str) -> None:
+    print(f"{YELLOW}[WARNING]{NC} {message}")
+
+
+def log_error(message: str) -> None:
+    print(f"{RED}[ERROR]{NC} {message}")
+
+
+def get_project_root() -> Path:
+    # scripts 目錄的上上層即為專案根目錄（跳過 claude code 目錄）
+    return Path(__file__).resolve().parents[2]
+
+
+def clean_filename(filename: str) -> str:
+    # 移除 / \ : * ? " < > | 等不合法字元，壓縮多空白，去除前後空白
+    filename = INVALID_FILENAME_CHARS_RE.sub("", filename)
+    filename = WHITESPACE_RE.sub(" ", filename)
+    return filename.strip()
+
+
+def create_directory_structure(output_dir: Path) -> None:
+    log_info("創建目錄結構...")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    log_success("目錄結構創建完成")
+
+
+def check_input_file(input_file: Path) -> None:
+    if not input_file.is_file():
+        log_error(f"找不到輸入文件: {input_file}")
+        sys.exit(1)
+    if not os.access(str(input_file), os.R_OK):
+        log_error(f"無法讀取輸入文件: {input_file}")
+        sys.exit(1)
+    log_success(f"輸入文件檢查通過: {input_file}")
+
+
+class Heading(NamedTuple):
+    """章節內的子標題（二至六級），offset 為標題行在原始文件中的位元組位移"""
+
+    level: int
+    title: str
+    offset: int
+
+
+class Section(NamedTuple):
+    """章節在原始文件中的位元組範圍
+
+    start 為標題行（setext 標題為標題文字行）的起點，body 為標題之後內容的起點，
+    end 為下一個章節的起點或檔尾；headings 為章節內（程式碼區塊外）的子標題。
+    """
+
+    title: str
+    start: int
+    body: int
+    end: int
+    headings: Tuple[Heading, ...] = ()
+
+
+def _line_at(data, start: int) -> tuple[int, str]:
+    """取得從 start 開始的一行，回傳 (下一行起點, 去除換行的文字)"""
+    newline = data.find(b"\n", start)
+    end = len(data) if newline < 0 else newline
+    next_start = end if newline < 0 else newline + 1
+    return next_start, data[start:end].rstrip(b"\r").decode("utf-8", errors="replace")
+
+
+def _setext_title(data, underline_start: int, floor: int) -> Optional[tuple[int, str]]:
+    """判斷底線上一行是否為單行段落（setext 一級標題的標題文字）
+
+    Returns:
+        Optional[tuple[int, str]]: (標題行起點, 標題文字)，不是 setext 標題時為 None
+    """
+    if underline_start <= floor:
+        return None
+    title_start = data.rfind(b"\n", floor, underline_start - 1) + 1 or floor
+    _, title_line = _line_at(data, title_start)
+    if (
+        not title_line.strip()
+        or len(title_line) - len(title_line.lstrip(" ")) > 3
+        or ATX_ANY_LEVEL_RE.match(title_line)
+        or FENCE_RE.match(title_line)
+        or LIST_OR_QUOTE_RE.match(title_line)
+    ):
+        return None
+    # 只接受單行段落：標題文字之前必須是空行或區塊邊界
+    if title_start > floor:
+        before_start = data.rfind(b"\n", floor, title_start - 1) + 1 or floor
+        _, before = _line_at(data, before_start)
+        if before.strip() and not FENCE_RE.match(before) and not ATX_ANY_LEVEL_RE.match(before):
+            return None
+    return title_start, title_line.strip()
+
+
+def index_sections(data) -> List[Section]:
+    """單次掃描建立一級章節索引
+
+    追蹤程式碼區塊與 front matter（其中的內容不視為標題），並辨識 ATX（# 標題）
+    與 setext（標題文字 + === 底線）兩種一級標題。只有可能成為邊界的行才會被解碼檢查。
+
+    Args:
+        data: 文件內容（bytes 或 mmap）
+
+    Returns:
+        List[Section]: 依出現順序排列的章節
+    """
+    sections: List[Section] = []
+    headings: List[List[Heading]] = []
+    pos = 0
+    floor = 0  # 段落回溯的下限（front matter 結尾或上一個程式碼區塊的圍欄之後）
+
+    front_matter = FRONT_MATTER_OPEN_RE.match(data)
+    if front_matter:
+        closing = FRONT_MATTER_CLOSE_RE.search(data, front_matter.end())
+        if closing:
+            pos, _ = _line_at(data, closing.start())
+            floor = pos
+
+    fence: Optional[tuple[str, int]] = None
+    while True:
+        candidate = BOUNDARY_CANDIDATE_RE.search(data, pos)
+        if candidate is None:
+            break
+        line_start = candidate.start()
+        pos, line = _line_at(data, line_start)
+
+        fence_match = FENCE_RE.match(line)
+        if fence is not None:
+            # 程式碼區塊內只需要尋找結束圍欄
+            marker, info = (fence_match.group(1), fence_match.group(2)) if fence_match else ("", "")
+            if marker and marker[0] == fence[0] and len(marker) >= fence[1] and not info.strip():
+                fence = None
+                floor = pos
+            continue
+        if fence_match:
+            marker, info = fence_match.group(1), fence_match.group(2)
+            if marker[0] == "`" and "`" in info:
+                continue  # 反引號圍欄的資訊字串不能包含反引號，這是行內程式碼
+            fence = (marker[0], len(marker))
+            continue
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            sections.append(Section(heading.group(1), line_start, pos, 0))
+            headings.append([])
+            continue
+
+        subheading = SUBHEADING_RE.match(line) if line.startswith("##") else None
+        if subheading:
+            if headings:
+                headings[-1].append(Heading(len(subheading.group(1)), subheading.group(2), line_start))
+            continue
+
+        if line.lstrip(" ").startswith("="):
+            setext = _setext_title(data, line_start, floor)
+            if setext is not None:
+                title_start, title = setext
+                sections.append(Section(title, title_start, pos, 0))
+                headings.append([])
+
+    # 每個章節結束於下一個章節的起點
+    total = len(data)
+    return [
+        section._replace(
+            end=sections[i + 1].start if i + 1 < len(sections) else total,
+            headings=tuple(headings[i]),
+        )
+        for i, section in enumerate(sections)
+    ]
+
+
+@contextmanager
+def map_file(input_file: Path) -> Iterator:
+    """以唯讀 mmap 映射整個文件；空文件或不支援 mmap 時改為讀入記憶體"""
+    with input_file.open("rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            yield f.read()
+            return
+        try:
+            yield data
+        finally:
+            data.close()
+
+
+def read_section_index(input_file: Path) -> List[Section]:
+    """讀取文件並建立章節索引"""
+    with map_file(input_file) as data:
+        return index_sections(data)
+
+
+def slugify(title: str) -> str:
+    """產生與 GitHub 相同規則的錨點 slug（小寫、去除標點、空白改為連字號）"""
+    return SLUG_STRIP_RE.sub("", title.strip().lower()).replace(" ", "-")
+
+
+def _index_entry(name: str, section: Section, header_size: int, size: int, mtime_ns: int) -> dict:
+    """建立單一分片的索引項目；子標題位移換算為分片文件內的位元組位移"""
+    used: Dict[str, int] = {}
+
+    def unique_slug(title: str) -> str:
+        # 同一文件內重複的 slug 依序加上 -1、-2 …（與 GitHub 相同）
+        slug = slugify(title)
+        count = used.get(slug, 0)
+        used[slug] = count + 1
+        return slug if count == 0 else f"{slug}-{count}"
+
+    entry = {
+        "file": name,
+        "title": section.title,
+        "slug": unique_slug(section.title),
+        "bytes": size,
+        "mtime_ns": mtime_ns,
+        "headings": [],
+    }
+    # 子標題範圍延伸到下一個同級或更高級標題之前：以堆疊記錄尚未結束的標題
+    open_headings: List[dict] = []
+    for heading in section.headings:
+        offset = header_size + heading.offset - section.body
+        while open_headings and open_headings[-1]["level"] >= heading.level:
+            open_headings.pop()["end"] = offset
+        item = {"level": heading.level, "title": heading.title, "slug": unique_slug(heading.title), "offset": offset, "end": size}
+        entry["headings"].append(item)
+        open_headings.append(item)
+    return entry
+
+
+def save_shard_index(output_dir: Path, source: str, entries: List[dict]) -> None:
+    """寫入章節索引；內容與現有索引相同時不重寫，保留 mtime"""
+    path = output_dir / SHARD_INDEX_NAME
+    payload = {"version": SHARD_INDEX_VERSION, "source": source, "sections": entries}
+    text = json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n"
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return
+    except (OSError, ValueError):
+        pass
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def load_shard_manifest(output_dir: Path) -> dict:
+    """讀取分片清單，不存在或格式不符時回傳空清單"""
+    try:
+        data = json.loads((output_dir / SHARD_MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != SHARD_MANIFEST_VERSION:
+        return {}
+    shards = data.get("shards")
+    return shards if isinstance(shards, dict) else {}
+
+
+def save_shard_manifest(output_dir: Path, shards: dict) -> None:
+    """以暫存檔原子替換的方式寫入分片清單"""
+    path = output_dir / SHARD_MANIFEST_NAME
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    payload = {"version": SHARD_MANIFEST_VERSION, "shards": shards}
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _shard_unchanged(path: Path, sha256: str, size: int, previous: Optional[dict]) -> bool:
+    """判斷磁碟上的分片是否已是最新內容
+
+    清單記錄的大小與 mtime 和磁碟一致時直接比對清單中的雜湊；
+    否則（例如手動修改過或沒有清單）重新計算文件雜湊。
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    if stat.st_size != size:
+        return False
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        return previous.get("sha256") == sha256
+    return _file_sha256(path) == sha256
+
+
+def _replace_shard(path: Path, header: bytes, body) -> None:
+    """先寫入同目錄的暫存檔，再以 os.replace 原子替換分片"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("wb") as out:
+            out.write(header)
+            out.write(body)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+class ShardedFile(NamedTuple):
+    """單一分片的處理紀錄"""
+
+    name: str
+    title: str
+    size: int
+    status: str  # "written"（新增或內容變更）或 "unchanged"
+    seconds: float
+
+
+class ShardResult(NamedTuple):
+    """單一文檔的拆分結果（可跨行程傳遞）；報告直接由此紀錄產生，不需重新掃描輸出資料夾"""
+
+    input_file: str
+    output_dir: str
+    sections: int
+    files: List[ShardedFile]
+    removed: List[str]
+    seconds: float
+    index_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def written(self) -> List[str]:
+        return [f.name for f in self.files if f.status == "written"]
+
+    @property
+    def unchanged(self) -> List[str]:
+        return [f.name for f in self.files if f.status == "unchanged"]
+
+    def to_json(self) -> dict:
+        """機器可讀的報告內容（各分片的位元組大小與耗時）"""
+        return {
+            "input_file": self.input_file,
+            "output_dir": self.output_dir,
+            "sections": self.sections,
+            "seconds": round(self.seconds, 6),
+            "index_seconds": round(self.index_seconds, 6),
+            "files": [
+                {
+                    "name": f.name,
+                    "title": f.title,
+                    "bytes": f.size,
+                    "status": f.status,
+                    "seconds": round(f.seconds, 6),
+                }
+                for f in self.files
+            ],
+            "removed": self.removed,
+            "error": self.error,
+        }
+
+
+def shard_by_first_level_headings(
+    input_file: Path,
+    output_dir: Path,
+    on_saved: Optional[Callable[[Path], None]] = None,
+    on_unchanged: Optional[Callable[[Path], None]] = None,
+    on_removed: Optional[Callable[[Path], None]] = None,
+) -> ShardResult:
+    """依一級標題拆分文檔：建立章節索引後直接複製各章節的位元組範圍
+
+    第一個一級標題之前的內容（含 front matter）會被略過；清理後檔名相同的章節以後出現者為準。
+    每個輸出檔內容為 "# 標題" 加一個空行，再接原文中標題之後的內容。
+    依輸出資料夾中的分片清單增量更新：內容未變更的分片不會被重寫，
+    上次由本工具產生、但這次已不存在對應標題的分片會被刪除。
+    最後寫入章節索引（.shard-index.json）。
+
+    Args:
+        input_file: 輸入 Markdown 文件
+        output_dir: 輸出資料夾（需已存在）
+        on_saved: 分片寫入（新增或內容變更）後的回呼（參數為輸出路徑）
+        on_unchanged: 分片內容未變更而略過時的回呼
+        on_removed: 過期分片刪除後的回呼
+
+    Returns:
+        ShardResult: 章節數、各分片的大小／狀態／耗時與被刪除的過期分片
+    """
+    started = time.perf_counter()
+    previous_shards = load_shard_manifest(output_dir)
+    shards: dict = {}
+    index_entries: List[dict] = []
+    files: List[ShardedFile] = []
+    removed: List[str] = []
+    with map_file(input_file) as data:
+        sections = index_sections(data)
+        index_seconds = time.perf_counter() - started
+        # 清理後檔名相同時以後出現的章節為準
+        by_name = {clean_filename(section.title) + ".md": section for section in sections}
+        view = memoryview(data)
+        try:
+            for name, section in by_name.items():
+                section_started = time.perf_counter()
+                path = output_dir / name
+                header = f"# {section.title}\n\n".encode("utf-8")
+                with view[section.body:section.end] as body:
+                    digest = hashlib.sha256(header)
+                    digest.update(body)
+                    sha256 = digest.hexdigest()
+                    size = len(header) + len(body)
+                    unchanged = _shard_unchanged(path, sha256, size, previous_shards.get(name))
+                    if not unchanged:
+                        _replace_shard(path, header, body)
+                stat = path.stat()
+                shards[name] = {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                index_entries.append(_index_entry(name, section, len(header), size, stat.st_mtime_ns))
+                files.append(ShardedFile(
+                    name, section.title, size, "unchanged" if unchanged else "written",
+                    time.perf_counter() - section_started,
+                ))
+
+                if unchanged:
+                    if on_unchanged is not None:
+                        on_unchanged(path)
+                elif on_saved is not None:
+                    on_saved(path)
+        finally:
+            view.release()
+
+    for name in sorted(set(previous_shards) - set(shards)):
+        path = output_dir / name
+        # 只刪除清單中記錄、位於輸出資料夾內的 .md 分片
+        if Path(name).name != name or not name.endswith(".md"):
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        removed.append(name)
+        if on_removed is not None:
+            on_removed(path)
+
+    save_shard_manifest(output_dir, shards)
+    save_shard_index(output_dir, input_file.name, index_entries)
+    return ShardResult(
+        str(input_file), str(output_dir), len(sections), files, removed,
+        time.perf_counter() - started, index_seconds,
+    )
+
+
+def shard_document(input_file: str, output_dir: str) -> ShardResult:
+    """拆分單一文檔並回傳結果，錯誤記錄在結果中而不拋出；供 shard.py 的行程池呼叫"""
+    started = time.perf_counter()
+    try:
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        return shard_by_first_level_headings(Path(input_file), output_path)
+    except (OSError, ValueError) as e:
+        return ShardResult(input_file, output_dir, 0, [], [], time.perf_counter() - started, error=str(e))
+
+
+def write_json_report(payload: dict, destination: str) -> None:
+    """寫入 JSON 報告；destination 為 "-" 時輸出到標準輸出"""
+    text = json.dumps(payload, ensure_ascii=False, indent=2) + "\n"
+    if destination == "-":
+        sys.stdout.write(text)
+    else:
+        Path(destination).write_text(text, encoding="utf-8")
@@ -0,0 +1,320 @@
+"""install.py 的回歸測試（僅使用標準函式庫，不連線到 GitHub）
+
+執行：python3 -m unittest discover -s tests
+"""
+
+import importlib.util
+import io
+import json
+import os
+import shutil
+import socketserver
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_install_module():
+    spec = importlib.util.spec_from_file_location("install", REPO_ROOT / "install.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+install = load_install_module()
+
+
+class OfflineInstallCase(unittest.TestCase):
+    """以離線快取中的目錄清單與 blob 安裝 tasks/ 與 templates/ 兩個目錄"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        self.work_dir = root / "project"
+        self.cache = install.DownloadCache(root / "cache", max_bytes=1 << 30)
+        self.directories = [
+            ("tasks", self.work_dir / "sunnycore" / "tasks", None),
+            ("templates", self.work_dir / "sunnycore" / "templates", None),
+        ]
+        for source_dir, name in (("tasks", "a.md"), ("templates", "b.yaml")):
+            data = f"{source_dir}/{name}\n".encode()
+            sha = install.git_blob_sha(data)
+            blob = root / name
+            blob.write_bytes(data)
+            self.cache.store(sha, blob)
+            listing = [{"type": "file", "name": name, "path": f"{source_dir}/{name}", "sha": sha, "size": len(data)}]
+            self.cache.save_listing("Yamiyorunoshura/sunnycore", "master", source_dir, listing)
+
+    def run_install(self) -> bool:
+        installer = install.SunnycoreInstaller(cache=self.cache, offline=True, scan_backend="contents")
+        manifest = installer.load_install_manifest(self.work_dir, "claude")
+        with redirect_stdout(io.StringIO()):
+            return installer.install_files(self.work_dir, "claude", self.directories, [], manifest)
+
+
+class FailedListingTest(OfflineInstallCase):
+    """目錄清單無法取得時不可被當成空目錄，也不可刪除該目錄下已安裝的文件"""
+
+    def test_failed_listing_keeps_installed_files(self):
+        self.assertTrue(self.run_install())
+        template = self.work_dir / "sunnycore" / "templates" / "b.yaml"
+        self.assertTrue(template.is_file())
+
+        # 第二次增量安裝時 templates 的目錄清單無法取得
+        self.cache._listing_path("Yamiyorunoshura/sunnycore", "master", "templates").unlink()
+        self.assertFalse(self.run_install())
+        self.assertTrue(template.is_file())
+
+    def test_empty_listing_is_not_a_failure(self):
+        installer = install.SunnycoreInstaller(cache=self.cache, offline=True)
+        installer.get_directory_contents = lambda path: []
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(installer.collect_directory_files("templates", self.work_dir, []))
+        installer.get_directory_contents = lambda path: None
+        with redirect_stdout(io.StringIO()):
+            self.assertFalse(installer.collect_directory_files("templates", self.work_dir, []))
+
+    def test_stale_removal_only_under_scanned_roots(self):
+        installer = install.SunnycoreInstaller()
+        kept = self.work_dir / "sunnycore" / "templates" / "b.yaml"
+        stale = self.work_dir / "sunnycore" / "tasks" / "old.md"
+        for path in (kept, stale):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x")
+        manifest = {"files": {"sunnycore/templates/b.yaml": {}, "sunnycore/tasks/old.md": {}}}
+        removed = installer._remove_stale_files(manifest, self.work_dir, set(), {self.work_dir / "sunnycore" / "tasks"})
+        self.assertEqual(removed, 1)
+        self.assertFalse(stale.exists())
+        self.assertTrue(kept.exists())
+
+
+class IncrementalUpdateTest(OfflineInstallCase):
+    """增量更新需察覺大小不變的本地修改"""
+
+    def test_same_size_edit_is_reinstalled(self):
+        self.assertTrue(self.run_install())
+        task = self.work_dir / "sunnycore" / "tasks" / "a.md"
+        original = task.read_bytes()
+        task.write_bytes(original.upper())
+        os.utime(task, ns=(0, 0))
+        self.assertTrue(self.run_install())
+        self.assertEqual(task.read_bytes(), original)
+
+    def test_touched_file_is_kept(self):
+        self.assertTrue(self.run_install())
+        task = self.work_dir / "sunnycore" / "tasks" / "a.md"
+        os.utime(task, ns=(0, 0))
+        self.assertTrue(self.run_install())
+        # 內容未變更時不重新寫入，mtime 保持不變
+        self.assertEqual(task.stat().st_mtime_ns, 0)
+
+
+class FleetSharedTargetTest(unittest.TestCase):
+    """批次安裝時家目錄中的共用文件只記錄在實際放置它的目錄的安裝清單中"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        patcher = mock.patch.dict(os.environ, {"HOME": str(self.root / "home")})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.prompt = self.root / "home" / ".codex" / "prompts" / "review.prompt.md"
+        self.staged = {}
+        for source_path in ("codex/commands/review.md", "codex/tasks/init.md"):
+            staged_path = self.root / "staging" / source_path
+            staged_path.parent.mkdir(parents=True, exist_ok=True)
+            staged_path.write_text(source_path)
+            self.staged[source_path] = staged_path
+
+    def deploy(self, work_dir: Path, place_shared: bool):
+        installer = install.SunnycoreInstaller()
+        with redirect_stdout(io.StringIO()):
+            ok, _ = installer._deploy_work_dir(work_dir, ["codex"], self.staged, None, place_shared)
+        self.assertTrue(ok)
+        return installer.load_install_manifest(work_dir, "codex")["files"]
+
+    def test_shared_target_recorded_once(self):
+        first = self.deploy(self.root / "p0", True)
+        second = self.deploy(self.root / "p1", False)
+        self.assertIn(str(self.prompt), first)
+        self.assertNotIn(str(self.prompt), second)
+        self.assertIn("sunnycore/tasks/init.md", second)
+
+    def test_other_directory_does_not_remove_shared_target(self):
+        self.deploy(self.root / "p0", True)
+        # 舊版安裝清單曾在每個目錄都記錄共用文件
+        manifest_path = self.root / "p1" / "sunnycore" / ".install-manifest.json"
+        self.deploy(self.root / "p1", False)
+        manifest = json.loads(manifest_path.read_text())
+        manifest["files"][str(self.prompt)] = {"source": "codex/commands/review.md", "sha": "0" * 40, "size": 1}
+        manifest_path.write_text(json.dumps(manifest))
+        self.deploy(self.root / "p1", False)
+        self.assertTrue(self.prompt.is_file())
+
+
+class SingleFileCacheTest(unittest.TestCase):
+    """contents 掃描模式下單檔同樣查詢 blob SHA，首次安裝也能從快取還原"""
+
+    def test_single_file_restored_from_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            cache = install.DownloadCache(root / "cache", max_bytes=1 << 30)
+            contents = {"config/CURSOR.mdc": b"---\nalwaysApply: true\n---\n", "cursor/tasks/a.md": b"# a\n"}
+            entries = {}
+            for path, data in contents.items():
+                sha = install.git_blob_sha(data)
+                blob = root / "blob"
+                blob.write_bytes(data)
+                cache.store(sha, blob)
+                entries[path] = {"type": "file", "name": Path(path).name, "path": path, "sha": sha, "size": len(data)}
+            listings = {"config/CURSOR.mdc": entries["config/CURSOR.mdc"], "cursor/tasks": [entries["cursor/tasks/a.md"]]}
+
+            installer = install.SunnycoreInstaller(cache=cache, scan_backend="contents")
+            installer.get_directory_contents = listings.get
+            # 快取未命中時會連線到不存在的伺服器並失敗
+            installer.base_raw_url = "http://127.0.0.1:9"
+            work_dir = root / "project"
+            target = work_dir / "sunnycore" / "cursor.mdc"
+            with redirect_stdout(io.StringIO()):
+                _, success, _ = installer.scan_and_download_pipelined(
+                    [("cursor/tasks", work_dir / "sunnycore" / "tasks", None)],
+                    [("config/CURSOR.mdc", target)],
+                    work_dir,
+                )
+            self.assertTrue(success)
+            self.assertEqual(installer.cache_hits, 2)
+            self.assertEqual(target.read_bytes(), contents["config/CURSOR.mdc"])
+
+
+class CacheMaterializeTest(unittest.TestCase):
+    """快取物件在使用前需校驗內容，--hardlink 模式下修改已安裝文件不可汙染之後的安裝"""
+
+    def test_modified_hardlinked_file_is_not_reused(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            cache = install.DownloadCache(root / "cache", max_bytes=1 << 30, use_hardlinks=True)
+            data = b"# task\n"
+            sha = install.git_blob_sha(data)
+            source = root / "source.md"
+            source.write_bytes(data)
+            cache.store(sha, source)
+
+            installed = root / "project" / "task.md"
+            self.assertTrue(cache.materialize(sha, installed))
+            self.assertEqual(installed.read_bytes(), data)
+            with open(installed, "ab") as f:
+                f.write(b"local edit\n")
+
+            other = root / "other" / "task.md"
+            self.assertFalse(cache.materialize(sha, other))
+            self.assertFalse(other.exists())
+            self.assertFalse(cache.object_path(sha).exists())
+
+
+class RateLimitPauseTest(unittest.TestCase):
+    """速率限制額度用盡時提示暫停時間，且暫停不超過上限"""
+
+    def test_pause_is_capped_and_reported(self):
+        controller = install.AdaptiveConcurrencyController()
+        headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 3600)}
+        output = io.StringIO()
+        with redirect_stdout(output):
+            controller.record_success(0.01, headers)
+            controller.record_success(0.01, headers)
+        self.assertLessEqual(controller.pause_remaining(), controller.MAX_RATE_LIMIT_PAUSE)
+        self.assertGreater(controller.pause_remaining(), 0)
+        self.assertEqual(output.getvalue().count("速率限制額度已用盡"), 1)
+
+
+class CloseAfterResponseHandler(socketserver.StreamRequestHandler):
+    """回應一次 keep-alive 請求後立即關閉連線（模擬伺服器回收閒置連線）"""
+
+    def handle(self):
+        while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+            pass
+        self.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+
+
+class StaleConnectionTest(unittest.TestCase):
+    """重用已被伺服器關閉的閒置連線時，連線池應以新連線重送一次"""
+
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), CloseAfterResponseHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = "http://127.0.0.1:%d/file.md" % self.server.server_address[1]
+
+    def test_retries_on_stale_reused_connection(self):
+        pool = install.HttpConnectionPool(timeout=5)
+        for _ in range(2):
+            with pool.open(self.url) as response:
+                self.assertEqual(response.read(), b"ok")
+            # 等待伺服器關閉連線，讓下一次請求重用已失效的閒置連線
+            time.sleep(0.1)
+        self.assertEqual(pool.requests, 2)
+        self.assertEqual(pool.connections_created, 2)
+
+
+
+@unittest.skipUnless(shutil.which("git"), "需要 git 指令")
+class SourceDirectoryTest(unittest.TestCase):
+    """從本地倉庫目錄安裝時只複製追蹤中的文件，有未提交修改時不記錄 commit"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        self.source = root / "checkout"
+        self.work_dir = root / "project"
+        scripts = self.source / "scripts"
+        scripts.mkdir(parents=True)
+        (scripts / "shard.py").write_text("print('shard')\n")
+        self.git("init", "-q")
+        self.git("add", "-A")
+        self.git("-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-q", "-m", "init")
+        # 未追蹤的建置產物不應被安裝
+        (scripts / "__pycache__").mkdir()
+        (scripts / "__pycache__" / "shard.cpython-311.pyc").write_bytes(b"\0")
+        (scripts / "notes.txt").write_text("scratch\n")
+
+    def git(self, *args):
+        subprocess.run(["git", "-C", str(self.source), *args], check=True)
+
+    def copy(self):
+        installer = install.SunnycoreInstaller(source=self.source)
+        directories = [("scripts", self.work_dir / "sunnycore" / "scripts", None)]
+        installed = []
+        _, commit = installer._copy_from_directory(self.source, directories, {}, self.work_dir, None, installed)
+        return sorted(source for source, _ in installed), commit
+
+    def test_copies_tracked_files_and_reports_clean_commit(self):
+        installed, commit = self.copy()
+        self.assertEqual(installed, ["scripts/shard.py"])
+        self.assertIsNotNone(commit)
+
+    def test_dirty_tree_has_no_commit(self):
+        (self.source / "scripts" / "shard.py").write_text("print('edited')\n")
+        installed, commit = self.copy()
+        self.assertEqual(installed, ["scripts/shard.py"])
+        self.assertIsNone(commit)
+
+    def test_plain_directory_skips_bytecode(self):
+        shutil.rmtree(self.source / ".git")
+        installed, commit = self.copy()
+        self.assertEqual(installed, ["scripts/notes.txt", "scripts/shard.py"])
+        self.assertIsNone(commit)
+
+
+if __name__ == "__main__":
+    unittest.main()
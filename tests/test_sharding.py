@@ -0,0 +1,93 @@
+"""scripts/sharding.py 章節索引的單元測試（僅使用標準函式庫）
+
+執行：python3 -m unittest discover -s tests
+"""
+
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_sharding_module():
+    spec = importlib.util.spec_from_file_location("sharding", REPO_ROOT / "scripts" / "sharding.py")
+    module = importlib.util.module_from_spec(spec)
+    # NamedTuple 需要能在 sys.modules 中找到所屬模組
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+sharding = load_sharding_module()
+
+
+def titles(text: str):
+    return [section.title for section in sharding.index_sections(text.encode("utf-8"))]
+
+
+class FenceTest(unittest.TestCase):
+    """程式碼區塊中的 # 註解不是章節"""
+
+    def test_backtick_fence(self):
+        text = "# 第一章\n\n```bash\n# 安裝依賴\npip install x\n```\n\n# 第二章\n"
+        self.assertEqual(titles(text), ["第一章", "第二章"])
+
+    def test_tilde_fence_needs_matching_marker(self):
+        text = "# 第一章\n~~~~\n```\n# 不是標題\n~~~\n# 仍在區塊內\n~~~~\n# 第二章\n"
+        self.assertEqual(titles(text), ["第一章", "第二章"])
+
+    def test_inline_backticks_do_not_open_fence(self):
+        text = "# 第一章\n``` `inline` ```\n# 第二章\n"
+        self.assertEqual(titles(text), ["第一章", "第二章"])
+
+    def test_section_byte_ranges(self):
+        data = "# 甲\nabc\n```\n# x\n```\n# 乙\ndef\n".encode("utf-8")
+        first, second = sharding.index_sections(data)
+        self.assertEqual(first.start, 0)
+        self.assertEqual(first.end, second.start)
+        self.assertEqual(data[second.start:second.end], "# 乙\ndef\n".encode("utf-8"))
+        self.assertEqual(data[first.body:first.end], b"abc\n```\n# x\n```\n")
+
+
+class FrontMatterTest(unittest.TestCase):
+    """YAML front matter 中的內容不是章節"""
+
+    def test_front_matter_is_skipped(self):
+        text = "---\ntitle: 文件\n# comment: 不是標題\n---\n# 第一章\n"
+        self.assertEqual(titles(text), ["第一章"])
+
+    def test_unclosed_front_matter_is_ordinary_text(self):
+        text = "---\n# 第一章\n"
+        self.assertEqual(titles(text), ["第一章"])
+
+
+class SetextTest(unittest.TestCase):
+    """setext 一級標題只接受單行段落"""
+
+    def test_single_line_paragraph(self):
+        text = "前言\n\n第一章\n===\n內容\n\n# 第二章\n"
+        self.assertEqual(titles(text), ["第一章", "第二章"])
+
+    def test_multi_line_paragraph_is_not_a_title(self):
+        self.assertEqual(titles("第一行\n第二行\n===\n"), [])
+
+    def test_list_item_is_not_a_title(self):
+        for item in ("- 項目", "* 項目", "+ 項目", "1. 項目", "2) 項目"):
+            with self.subTest(item=item):
+                self.assertEqual(titles(f"{item}\n===\n"), [])
+
+    def test_blockquote_is_not_a_title(self):
+        self.assertEqual(titles("> 引用\n===\n"), [])
+
+    def test_title_inside_fence_is_ignored(self):
+        self.assertEqual(titles("```\n標題\n===\n```\n"), [])
+
+    def test_title_after_fence(self):
+        text = "# 第一章\n```\ncode\n```\n第二章\n===\n"
+        self.assertEqual(titles(text), ["第一章", "第二章"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+"""hooks/ensure_todos_done.py 與 hooks/todo_hook_daemon.py 的單元測試（僅使用標準函式庫）
+
+執行：python3 -m unittest discover -s tests
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+HOOKS_DIR = REPO_ROOT / "hooks"
+
+
+def load_hook_module(name: str):
+    spec = importlib.util.spec_from_file_location(name, HOOKS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    # todo_hook_daemon 以 import ensure_todos_done 取得同一個模組
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+hook = load_hook_module("ensure_todos_done")
+daemon = load_hook_module("todo_hook_daemon")
+
+
+def todowrite_line(*statuses: str) -> bytes:
+    todos = [{"content": f"task {i}", "status": status} for i, status in enumerate(statuses)]
+    message = {"content": [{"type": "tool_use", "name": "TodoWrite", "input": {"todos": todos}}]}
+    return json.dumps({"type": "assistant", "message": message}).encode() + b"\n"
+
+
+def text_line(text: str) -> bytes:
+    return json.dumps({"type": "user", "message": {"content": text}}).encode() + b"\n"
+
+
+def statuses(latest):
+    return [todo["status"] for todo in hook.extract_todos(latest)] if latest else None
+
+
+class TranscriptCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.transcript = self.dir / "transcript.jsonl"
+
+    def write(self, *lines: bytes):
+        self.transcript.write_bytes(b"".join(lines))
+
+    def append(self, *lines: bytes):
+        with self.transcript.open("ab") as f:
+            f.write(b"".join(lines))
+
+
+class ReverseScanTest(TranscriptCase):
+    """由檔尾反向掃描，只解碼含 TodoWrite 的行"""
+
+    def test_lines_reversed_across_blocks(self):
+        lines = [f"line {i}".encode() * (i + 1) for i in range(20)]
+        self.write(b"\n".join(lines))
+        self.assertEqual(list(hook.iter_lines_reversed(self.transcript, block_size=7)), lines[::-1])
+
+    def test_latest_call_wins(self):
+        self.write(todowrite_line("pending"), text_line("hi"), todowrite_line("completed"), text_line("bye"))
+        self.assertEqual(statuses(hook.find_latest_todowrite(self.transcript)), ["completed"])
+
+    def test_marker_in_plain_text_is_skipped(self):
+        self.write(todowrite_line("pending"), text_line("請呼叫 TodoWrite 更新清單"), b"TodoWrite {not json\n")
+        self.assertEqual(statuses(hook.find_latest_todowrite(self.transcript)), ["pending"])
+
+    def test_range_limits_scan(self):
+        first = todowrite_line("pending")
+        self.write(first, todowrite_line("completed"))
+        self.assertEqual(statuses(hook.find_latest_todowrite(self.transcript, end=len(first))), ["pending"])
+        self.assertIsNone(hook.find_latest_todowrite(self.transcript, start=len(first), end=len(first)))
+
+    def test_without_mmap(self):
+        self.write(todowrite_line("pending"), text_line("x" * 5000), todowrite_line("in_progress"))
+        with mock.patch.object(hook.mmap, "mmap", side_effect=OSError):
+            self.assertEqual(statuses(hook.find_latest_todowrite(self.transcript)), ["in_progress"])
+
+    def test_missing_transcript(self):
+        self.assertIsNone(hook.find_latest_todowrite(self.dir / "missing.jsonl"))
+
+
+class CheckpointTest(TranscriptCase):
+    """位移檢查點：只掃描新增內容，檔案被截斷、替換或改寫時退回完整掃描"""
+
+    def scan(self, cp):
+        return hook.scan_incremental(self.transcript, cp)
+
+    def test_incremental_scan_starts_at_offset(self):
+        self.write(todowrite_line("pending"), text_line("a"))
+        latest, cp = self.scan({})
+        self.assertEqual(statuses(latest), ["pending"])
+        self.assertEqual(cp["offset"], self.transcript.stat().st_size)
+
+        self.append(text_line("b"))
+        with mock.patch.object(hook, "find_latest_todowrite", wraps=hook.find_latest_todowrite) as find:
+            latest, cp2 = self.scan(cp)
+        self.assertEqual(find.call_args.kwargs["start"], cp["offset"])
+        self.assertEqual(statuses(latest), ["pending"])
+
+        self.append(todowrite_line("completed"))
+        latest, _ = self.scan(cp2)
+        self.assertEqual(statuses(latest), ["completed"])
+
+    def test_partial_last_line_is_rescanned(self):
+        complete = todowrite_line("pending")
+        line = todowrite_line("completed")
+        self.write(complete, line[:20])
+        latest, cp = self.scan({})
+        self.assertEqual(statuses(latest), ["pending"])
+        self.assertEqual(cp["offset"], len(complete))
+
+        self.append(line[20:])
+        latest, _ = self.scan(cp)
+        self.assertEqual(statuses(latest), ["completed"])
+
+    def test_in_place_rewrite_falls_back_to_full_scan(self):
+        self.write(todowrite_line("pending"), text_line("a"))
+        _, cp = self.scan({})
+        # 同一 inode、同樣大小，但 offset 之前的內容被改寫
+        with self.transcript.open("r+b") as f:
+            f.write(todowrite_line("completed"))
+        latest, _ = self.scan(cp)
+        self.assertEqual(statuses(latest), ["completed"])
+
+    def test_truncate_falls_back_to_full_scan(self):
+        self.write(todowrite_line("pending"), text_line("a" * 100))
+        _, cp = self.scan({})
+        self.write(todowrite_line("completed"))
+        latest, cp = self.scan(cp)
+        self.assertEqual(statuses(latest), ["completed"])
+        self.assertEqual(cp["offset"], self.transcript.stat().st_size)
+
+    def test_replaced_file_falls_back_to_full_scan(self):
+        self.write(todowrite_line("pending"))
+        _, cp = self.scan({})
+        replacement = self.dir / "new.jsonl"
+        replacement.write_bytes(todowrite_line("completed") + text_line("padding" * 20))
+        os.replace(replacement, self.transcript)
+        latest, _ = self.scan(cp)
+        self.assertEqual(statuses(latest), ["completed"])
+
+    def test_checkpoint_file_roundtrip(self):
+        checkpoint_file = self.dir / "state" / "todowrite_checkpoint.json"
+        checkpoint_file.parent.mkdir()
+        self.write(todowrite_line("pending"))
+        self.assertEqual(statuses(hook.find_latest_todowrite_incremental(self.transcript, checkpoint_file)), ["pending"])
+        self.assertEqual(hook.load_checkpoint(checkpoint_file)["offset"], self.transcript.stat().st_size)
+        self.assertEqual(hook.load_checkpoint(self.dir / "missing.json"), {})
+
+
+class DaemonProtocolTest(TranscriptCase):
+    """daemon 以 JSON 行接收 {"hook_input", "project_dir"}，回覆 {"block": ...} 或 {"error": ...}"""
+
+    def setUp(self):
+        super().setUp()
+        self.project_dir = self.dir / "project"
+        self.project_dir.mkdir()
+        self.socket_path = self.dir / "todo_hook.sock"
+        daemon.checkpoints.clear()
+
+    def start_server(self):
+        server = daemon.HookServer(str(self.socket_path), daemon.HookRequestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+    def test_block_and_allow(self):
+        self.start_server()
+        self.write(todowrite_line("completed", "pending"))
+        hook_input = {"transcript_path": str(self.transcript), "stop_hook_active": False}
+        reply = hook.query_daemon(self.socket_path, hook_input, self.project_dir)
+        self.assertIn("task 1", reply["block"])
+        self.assertNotIn("task 0", reply["block"])
+
+        self.append(todowrite_line("completed", "completed"))
+        self.assertEqual(hook.query_daemon(self.socket_path, hook_input, self.project_dir), {"block": None})
+        self.assertIn(str(self.transcript), daemon.checkpoints)
+
+    def test_error_reply_falls_back(self):
+        self.start_server()
+        # hook_input 不是 dict 時 daemon 回覆 error，client 改為行程內判斷
+        self.assertIsNone(hook.query_daemon(self.socket_path, "not a dict", self.project_dir))
+
+    def test_missing_socket(self):
+        self.assertIsNone(hook.query_daemon(self.socket_path, {}, self.project_dir))
+
+    def test_daemon_process_exits_when_idle(self):
+        process = subprocess.Popen(
+            [sys.executable, str(HOOKS_DIR / "todo_hook_daemon.py"),
+             "--project-dir", str(self.project_dir), "--socket", str(self.socket_path), "--idle-timeout", "1"],
+            stderr=subprocess.DEVNULL,
+        )
+        self.addCleanup(process.kill)
+        deadline = time.monotonic() + 10
+        while not self.socket_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.write(todowrite_line("pending"))
+        reply = hook.query_daemon(self.socket_path, {"transcript_path": str(self.transcript)}, self.project_dir)
+        self.assertIn("task 0", reply["block"])
+        self.assertEqual(process.wait(timeout=10), 0)
+        self.assertFalse(self.socket_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()